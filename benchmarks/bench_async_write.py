@@ -0,0 +1,84 @@
+# benchmarks/bench_async_write.py
+
+"""
+Compares direct and background-thread (--async-write) output of the CIF converters,
+on local disk and on a simulated slow filesystem (each write sleeps as if the
+file system accepted `bandwidth` MB/s, like a loaded network mount).
+
+Usage:
+    python -m benchmarks.bench_async_write [n_sites] [bandwidth_MBps]
+"""
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+import convert.compression
+from benchmarks.synthetic import write_synthetic_cif
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+
+
+class _ThrottledFile:
+    def __init__(self, file, bandwidth):
+        self.file = file
+        self.bandwidth = bandwidth
+
+    def write(self, text):
+        time.sleep(len(text) / self.bandwidth)
+        return self.file.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+def _time(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(n_sites=1_000_000, bandwidth_mbps=50.0):
+    with tempfile.TemporaryDirectory() as tmp:
+        cif_path = os.path.join(tmp, "synthetic.cif")
+        write_synthetic_cif(cif_path, n_sites)
+
+        cases = [
+            ("cif_to_xyz", cif_to_xyz, "xyz"),
+            ("cif_to_pdb", cif_to_pdb, "pdb"),
+            ("cif_to_lammps", cif_to_lammps, "lmp"),
+        ]
+        print(f"{n_sites} sites, slow filesystem at {bandwidth_mbps:g} MB/s")
+        print(f"{'converter':<15}{'filesystem':<12}{'direct (s)':>12}{'async (s)':>12}{'speed-up':>10}  identical")
+        for fs in ("local", "slow"):
+            if fs == "slow":
+                convert.compression.open = lambda path, mode: (
+                    open(path, mode) if mode == "r" else _ThrottledFile(open(path, mode), bandwidth_mbps * 1e6)
+                )
+            try:
+                for name, fn, ext in cases:
+                    direct_out = os.path.join(tmp, f"direct.{ext}")
+                    async_out = os.path.join(tmp, f"async.{ext}")
+                    t_direct = _time(fn, cif_path, direct_out)
+                    t_async = _time(fn, cif_path, async_out, write_queue=8)
+                    same = filecmp.cmp(direct_out, async_out, shallow=False)
+                    print(f"{name:<15}{fs:<12}{t_direct:>12.2f}{t_async:>12.2f}{t_direct / t_async:>9.2f}x  {same}")
+            finally:
+                if fs == "slow":
+                    del convert.compression.open
+
+
+if __name__ == "__main__":
+    main(
+        int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 50.0,
+    )
@@ -0,0 +1,50 @@
+# benchmarks/bench_columnar.py
+
+"""
+Compares the per-line and columnar (NumPy) paths of the CIF converters.
+
+Usage:
+    python -m benchmarks.bench_columnar [n_sites]
+"""
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_synthetic_cif
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+
+
+def _time(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(n_sites=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        cif_path = os.path.join(tmp, "synthetic.cif")
+        write_synthetic_cif(cif_path, n_sites)
+
+        cases = [
+            ("cif_to_xyz", cif_to_xyz, "xyz"),
+            ("cif_to_pdb", cif_to_pdb, "pdb"),
+            ("cif_to_lammps", cif_to_lammps, "lmp"),
+        ]
+        print(f"{n_sites} sites")
+        print(f"{'converter':<15}{'per-line (s)':>14}{'columnar (s)':>14}{'speed-up':>10}  identical")
+        for name, fn, ext in cases:
+            line_out = os.path.join(tmp, f"line.{ext}")
+            col_out = os.path.join(tmp, f"columnar.{ext}")
+            t_line = _time(fn, cif_path, line_out)
+            t_col = _time(fn, cif_path, col_out, columnar=True)
+            same = filecmp.cmp(line_out, col_out, shallow=False)
+            print(f"{name:<15}{t_line:>14.2f}{t_col:>14.2f}{t_line / t_col:>9.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,72 @@
+# benchmarks/bench_json.py
+
+"""
+Compares the streaming model.json reader with the former `json.load` path of
+ionerdss_json_to_xyz on a generated model file, with and without a large
+"system_state" section. Each case runs in a fresh process so that its peak RSS
+is measured on its own (Unix only).
+
+Usage:
+    python -m benchmarks.bench_json [n_types] [state_molecules]
+"""
+
+import filecmp
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.bench_suite import run_isolated
+from benchmarks.synthetic import write_synthetic_model
+from convert.ionerdss_json_to_xyz import ionerdss_json_to_xyz
+
+
+def json_load_to_xyz(json_path, xyz_path, bonds_path):
+    """
+    The converter as it was before streaming: json.load, then walk the nested dicts.
+    """
+    with open(json_path, "r") as f:
+        data = json.load(f)
+
+    entries, bonds = [], []
+    for moltype in data.get("molecule_types", []):
+        com_index = len(entries)
+        entries.append((moltype["name"], 0.0, 0.0, 0.0))
+        for iface in moltype.get("interfaces", []):
+            coord = iface["coord"]
+            bonds.append((com_index, len(entries)))
+            entries.append((iface["name"], coord["x"], coord["y"], coord["z"]))
+
+    with open(xyz_path, "w") as out:
+        out.write(f"{len(entries)}\nConverted from ioNERDSS JSON to XYZ\n")
+        for label, x, y, z in entries:
+            out.write(f"{label} {x:.3f} {y:.3f} {z:.3f}\n")
+    with open(bonds_path, "w") as b:
+        for i, j in bonds:
+            b.write(f"{i} {j}\n")
+    return len(entries)
+
+
+def main(n_types=200_000, state_molecules=2_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'model':<28}{'size (MB)':>10}{'json.load (s)':>15}{'RSS (MB)':>10}"
+              f"{'streaming (s)':>15}{'RSS (MB)':>10}  identical")
+        for state in (0, state_molecules):
+            json_path = os.path.join(tmp, "model.json")
+            write_synthetic_model(json_path, n_types, state_molecules=state)
+            size = os.path.getsize(json_path) / 2 ** 20
+
+            outputs = {}
+            for name, fn in (("load", json_load_to_xyz), ("stream", ionerdss_json_to_xyz)):
+                outputs[name] = (os.path.join(tmp, f"{name}.xyz"), os.path.join(tmp, f"{name}.bonds"))
+                outputs[name + "_result"] = run_isolated(fn, json_path, *outputs[name])[:2]
+            same = all(filecmp.cmp(a, b, shallow=False) for a, b in zip(outputs["load"], outputs["stream"]))
+
+            (t_load, rss_load), (t_stream, rss_stream) = outputs["load_result"], outputs["stream_result"]
+            label = f"{n_types} types" + (f" + {state} state" if state else "")
+            print(f"{label:<28}{size:>10.0f}{t_load:>15.2f}{rss_load:>10.0f}"
+                  f"{t_stream:>15.2f}{rss_stream:>10.0f}  {same}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,69 @@
+# benchmarks/bench_parallel_parse.py
+
+"""
+Times the parsing of one large CIF file with 1, 2, 4, ... worker processes
+(`--parse-workers`), for the streaming reader and the columnar reader, and checks
+that the results match the serial parse.
+
+Usage:
+    python -m benchmarks.bench_parallel_parse [n_sites] [max_workers]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_synthetic_cif
+from convert.cif_reader import iter_atom_chunks
+from convert.columnar import np, read_cif_columns
+
+
+def _stream(cif_path, workers):
+    return [site for chunk in iter_atom_chunks(cif_path, workers=workers) for site in chunk]
+
+
+def _columns(cif_path, workers):
+    cols = read_cif_columns(cif_path, workers=workers)
+    return cols.serial, cols.coords, cols.chain_codes, cols.chains
+
+
+def _same(a, b):
+    if isinstance(a, list):
+        return a == b
+    return all(np.array_equal(x, y) if hasattr(x, "shape") else x == y for x, y in zip(a, b))
+
+
+def main(n_sites=1_000_000, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cif_path = os.path.join(tmp, "synthetic.cif")
+        write_synthetic_cif(cif_path, n_sites)
+
+        readers = [("streaming", _stream)]
+        if np is not None:
+            readers.append(("columnar", _columns))
+        print(f"{n_sites} sites ({os.path.getsize(cif_path) / 1e6:.0f} MB), {os.cpu_count()} CPUs")
+        print(f"{'reader':<12}{'workers':>8}{'time (s)':>10}{'speed-up':>10}  identical")
+        for name, fn in readers:
+            serial = None
+            for workers in counts:
+                start = time.perf_counter()
+                result = fn(cif_path, workers)
+                elapsed = time.perf_counter() - start
+                if serial is None:
+                    serial, t_serial = result, elapsed
+                print(f"{name:<12}{workers:>8}{elapsed:>10.2f}{t_serial / elapsed:>9.2f}x  {_same(result, serial)}")
+
+
+if __name__ == "__main__":
+    main(
+        int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else None,
+    )
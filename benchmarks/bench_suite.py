@@ -0,0 +1,302 @@
+# benchmarks/bench_suite.py
+
+"""
+Benchmark suite for the converters.
+
+Generates synthetic ioNERDSS inputs of each requested size: a CIF with one COM and
+five INT sites per molecule (the ratio of the 5l93 fixture), whose chains are
+named A, A-2, ..., B, ... in ioNERDSS order, and a model.json of the same number
+of sites. Each converter then runs on each input in a fresh process, which records
+its wall time, peak RSS and throughput. The results can be written as JSON and
+compared with an earlier run to catch regressions between commits:
+
+    python -m benchmarks.bench_suite --sizes 1e3,1e4,1e5,1e6 -o before.json
+    python -m benchmarks.bench_suite --sizes 1e3,1e4,1e5,1e6 -o after.json --compare before.json
+
+Peak RSS is read from getrusage, so the suite runs on Unix only.
+"""
+
+import datetime
+import functools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from benchmarks.synthetic import write_synthetic_cif, write_synthetic_model
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_mmcif import cif_to_mmcif
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+from convert.fanout import convert_many
+from convert.ionerdss_json_to_xyz import ionerdss_json_to_xyz
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+INTS_PER_COM = 5
+INTERFACES_PER_TYPE = 8
+# Relative slow-down reported as a regression by --compare.
+DEFAULT_TOLERANCE = 0.10
+
+# input: "cif", "json" or "npz"; outputs: extensions of the output paths passed to
+# `function` after the input path.
+Case = namedtuple("Case", ["name", "input", "function", "outputs", "numpy"], defaults=[False])
+
+
+def convert_all(cif_path, xyz_path, pdb_path, lammps_path, bonds_path, columnar=False):
+    """
+    convert_many with one positional argument per output.
+    """
+    outputs = {"xyz": xyz_path, "pdb": pdb_path, "lammps": lammps_path, "bonds": bonds_path}
+    return convert_many(cif_path, outputs, columnar=columnar)
+
+
+def write_binary_case(cif_path, npz_path):
+    from convert.binary import write_binary
+
+    return write_binary(cif_path, npz_path)
+
+
+CASES = [
+    Case("cif_to_xyz", "cif", cif_to_xyz, [".xyz", ".bonds"]),
+    Case("cif_to_pdb", "cif", cif_to_pdb, [".pdb"]),
+    Case("cif_to_mmcif", "cif", cif_to_mmcif, [".cif"]),
+    Case("cif_to_lammps", "cif", cif_to_lammps, [".lmp"]),
+    Case("convert_many", "cif", convert_all, [".xyz", ".pdb", ".lmp", ".bonds"]),
+    Case("ionerdss_json_to_xyz", "json", ionerdss_json_to_xyz, [".xyz", ".bonds"]),
+    Case("cif_to_xyz[columnar]", "cif", functools.partial(cif_to_xyz, columnar=True), [".xyz", ".bonds"], True),
+    Case("cif_to_pdb[columnar]", "cif", functools.partial(cif_to_pdb, columnar=True), [".pdb"], True),
+    Case("cif_to_lammps[columnar]", "cif", functools.partial(cif_to_lammps, columnar=True), [".lmp"], True),
+    Case("convert_many[columnar]", "cif", functools.partial(convert_all, columnar=True),
+         [".xyz", ".pdb", ".lmp", ".bonds"], True),
+    Case("write_binary", "cif", write_binary_case, [".npz"], True),
+    Case("cif_to_pdb[npz]", "npz", cif_to_pdb, [".pdb"], True),
+]
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the calling process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # bytes on macOS, KiB elsewhere
+
+
+def _measure(fn, args, queue):
+    try:
+        start = time.perf_counter()
+        fn(*args)
+        queue.put((time.perf_counter() - start, peak_rss_mb(), None))
+    except Exception as exc:
+        queue.put((None, peak_rss_mb(), f"{type(exc).__name__}: {exc}"))
+
+
+def run_isolated(fn, *args):
+    """
+    Runs `fn(*args)` in a fresh (spawned) process.
+
+    Returns:
+        tuple: (wall time in s or None on failure, peak RSS in MiB, error message or None).
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(fn, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def prepare_inputs(n_sites, data_dir):
+    """
+    Writes (or reuses, if present in `data_dir`) the synthetic inputs of one size.
+
+    Returns:
+        dict: Input kind ("cif", "json", "npz") -> (path, number of sites).
+    """
+    cif_path = os.path.join(data_dir, f"synthetic_{n_sites}.cif")
+    if not os.path.exists(cif_path):
+        write_synthetic_cif(cif_path, n_sites, ints_per_com=INTS_PER_COM, grouped=True)
+    inputs = {"cif": (cif_path, n_sites)}
+
+    n_types = max(1, n_sites // (INTERFACES_PER_TYPE + 1))
+    json_path = os.path.join(data_dir, f"synthetic_{n_sites}.json")
+    if not os.path.exists(json_path):
+        write_synthetic_model(json_path, n_types, INTERFACES_PER_TYPE)
+    inputs["json"] = (json_path, n_types * (INTERFACES_PER_TYPE + 1))
+
+    if numpy is not None:
+        npz_path = os.path.join(data_dir, f"synthetic_{n_sites}.npz")
+        if not os.path.exists(npz_path):
+            write_binary_case(cif_path, npz_path)
+        inputs["npz"] = (npz_path, n_sites)
+    return inputs
+
+
+def run_case(case, input_path, n_sites, out_dir, repeat=1):
+    """
+    Runs one case `repeat` times, each in a fresh process, and returns its result
+    record; time and RSS are those of the fastest run.
+    """
+    outputs = [os.path.join(out_dir, case.name + ext) for ext in case.outputs]
+    runs = [run_isolated(case.function, input_path, *outputs) for _ in range(repeat)]
+    record = {
+        "case": case.name,
+        "sites": n_sites,
+        "input_bytes": os.path.getsize(input_path),
+    }
+    errors = [error for _, _, error in runs if error]
+    if errors:
+        record["error"] = errors[0]
+        return record
+
+    seconds, rss, _ = min(runs)
+    record.update(
+        output_bytes=sum(os.path.getsize(path) for path in outputs if os.path.exists(path)),
+        seconds=round(seconds, 6),
+        runs=[round(t, 6) for t, _, _ in runs],
+        peak_rss_mb=round(rss, 1),
+        sites_per_second=round(n_sites / max(seconds, 1e-9)),
+    )
+    for path in outputs:
+        if os.path.exists(path):
+            os.remove(path)
+    return record
+
+
+def environment():
+    """
+    Describes the machine and the checked-out commit, for the JSON report.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__ if numpy is not None else None,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, cases=None, data_dir=None, repeat=1, report=print):
+    """
+    Runs every selected case on the synthetic inputs of every size.
+
+    Parameters:
+        sizes (iterable[int]): Numbers of sites (10**3 to 10**7 are sensible).
+        cases (iterable[str], optional): Case names to run; all by default. Cases
+            that need NumPy are skipped when it is not installed.
+        data_dir (str, optional): Directory in which the generated inputs are kept
+            and reused; a temporary directory by default.
+        repeat (int): Runs per case and size; the fastest one is reported.
+        report (callable): Called with one formatted line per result.
+
+    Returns:
+        dict: {"environment": ..., "results": [one record per case and size]}.
+    """
+    selected = [case for case in CASES if cases is None or case.name in cases]
+    unknown = sorted(set(cases or ()) - {case.name for case in CASES})
+    if unknown:
+        raise ValueError(f"Unknown benchmark case(s): {', '.join(unknown)}")
+    selected = [case for case in selected if numpy is not None or not case.numpy]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        report(f"{'case':<26}{'sites':>10}{'time (s)':>10}{'RSS (MB)':>10}{'sites/s':>12}")
+        for n_sites in sizes:
+            inputs = prepare_inputs(n_sites, data_dir)
+            for case in selected:
+                input_path, n = inputs[case.input]
+                record = run_case(case, input_path, n, tmp, repeat)
+                results.append(record)
+                report(format_record(record))
+    return {"environment": environment(), "results": results}
+
+
+def format_record(record):
+    if "error" in record:
+        return f"{record['case']:<26}{record['sites']:>10}  FAILED {record['error']}"
+    return (f"{record['case']:<26}{record['sites']:>10}{record['seconds']:>10.3f}"
+            f"{record['peak_rss_mb']:>10.0f}{record['sites_per_second']:>12}")
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares two suite reports case by case.
+
+    Returns:
+        list[tuple]: (case, sites, time ratio, RSS ratio, regressed) for every case
+        and size present in both reports; `regressed` is True if the current run is
+        more than `tolerance` slower or larger.
+    """
+    before = {(r["case"], r["sites"]): r for r in baseline["results"] if "error" not in r}
+    rows = []
+    for record in current["results"]:
+        old = before.get((record["case"], record["sites"]))
+        if old is None or "error" in record:
+            continue
+        time_ratio = record["seconds"] / max(old["seconds"], 1e-9)
+        rss_ratio = record["peak_rss_mb"] / max(old["peak_rss_mb"], 1e-9)
+        regressed = time_ratio > 1 + tolerance or rss_ratio > 1 + tolerance
+        rows.append((record["case"], record["sites"], time_ratio, rss_ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the converters on synthetic ioNERDSS inputs.")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES),
+                        help="comma-separated numbers of sites, e.g. 1e3,1e5,1e7 (default: %(default)s)")
+    parser.add_argument("--cases", help="comma-separated case names (default: all): "
+                        + ", ".join(case.name for case in CASES))
+    parser.add_argument("--data-dir", help="keep the generated inputs here and reuse them in later runs")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the fastest is reported")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare with the JSON results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slow-down or RSS growth reported as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(float(size)) for size in args.sizes.split(",") if size.strip()]
+    cases = [name.strip() for name in args.cases.split(",")] if args.cases else None
+    report = run_suite(sizes, cases, args.data_dir, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, report, args.tolerance)
+        print(f"\nCompared with {baseline['environment'].get('commit') or args.compare}")
+        print(f"{'case':<26}{'sites':>10}{'time':>9}{'RSS':>9}")
+        for case, sites, time_ratio, rss_ratio, regressed in rows:
+            print(f"{case:<26}{sites:>10}{time_ratio:>8.2f}x{rss_ratio:>8.2f}x" + ("  REGRESSION" if regressed else ""))
+        return 1 if any(row[-1] for row in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
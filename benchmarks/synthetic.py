@@ -0,0 +1,133 @@
+# benchmarks/synthetic.py
+
+import json
+import random
+
+CIF_HEADER = """\
+# Coarse-grained structure CIF file
+data_coarse_grained
+_audit_conform_dict.text 'Synthetic coarse-grained model for benchmarking'
+loop_
+_atom_site.group_PDB
+_atom_site.id
+_atom_site.label_atom_id
+_atom_site.label_comp_id
+_atom_site.label_asym_id
+_atom_site.Cartn_x
+_atom_site.Cartn_y
+_atom_site.Cartn_z
+_atom_site.occupancy
+_atom_site.B_iso_or_equiv
+_atom_site.type_symbol
+"""
+
+
+def chain_name(molecule_type, copy):
+    """
+    Returns the ioNERDSS chain ID of a molecule copy: "A", "A-2", "A-3", ...
+    """
+    letter = chr(ord("A") + molecule_type % 26)
+    return letter if copy == 1 else f"{letter}-{copy}"
+
+
+def write_synthetic_cif(cif_path, n_sites, ints_per_com=5, n_types=3, box=1000.0, seed=0, grouped=False):
+    """
+    Writes a synthetic regularized coarse-grained CIF file with about `n_sites` sites.
+
+    Each molecule is one COM followed by `ints_per_com` INT sites within a few Å of it,
+    and molecules cycle through `n_types` chain letters (A, B, C, A-2, B-2, ...).
+    With `grouped`, all copies of a type are written together (A, A-2, ..., B, B-2,
+    ...), which is the order ioNERDSS itself writes.
+
+    Parameters:
+        cif_path (str): Path of the CIF file to write.
+        n_sites (int): Number of ATOM records to write.
+        ints_per_com (int): Number of INT sites per COM.
+        n_types (int): Number of distinct molecule types (chain letters).
+        box (float): Edge length of the cube the COMs are scattered in.
+        seed (int): Random seed, so equal arguments give identical files.
+        grouped (bool): Write the copies of each type contiguously.
+
+    Returns:
+        int: Number of ATOM records written.
+    """
+    rng = random.Random(seed)
+    sites_per_molecule = ints_per_com + 1
+    copies_per_type = -(-n_sites // sites_per_molecule // n_types) or 1
+    lines = []
+    serial = 0
+
+    with open(cif_path, "w") as f:
+        f.write(CIF_HEADER)
+        molecule = 0
+        while serial < n_sites:
+            if grouped:
+                chain = chain_name(molecule // copies_per_type, molecule % copies_per_type + 1)
+            else:
+                chain = chain_name(molecule % n_types, molecule // n_types + 1)
+            cx, cy, cz = rng.uniform(0, box), rng.uniform(0, box), rng.uniform(0, box)
+            for k in range(min(sites_per_molecule, n_sites - serial)):
+                serial += 1
+                if k == 0:
+                    label, element, x, y, z = "COM", "C", cx, cy, cz
+                else:
+                    label, element = "INT", "O"
+                    x, y, z = cx + rng.uniform(-8, 8), cy + rng.uniform(-8, 8), cz + rng.uniform(-8, 8)
+                lines.append(
+                    f"ATOM  {serial:5d}  {label}  MOL {chain} {x:9.3f} {y:8.3f} {z:8.3f}  1.00  0.00  {element}\n"
+                )
+            molecule += 1
+            if len(lines) >= 65536:
+                f.write("".join(lines))
+                lines = []
+        f.write("".join(lines))
+
+    return serial
+
+
+def write_synthetic_model(json_path, n_types, interfaces_per_type=8, state_molecules=0, seed=0):
+    """
+    Writes a synthetic ioNERDSS model.json.
+
+    Every molecule type has `interfaces_per_type` interfaces within a few nm of its
+    COM. With `state_molecules`, the file also carries a "system_state" section
+    (one position and orientation per molecule), like JSON files that store a
+    full simulation snapshot next to the model.
+
+    Parameters:
+        json_path (str): Path of the JSON file to write.
+        n_types (int): Number of entries in `molecule_types`.
+        interfaces_per_type (int): Interfaces per molecule type.
+        state_molecules (int): Molecules in the "system_state" section (0 for none).
+        seed (int): Random seed, so equal arguments give identical files.
+
+    Returns:
+        int: Number of sites (COMs and interfaces) in `molecule_types`.
+    """
+    rng = random.Random(seed)
+
+    def coord():
+        return {"x": round(rng.uniform(-5, 5), 4), "y": round(rng.uniform(-5, 5), 4), "z": round(rng.uniform(-5, 5), 4)}
+
+    with open(json_path, "w") as f:
+        f.write('{"name": "synthetic", "molecule_types": [\n')
+        for t in range(n_types):
+            moltype = {
+                "name": f"M{t}",
+                "diffusion": {"translational": 1.0, "rotational": 0.1},
+                "interfaces": [
+                    {"name": f"M{t}_{k}", "coord": coord(), "states": []} for k in range(interfaces_per_type)
+                ],
+            }
+            f.write(("," if t else "") + json.dumps(moltype) + "\n")
+        f.write("]")
+
+        if state_molecules:
+            f.write(', "system_state": {"molecules": [\n')
+            for m in range(state_molecules):
+                state = {"type": f"M{m % n_types}", "position": coord(), "orientation": [1.0, 0.0, 0.0, 0.0]}
+                f.write(("," if m else "") + json.dumps(state) + "\n")
+            f.write("]}")
+        f.write("}\n")
+
+    return n_types * (interfaces_per_type + 1)
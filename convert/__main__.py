@@ -0,0 +1,7 @@
+# convert/__main__.py
+
+import sys
+
+from convert.cli import main
+
+sys.exit(main())
@@ -0,0 +1,373 @@
+# convert/assemble.py
+
+"""
+Assembly of full simulation systems from an ioNERDSS model.json.
+
+Every entry of `molecule_types` is a rigid template: a COM at the origin plus its
+interfaces. `assemble_system` places N copies of each template in a box (on random
+positions or on a lattice), turns every copy by a random rotation and streams the
+resulting sites to XYZ, PDB, LAMMPS and/or `.bonds` files.
+
+All copies of a batch are built at once: the rotations are a (b, 3, 3) array applied
+to the template with one einsum, and each batch is written with the block writers of
+convert/columnar.py. Only the COM positions of all copies are held in memory, so
+systems of millions of sites are written in seconds. Requires NumPy.
+"""
+
+from collections import namedtuple
+from contextlib import ExitStack
+
+from convert.cif_to_lammps import ATOM_STYLES, atoms_section_title, write_lammps_header
+from convert.cif_to_pdb import ChainIdMap
+from convert.columnar import (
+    AtomColumns, np, require_numpy, write_conect_columns, write_lammps_atoms_columns,
+    write_lammps_bonds_columns, write_pdb_atoms_columns, write_rows, write_xyz_columns,
+)
+from convert.compression import open_file
+from convert.contacts import find_contacts_array
+from convert.json_stream import iter_model_items
+from convert.profiling import profiled, stage
+
+OUTPUT_FORMATS = ("xyz", "pdb", "lammps", "bonds")
+
+PLACEMENTS = ("random", "lattice")
+
+# Number of molecule copies built and written per batch.
+DEFAULT_BATCH_COPIES = 16384
+
+# Placement rounds before a random placement with overlap rejection gives up.
+MAX_PLACEMENT_ROUNDS = 100
+
+MoleculeType = namedtuple("MoleculeType", ["name", "interfaces", "coords"])
+MoleculeType.__doc__ = """
+A rigid molecule template: interface names and an (n_interfaces, 3) array of
+interface coordinates relative to the COM.
+"""
+
+
+def load_molecule_types(json_path):
+    """
+    Reads the molecule templates of an ioNERDSS model.json (streamed, so any system
+    state stored in the file is skipped rather than loaded).
+
+    Returns:
+        list[MoleculeType]: One template per entry of `molecule_types`, in file order.
+    """
+    require_numpy()
+    entries = []  # [name, interface names, interface coordinates]
+    for kind, item in iter_model_items(json_path):
+        if kind == "molecule_type":
+            entries.append([item, [], []])
+        else:
+            coord = item["coord"]
+            entries[-1][1].append(item["name"])
+            entries[-1][2].append((coord["x"], coord["y"], coord["z"]))
+    return [
+        MoleculeType(name, names, np.array(coords, dtype=np.float64).reshape(-1, 3))
+        for name, names, coords in entries
+    ]
+
+
+def random_rotations(rng, n):
+    """
+    Draws `n` rotation matrices uniformly from SO(3) (Shoemake's unit quaternions).
+
+    Returns:
+        ndarray, shape (n, 3, 3)
+    """
+    u1, u2, u3 = rng.random((3, n))
+    a, b = np.sqrt(1.0 - u1), np.sqrt(u1)
+    x, y = a * np.sin(2 * np.pi * u2), a * np.cos(2 * np.pi * u2)
+    z, w = b * np.sin(2 * np.pi * u3), b * np.cos(2 * np.pi * u3)
+    return np.stack([
+        1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w),
+        2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w),
+        2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y),
+    ], axis=-1).reshape(n, 3, 3)
+
+
+def _cell_keys(points, cell, offset=(0, 0, 0)):
+    """
+    Integer keys of the cubic cells (edge `cell`) holding `points`, shifted by `offset` cells.
+    """
+    c = np.floor(points / cell).astype(np.int64) + 1 + np.asarray(offset)
+    return (c[:, 0] << 42) + (c[:, 1] << 21) + c[:, 2]
+
+
+def place_random(rng, n, box, min_distance=None):
+    """
+    Draws `n` COM positions uniformly in [0, box).
+
+    With `min_distance`, positions closer than that to an earlier one are rejected
+    and redrawn: every round draws the missing positions at once, finds the close
+    pairs with a cell list and keeps a candidate only if no earlier kept position is
+    within reach. Later rounds only compare the new candidates with the kept
+    positions in neighbouring cells, and every round draws some spare candidates.
+    Distances are not measured across periodic boundaries.
+
+    Raises:
+        ValueError: If the positions do not fit after MAX_PLACEMENT_ROUNDS rounds, or a
+            round cannot add any position.
+    """
+    box = np.asarray(box, dtype=np.float64)
+    if not min_distance:
+        return rng.random((n, 3)) * box
+
+    points = np.empty((0, 3))
+    for _ in range(MAX_PLACEMENT_ROUNDS):
+        missing = n - len(points)
+        if missing == 0:
+            return points
+        # Draw a few spare candidates so rejections rarely need another round
+        candidates = rng.random((missing + missing // 8 + 16, 3)) * box
+        if len(points):
+            reach = np.sort(np.concatenate([
+                _cell_keys(candidates, min_distance, (dx, dy, dz))
+                for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+            ]))
+            keys = _cell_keys(points, min_distance)
+            found = np.minimum(np.searchsorted(reach, keys), len(reach) - 1)
+            nearby = points[reach[found] == keys]
+        else:
+            nearby = points
+        i, j = find_contacts_array(np.concatenate([nearby, candidates]), min_distance)
+
+        # Visit pairs by their later point, so the earlier point's fate is final;
+        # kept positions come first and never conflict with each other
+        keep = np.ones(len(nearby) + len(candidates), dtype=bool)
+        order = np.lexsort((i, j))
+        for first, second in zip(i[order].tolist(), j[order].tolist()):
+            if keep[first]:
+                keep[second] = False
+        added = candidates[keep[len(nearby):]][:missing]
+        if len(added) == 0:
+            break  # the box is jammed
+        points = np.concatenate([points, added])
+    if len(points) < n:
+        raise ValueError(
+            f"placed only {len(points)} of {n} molecules {min_distance} apart in box {box.tolist()}; "
+            "use a larger box, fewer copies or lattice placement"
+        )
+    return points
+
+
+def place_lattice(rng, n, box, min_distance=None):
+    """
+    Places `n` COMs on the sites of a simple lattice filling the box, chosen at random
+    among the lattice sites (so different molecule types are mixed).
+
+    Raises:
+        ValueError: If the lattice spacing is smaller than `min_distance`.
+    """
+    box = np.asarray(box, dtype=np.float64)
+    per_axis = np.maximum(np.ceil(box * (n / box.prod()) ** (1 / 3)).astype(np.int64), 1)
+    while per_axis.prod() < n:
+        per_axis[np.argmax(box / per_axis)] += 1
+    spacing = box / per_axis
+    if min_distance and spacing.min() < min_distance:
+        raise ValueError(f"lattice spacing {spacing.min():.3f} is below min_distance {min_distance}")
+
+    sites = rng.permutation(int(per_axis.prod()))[:n]
+    grid = np.stack(np.unravel_index(sites, per_axis), axis=1)
+    return (grid + 0.5) * spacing
+
+
+def _batch_columns(mtype, positions, rotations, first_serial, first_copy):
+    """
+    Builds the sites of a batch of copies of one template (COM first, then its
+    interfaces) as AtomColumns. Elements are the template names, as in
+    ionerdss_json_to_xyz; chains are named like ioNERDSS CIF chains ("A", "A-2", ...).
+    """
+    b, k = len(positions), len(mtype.interfaces)
+    template = np.concatenate([np.zeros((1, 3)), mtype.coords])
+    if rotations is not None:
+        coords = np.einsum("bij,kj->bki", rotations, template)
+    else:
+        coords = np.broadcast_to(template, (b, k + 1, 3)).copy()
+    coords += positions[:, None, :]
+
+    n = b * (k + 1)
+    site = np.tile(np.arange(k + 1, dtype=np.int32), b)
+    chains = [mtype.name if c == 0 else f"{mtype.name}-{c + 1}" for c in range(first_copy, first_copy + b)]
+    return AtomColumns(
+        serial=np.arange(first_serial, first_serial + n),
+        coords=coords.reshape(n, 3),
+        occupancy=np.ones(n),
+        bfactor=np.zeros(n),
+        label_codes=np.minimum(site, 1),
+        labels=["COM", "INT"],
+        resname_codes=np.zeros(n, dtype=np.int32),
+        resnames=[mtype.name],
+        chain_codes=np.repeat(np.arange(b, dtype=np.int32), k + 1),
+        chains=chains,
+        element_codes=site,
+        elements=[mtype.name] + mtype.interfaces,
+    )
+
+
+def _iter_bonds(types, counts, batch_copies):
+    """
+    Yields 0-based (com_index, int_index) arrays, batch by batch in output order.
+    """
+    start = 0
+    for mtype, count in zip(types, counts):
+        size = len(mtype.interfaces) + 1
+        for first in range(0, count, batch_copies):
+            b = min(batch_copies, count - first)
+            coms = start + (first + np.arange(b)) * size
+            yield np.repeat(coms, size - 1), (coms[:, None] + np.arange(1, size)).reshape(-1)
+        start += count * size
+
+
+@profiled(inputs=("json_path",), outputs=("outputs",))
+def assemble_system(json_path, copies, box, outputs, placement="random", rotate=True, min_distance=None,
+                    seed=None, atom_style="molecular", batch_copies=DEFAULT_BATCH_COPIES, compress_level=None,
+                    write_queue=None):
+    """
+    Replicates the molecule types of a model.json into a box and writes the system.
+
+    Parameters:
+        json_path (str): ioNERDSS model.json.
+        copies (int or dict): Copies per molecule type; an int applies to every type,
+            a dict maps type names to counts (missing types get none).
+        box (float or sequence): Box edge length(s); the box spans [0, box).
+        outputs (dict): Maps output format ("xyz", "pdb", "lammps", "bonds") to a path.
+        placement (str): "random" (uniform) or "lattice" (random lattice sites).
+        rotate (bool): Turn every copy by a uniformly random rotation.
+        min_distance (float, optional): Minimum COM-COM distance between copies.
+        seed (int, optional): Seed of the random generator, for reproducible systems.
+        atom_style (str): LAMMPS atom style; molecule IDs number the copies and COM
+            and interface sites get atom types 1 and 2.
+        batch_copies (int): Copies built and written at once, bounding memory.
+        compress_level (int, optional): Compression level (0-9) of .gz/.bz2/.xz
+            outputs (see convert/compression.py).
+        write_queue (int, optional): Write the outputs from a background thread,
+            queueing up to this many blocks (see convert/async_writer.py).
+
+    Returns:
+        int: Number of sites written.
+    """
+    require_numpy()
+    unknown = set(outputs) - set(OUTPUT_FORMATS)
+    if unknown:
+        raise ValueError(f"unsupported output format(s): {', '.join(sorted(unknown))}")
+    if placement not in PLACEMENTS:
+        raise ValueError(f"placement must be one of {', '.join(PLACEMENTS)}, got {placement!r}")
+    title = atoms_section_title(atom_style)
+
+    with stage("load"):
+        types = load_molecule_types(json_path)
+    if isinstance(copies, int):
+        counts = [copies] * len(types)
+    else:
+        counts = [copies.get(mtype.name, 0) for mtype in types]
+    box = np.broadcast_to(np.asarray(box, dtype=np.float64), 3)
+
+    rng = np.random.default_rng(seed)
+    place = place_random if placement == "random" else place_lattice
+    with stage("placement"):
+        positions = place(rng, sum(counts), box, min_distance)
+
+    n_sites = sum(count * (len(mtype.interfaces) + 1) for mtype, count in zip(types, counts))
+    n_bonds = sum(count * len(mtype.interfaces) for mtype, count in zip(types, counts))
+    chain_ids = ChainIdMap()
+
+    # Through the context managers, a failed assembly keeps any previous outputs
+    with ExitStack() as stack:
+        files = {fmt: stack.enter_context(open_file(path, "w", compress_level, write_queue))
+                 for fmt, path in outputs.items()}
+        if "xyz" in files:
+            files["xyz"].write(f"{n_sites}\nAssembled from ioNERDSS JSON\n")
+        if "lammps" in files:
+            write_lammps_header(files["lammps"], n_sites, n_bonds, (0.0, 0.0, 0.0), box,
+                                n_atom_types=2, padding=0.0)
+            files["lammps"].write(title)
+
+        serial, copy_index = 1, 0
+        for mtype, count in zip(types, counts):
+            for first in range(0, count, batch_copies):
+                b = min(batch_copies, count - first)
+                with stage("build"):
+                    rotations = random_rotations(rng, b) if rotate else None
+                    cols = _batch_columns(mtype, positions[copy_index:copy_index + b], rotations, serial, first)
+
+                with stage("format"):
+                    if "xyz" in files:
+                        write_xyz_columns(files["xyz"], cols)
+                    if "pdb" in files:
+                        # CIF-style elements and three-letter residue names for PDB
+                        cols.elements = ["C"] + ["O"] * len(mtype.interfaces)
+                        cols.resnames = [mtype.name[:3]]
+                        write_pdb_atoms_columns(files["pdb"], cols, chain_ids)
+                    if "lammps" in files:
+                        write_lammps_atoms_columns(
+                            files["lammps"], cols, cols.label_codes + 1,
+                            copy_index + 1 + cols.chain_codes, atom_style, first_id=serial,
+                        )
+                serial += len(cols)
+                copy_index += b
+
+        bond_id = 1
+        if "lammps" in files:
+            files["lammps"].write("\nBonds\n\n")
+        with stage("bonds"):
+            for coms, ints in _iter_bonds(types, counts, batch_copies):
+                if "pdb" in files:
+                    write_conect_columns(files["pdb"], coms + 1, ints + 1)
+                if "lammps" in files:
+                    write_lammps_bonds_columns(files["lammps"], coms, ints, first_id=bond_id)
+                if "bonds" in files:
+                    write_rows(files["bonds"], "%d %d\n", [coms, ints])
+                bond_id += len(coms)
+
+    return n_sites
+
+
+def main(argv=None):
+    import argparse
+
+    from convert.cli import add_io_arguments, io_options_from_args
+
+    def parse_copies(text):
+        if "=" not in text:
+            return int(text)
+        return {name: int(count) for name, count in (item.split("=") for item in text.split(","))}
+
+    parser = argparse.ArgumentParser(description="Assemble a simulation box from an ioNERDSS model.json.")
+    parser.add_argument("input_json")
+    parser.add_argument("--copies", type=parse_copies, required=True,
+                        help="copies per molecule type: N for every type, or NAME=N,NAME=N")
+    parser.add_argument("--box", required=True, help="box edge length L, or Lx,Ly,Lz")
+    parser.add_argument("--placement", choices=PLACEMENTS, default="random")
+    parser.add_argument("--no-rotate", action="store_true", help="keep every copy in the template orientation")
+    parser.add_argument("--min-distance", type=float, help="minimum COM-COM distance between copies")
+    parser.add_argument("--seed", type=int, help="random seed")
+    parser.add_argument("--atom-style", choices=list(ATOM_STYLES), default="molecular", help="LAMMPS atom style")
+    for fmt in OUTPUT_FORMATS:
+        parser.add_argument(f"--{fmt}", help=f"{fmt} output path")
+    add_io_arguments(parser, parse_workers=False)
+    args = parser.parse_args(argv)
+
+    io_options = io_options_from_args(args)
+
+    requested = {fmt: getattr(args, fmt) for fmt in OUTPUT_FORMATS if getattr(args, fmt)}
+    if not requested:
+        parser.error("at least one output (--xyz, --pdb, --lammps, --bonds) is required")
+
+    n_sites = assemble_system(
+        args.input_json, args.copies, [float(v) for v in args.box.split(",")], requested,
+        args.placement, not args.no_rotate, args.min_distance, args.seed, args.atom_style, **io_options,
+    )
+    print(f"Assembled {n_sites} sites from {args.input_json}")
+    for path in requested.values():
+        print(f"  → {path}")
+    return 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# convert/async_writer.py
+
+"""
+Background-thread output for the converters.
+
+An AsyncWriter wraps an open text file. `write` only collects the text in a
+buffer, and every BLOCK_CHARS characters the buffer is joined and handed over a
+bounded queue to a writer thread. That thread does the actual file writes, and the
+compression of .gz/.bz2/.xz outputs, while the converter keeps parsing and
+formatting. zlib, bz2, lzma and file writes release the GIL, so the two really
+overlap, and a conversion takes roughly max(parse + format, write) instead of
+their sum. When the queue is full, `write` blocks, so at most `queue_size` blocks
+are held in memory.
+
+Converters do not use this class directly: given a `write_queue` (the CLIs'
+`--async-write`), they pass it to `open_file`, which returns an AsyncWriter for
+every output.
+"""
+
+import queue
+import threading
+
+from convert.compression import DEFAULT_WRITE_QUEUE
+
+# Characters collected before a block is queued
+BLOCK_CHARS = 1 << 20
+
+
+class AsyncWriter:
+    """
+    File-like wrapper that writes to `file` from a background thread.
+
+    Parameters:
+        file (file): Open text file; closed by `close`.
+        queue_size (int): Maximum number of blocks waiting to be written.
+        block_chars (int): Characters collected per block.
+
+    An error raised by the writer thread is re-raised by the next `write` or by
+    `close`. Used as a context manager, an exception discards the file instead of
+    closing it (see `discard`).
+    """
+
+    def __init__(self, file, queue_size=DEFAULT_WRITE_QUEUE, block_chars=BLOCK_CHARS):
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be positive, got {queue_size}")
+        self.file = file
+        self.block_chars = block_chars
+        self.buffer = []
+        self.buffered = 0
+        self.error = None
+        self.closed = False
+        self.queue = queue.Queue(queue_size)
+        self.thread = threading.Thread(target=self._run, name="AsyncWriter", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            block = self.queue.get()
+            if block is None:
+                return
+            if self.error is None:
+                try:
+                    self.file.write(block)
+                except BaseException as exc:
+                    # Keep draining the queue so that the producer never blocks
+                    self.error = exc
+
+    def _check(self):
+        if self.error is not None:
+            raise self.error
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.block_chars:
+            self._flush_buffer()
+        return len(text)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def _flush_buffer(self):
+        self._check()
+        if self.buffer:
+            self.queue.put("".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+    def close(self):
+        """
+        Writes the remaining text, waits for the writer thread and closes the file.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.error is None:
+                self._flush_buffer()
+        finally:
+            self.queue.put(None)
+            self.thread.join()
+            self.file.close()
+        self._check()
+
+    def discard(self):
+        """
+        Drops the remaining text, waits for the writer thread and discards the file:
+        a ReplacingFile leaves its previous output in place, other files are closed.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.buffer = []
+        try:
+            self.queue.put(None)
+            self.thread.join()
+        finally:
+            discard = getattr(self.file, "discard", None)
+            if discard is not None:
+                discard()
+            else:
+                self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -0,0 +1,266 @@
+# convert/batch.py
+
+import glob
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from convert.cache import DEFAULT_MAX_BYTES, ConversionCache
+from convert.cif_reader import BINARY_SUFFIX
+from convert.compression import COMPRESSION_SUFFIXES, strip_compression
+from convert.fanout import convert_many
+from convert.ionerdss_json_to_xyz import ionerdss_json_to_xyz
+from convert.selection import CHAIN_INDEX_SUFFIX
+from convert.watch import STATE_SUFFIX
+
+# Output format -> file extension, per input kind.
+CIF_TARGETS = {"xyz": ".xyz", "pdb": ".pdb", "lammps": ".lmp", "bonds": ".bonds"}
+JSON_TARGETS = {"xyz": ".xyz", "bonds": ".bonds"}
+
+Job = namedtuple("Job", ["kind", "input_path", "outputs", "columnar", "cache", "compress_level"], defaults=[None, None])
+JobResult = namedtuple("JobResult", ["input_path", "atoms", "error", "cache_hits", "cache_misses"], defaults=[0, 0])
+BatchSummary = namedtuple(
+    "BatchSummary",
+    ["converted", "skipped", "failed", "atoms", "elapsed", "failures", "cache_hits", "cache_misses"],
+    defaults=[0, 0],
+)
+
+
+def find_inputs(patterns):
+    """
+    Expands directories and glob patterns into a sorted list of .cif and .json files,
+    compressed ones (".cif.gz", ".json.xz", ...) included.
+
+    Directories are searched recursively; glob patterns may use "**" and may also
+    match binary `.npz` files (see convert/binary.py), which are converted like CIFs.
+    Chain indexes (see convert/selection.py) and watch state files are not inputs
+    and are skipped.
+    """
+    found = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for ext in ("cif", "json"):
+                for suffix in ("",) + COMPRESSION_SUFFIXES:
+                    found.update(glob.glob(os.path.join(pattern, "**", f"*.{ext}{suffix}"), recursive=True))
+        else:
+            found.update(
+                p for p in glob.glob(pattern, recursive=True)
+                if strip_compression(p).endswith((".cif", ".json")) or p.endswith(BINARY_SUFFIX)
+            )
+    return sorted(p for p in found if not p.endswith((CHAIN_INDEX_SUFFIX, STATE_SUFFIX)))
+
+
+def is_up_to_date(input_path, output_path):
+    """
+    Returns True if `output_path` exists and is newer than `input_path`.
+    """
+    return os.path.exists(output_path) and os.path.getmtime(output_path) > os.path.getmtime(input_path)
+
+
+def plan_jobs(inputs, targets, output_dir=None, force=False, columnar=False, cache=None,
+              compress=None, compress_level=None):
+    """
+    Builds one Job per input file that has at least one missing or stale output.
+
+    Parameters:
+        inputs (list[str]): CIF and JSON input paths.
+        targets (iterable[str]): Requested output formats; each input only gets the
+            formats its converter supports (JSON inputs: xyz and bonds).
+        output_dir (str, optional): Directory that mirrors the input tree; by default
+            outputs are written next to their inputs.
+        force (bool): Reconvert even when the outputs are up to date.
+        columnar (bool): Use the NumPy columnar backend for CIF inputs.
+        cache (tuple, optional): (cache_dir, max_bytes) of a ConversionCache to use.
+        compress (str, optional): "gz", "bz2" or "xz" to write compressed outputs.
+        compress_level (int, optional): Compression level of the outputs.
+
+    Returns:
+        tuple[list[Job], int]: The jobs to run and the number of inputs skipped.
+
+    Raises:
+        ValueError: If two inputs map to the same output (e.g. "model.cif" and
+            "model.json" both give "model.xyz").
+    """
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in inputs]) if inputs else ""
+    jobs = []
+    skipped = 0
+    planned = {}  # output path -> input path
+    for input_path in inputs:
+        kind = "json" if strip_compression(input_path).endswith(".json") else "cif"
+        supported = JSON_TARGETS if kind == "json" else CIF_TARGETS
+        wanted = [fmt for fmt in targets if fmt in supported]
+        if kind == "json" and "xyz" not in wanted:
+            wanted = []
+        if not wanted:
+            skipped += 1
+            continue
+
+        stem = os.path.splitext(strip_compression(input_path))[0]
+        if output_dir:
+            stem = os.path.join(output_dir, os.path.relpath(os.path.abspath(stem), root))
+        suffix = f".{compress}" if compress else ""
+        outputs = {fmt: stem + supported[fmt] + suffix for fmt in wanted}
+        for path in outputs.values():
+            other = planned.setdefault(os.path.abspath(path), input_path)
+            if other != input_path:
+                raise ValueError(f"{other} and {input_path} would both be converted to {path}")
+
+        if not force and all(is_up_to_date(input_path, path) for path in outputs.values()):
+            skipped += 1
+            continue
+        jobs.append(Job(kind, input_path, outputs, columnar, cache, compress_level))
+    return jobs, skipped
+
+
+def convert_cif(cif_path, xyz_path=None, pdb_path=None, lammps_path=None, bonds_path=None, columnar=False,
+                compress_level=None):
+    """
+    convert_many with one positional argument per output, as ConversionCache expects.
+    """
+    outputs = {"xyz": xyz_path, "pdb": pdb_path, "lammps": lammps_path, "bonds": bonds_path}
+    return convert_many(cif_path, outputs, columnar=columnar, compress_level=compress_level)
+
+
+def run_job(job):
+    """
+    Runs one conversion; errors are captured in the result instead of raised.
+    """
+    cache = ConversionCache(*job.cache) if job.cache else None
+    try:
+        for path in job.outputs.values():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if job.kind == "json":
+            converter, outputs, options = ionerdss_json_to_xyz, [job.outputs["xyz"], job.outputs.get("bonds")], {}
+        else:
+            converter, outputs = convert_cif, [job.outputs.get(fmt) for fmt in CIF_TARGETS]
+            options = {"columnar": job.columnar}
+        if job.compress_level is not None:
+            options["compress_level"] = job.compress_level
+        if cache:
+            atoms = cache.convert(converter, job.input_path, *outputs, **options)
+        else:
+            atoms = converter(job.input_path, *outputs, **options)
+        error = None
+    except Exception as exc:
+        atoms, error = 0, f"{type(exc).__name__}: {exc}"
+    if cache:
+        return JobResult(job.input_path, atoms, error, cache.hits, cache.misses)
+    return JobResult(job.input_path, atoms, error)
+
+
+def run_batch(inputs, targets=("xyz",), workers=None, output_dir=None, force=False, columnar=False,
+              cache_dir=None, cache_size=DEFAULT_MAX_BYTES, compress=None, compress_level=None, report=print):
+    """
+    Converts many CIF/JSON files in parallel with a process pool.
+
+    Parameters:
+        inputs (list[str]): Input files (see find_inputs).
+        targets (iterable[str]): Output formats, any of "xyz", "pdb", "lammps", "bonds".
+        workers (int, optional): Number of worker processes; defaults to the CPU count.
+            With 1 worker the conversions run in the calling process.
+        output_dir (str, optional): Directory that mirrors the input tree.
+        force (bool): Reconvert even when the outputs are up to date.
+        columnar (bool): Use the NumPy columnar backend for CIF inputs.
+        cache_dir (str, optional): Directory of a ConversionCache shared by the workers.
+        cache_size (int): Size limit of the cache in bytes.
+        compress (str, optional): "gz", "bz2" or "xz" to write compressed outputs
+            (e.g. "input.xyz.gz").
+        compress_level (int, optional): Compression level (0-9) of the outputs.
+        report (callable): Called with one message per failed file.
+
+    Returns:
+        BatchSummary: Counts, total atoms, wall time and (path, error) failures.
+    """
+    unknown = sorted(set(targets) - set(CIF_TARGETS))
+    if unknown:
+        raise ValueError(f"Unsupported output format(s): {', '.join(unknown)}")
+    if compress and f".{compress}" not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {compress}")
+
+    start = time.perf_counter()
+    cache = (cache_dir, cache_size) if cache_dir else None
+    jobs, skipped = plan_jobs(inputs, targets, output_dir, force, columnar, cache, compress, compress_level)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [run_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_job, job) for job in jobs]
+            results = [future.result() for future in as_completed(futures)]
+
+    failures = sorted((r.input_path, r.error) for r in results if r.error)
+    for path, error in failures:
+        report(f"FAILED {path}: {error}")
+
+    return BatchSummary(
+        converted=len(results) - len(failures),
+        skipped=skipped,
+        failed=len(failures),
+        atoms=sum(r.atoms for r in results),
+        elapsed=time.perf_counter() - start,
+        failures=failures,
+        cache_hits=sum(r.cache_hits for r in results),
+        cache_misses=sum(r.cache_misses for r in results),
+    )
+
+
+def format_summary(summary):
+    """
+    Formats a BatchSummary as a one-line throughput report.
+    """
+    elapsed = max(summary.elapsed, 1e-9)
+    line = (
+        f"Converted {summary.converted} files ({summary.skipped} skipped, {summary.failed} failed) "
+        f"in {summary.elapsed:.2f} s: {summary.converted / elapsed:.1f} files/s, "
+        f"{summary.atoms / elapsed:.0f} atoms/s"
+    )
+    if summary.cache_hits or summary.cache_misses:
+        line += f"; cache: {summary.cache_hits} hits, {summary.cache_misses} misses"
+    return line
+
+
+def main(argv=None):
+    import argparse
+
+    from convert import profiling
+
+    parser = argparse.ArgumentParser(description="Batch-convert ioNERDSS .cif and model.json files.")
+    parser.add_argument("inputs", nargs="+", help="directories (searched recursively) or glob patterns")
+    parser.add_argument("--to", default="xyz",
+                        help="comma-separated output formats: xyz, pdb, lammps, bonds (default: xyz)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output-dir", help="write outputs under this directory instead of next to inputs")
+    parser.add_argument("-f", "--force", action="store_true", help="reconvert even if outputs are up to date")
+    parser.add_argument("--columnar", action="store_true", help="use the NumPy columnar backend for CIF inputs")
+    parser.add_argument("--cache-dir", help="reuse outputs of identical inputs from this content-hash cache")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2,
+                        help="cache size limit in MiB (default: %(default)s)")
+    parser.add_argument("--compress", choices=[s[1:] for s in COMPRESSION_SUFFIXES],
+                        help="write compressed outputs (e.g. output.xyz.gz)")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        help="compression level of the outputs")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="LOG",
+                        help="report per-stage timings as JSON lines to LOG (default: stderr)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        profiling.enable(log=args.profile)
+    targets = [fmt.strip() for fmt in args.to.split(",") if fmt.strip()]
+    summary = run_batch(
+        find_inputs(args.inputs), targets, args.workers, args.output_dir, args.force, args.columnar,
+        cache_dir=args.cache_dir, cache_size=args.cache_size * 1024 ** 2,
+        compress=args.compress, compress_level=args.compress_level,
+    )
+    print(format_summary(summary))
+    return 1 if summary.failed else 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
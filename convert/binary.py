@@ -0,0 +1,199 @@
+# convert/binary.py
+
+"""
+Binary intermediate format for parsed CIF files.
+
+A CIF file is parsed once into its columns (see convert/columnar.py) and saved as an
+uncompressed NumPy `.npz` archive together with the COM-INT bond index of every
+converter rule. Because the archive members are stored uncompressed, later runs
+memory-map the arrays in place instead of reading or parsing anything, so loading
+costs milliseconds regardless of the system size.
+
+Every converter in `convert/` accepts a `.npz` path wherever it accepts a CIF path:
+
+    python -m convert.binary input.cif input.npz
+    python -m convert.cif_to_pdb input.npz output.pdb
+
+The archive is a plain `.npz`, so `numpy.load` reads it as well.
+"""
+
+import struct
+import zipfile
+
+from convert.cif_reader import BINARY_SUFFIX, DEFAULT_CHUNK_SIZE, AtomSite
+from convert.columnar import (
+    AtomColumns, chain_bonds, np, preceding_resname_bonds, read_cif_columns,
+    require_numpy, residue_chain_bonds,
+)
+from convert.profiling import profiled, stage
+
+# Bumped whenever the set or meaning of the stored arrays changes.
+FORMAT_VERSION = 1
+
+# Converter rule name -> function computing its COM-INT bond index.
+BOND_RULES = {
+    "chain": chain_bonds,
+    "residue_chain": residue_chain_bonds,
+    "preceding_resname": preceding_resname_bonds,
+}
+
+_ARRAYS = ("serial", "coords", "occupancy", "bfactor",
+           "label_codes", "resname_codes", "chain_codes", "element_codes")
+_TABLES = ("labels", "resnames", "chains", "elements")
+
+# Size of the fixed part of a zip local file header.
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+
+
+@profiled(inputs=("cif_path",), outputs=("npz_path",))
+def write_binary(cif_path, npz_path, parse_workers=None):
+    """
+    Parses a CIF file and saves its columns and bond indices as an `.npz` archive.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file.
+        npz_path (str): Path to the output archive; must end with ".npz".
+        parse_workers (int, optional): Parse the CIF file with this many processes
+            (see convert/sharding.py).
+
+    Returns:
+        int: Number of atoms stored.
+    """
+    if not npz_path.endswith(BINARY_SUFFIX):
+        raise ValueError(f"binary output path must end with {BINARY_SUFFIX}: {npz_path}")
+    with stage("parse"):
+        cols = read_cif_columns(cif_path, workers=parse_workers)
+
+    arrays = {name: getattr(cols, name) for name in _ARRAYS}
+    for name in _TABLES:
+        arrays[name] = np.array(getattr(cols, name), dtype=str)
+    with stage("bonds"):
+        for rule, bonds in BOND_RULES.items():
+            arrays[f"bonds_{rule}"] = np.stack(bonds(cols)).astype(np.int64)
+    arrays["format_version"] = np.array(FORMAT_VERSION)
+
+    with stage("write"):
+        np.savez(npz_path, **arrays)
+    return len(cols)
+
+
+def _member_offsets(npz_path):
+    """
+    Returns {member name: byte offset of its data} for the stored (uncompressed)
+    members of a zip archive, or None if any member is compressed.
+    """
+    offsets = {}
+    with zipfile.ZipFile(npz_path) as archive, open(npz_path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return None
+            f.seek(info.header_offset)
+            signature, name_length, extra_length = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+            if signature != b"PK\x03\x04":
+                raise ValueError(f"corrupt archive member {info.filename} in {npz_path}")
+            offsets[info.filename] = info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+    return offsets
+
+
+def _memmap_member(npz_path, offset):
+    """
+    Memory-maps the .npy array that starts at `offset` in the archive.
+    """
+    with open(npz_path, "rb") as f:
+        f.seek(offset)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+    if dtype.hasobject:
+        raise ValueError(f"{npz_path} contains object arrays and cannot be memory-mapped")
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(npz_path, dtype=dtype, mode="r", offset=data_offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def load_binary(npz_path, mmap=True):
+    """
+    Loads an archive written by write_binary as an AtomColumns instance.
+
+    Parameters:
+        npz_path (str): Path to the `.npz` archive.
+        mmap (bool): Memory-map the arrays (read-only) instead of reading them.
+
+    Returns:
+        AtomColumns: The stored records, with the bond indices attached as `bonds`
+        so that the bond functions in convert.columnar return them directly.
+    """
+    require_numpy()
+    offsets = _member_offsets(npz_path) if mmap else None
+    with np.load(npz_path, allow_pickle=False) as archive:
+        version = int(archive["format_version"])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{npz_path} has binary format version {version}, expected {FORMAT_VERSION}")
+
+        def array(name):
+            if offsets is None:
+                return archive[name]
+            return _memmap_member(npz_path, offsets[name + ".npy"])
+
+        columns = {name: array(name) for name in _ARRAYS}
+        tables = {name: archive[name].tolist() for name in _TABLES}
+        bonds = {rule: tuple(array(f"bonds_{rule}")) for rule in BOND_RULES}
+
+    return AtomColumns(**columns, **tables, bonds=bonds)
+
+
+def count_binary_sites(npz_path):
+    """
+    Returns the number of atoms stored in an archive without loading it.
+    """
+    return len(load_binary(npz_path))
+
+
+def iter_binary_chunks(npz_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams the records of an archive as lists of at most `chunk_size` AtomSite
+    tuples, like cif_reader.iter_atom_chunks does for CIF files.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    cols = load_binary(npz_path)
+    for start in range(0, len(cols), chunk_size):
+        stop = start + chunk_size
+        x, y, z = cols.coords[start:stop].T.tolist()
+        yield list(map(
+            AtomSite,
+            cols.serial[start:stop].tolist(),
+            [cols.labels[c] for c in cols.label_codes[start:stop].tolist()],
+            [cols.resnames[c] for c in cols.resname_codes[start:stop].tolist()],
+            [cols.chains[c] for c in cols.chain_codes[start:stop].tolist()],
+            x, y, z,
+            cols.occupancy[start:stop].tolist(),
+            cols.bfactor[start:stop].tolist(),
+            [cols.elements[c] for c in cols.element_codes[start:stop].tolist()],
+        ))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse a CIF file once into a memory-mappable .npz archive.")
+    parser.add_argument("input_cif")
+    parser.add_argument("output_npz")
+    args = parser.parse_args(argv)
+
+    n_atoms = write_binary(args.input_cif, args.output_npz)
+    print(f"Stored {n_atoms} atoms from {args.input_cif} → {args.output_npz}")
+    return 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# convert/cache.py
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from convert.compression import compression_level, compression_suffix
+
+# Default size limit of the cache directory (bytes).
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+_HASH_BLOCK = 1 << 20
+_RESULT_FILE = "result.json"
+
+# Converter options left out of the key: the compression level is keyed per output,
+# and the others do not change the output bytes.
+_IO_OPTIONS = ("compress_level", "write_queue", "parse_workers")
+
+
+class ConversionCache:
+    """
+    On-disk cache of converter outputs, keyed by the content hash of the input file
+    plus the converter name, its options and which outputs were requested.
+
+    Every entry is a directory under `cache_dir` holding one file per output and the
+    converter's return value. A cache hit copies (or hardlinks) the stored outputs to
+    the requested paths instead of running the converter. Entries are evicted in
+    least-recently-used order once the directory grows past `max_bytes`; the entry
+    directory's mtime records its last use, so several processes can share a cache.
+
+    With `link=True` hits are hardlinked instead of copied, so a restored output
+    shares storage with the cache entry. The converters write every output to a
+    temporary file and rename it over the old one (see compression.open_file), so
+    rewriting the output never changes the entry; editing it in place (or appending
+    to it) would. Entries are always stored as copies, never as links to the
+    outputs of a miss.
+
+    Example:
+        cache = ConversionCache("~/.cache/formatconvert")
+        cache.convert(cif_to_xyz, "input.cif", "output.xyz", "output.bonds")
+        print(cache.stats())
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, link=False):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._digests = {}  # (path, size, mtime_ns) -> sha256 hex digest
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def file_digest(self, path):
+        """
+        Returns the SHA-256 hex digest of a file's content, memoized per size and mtime.
+        """
+        st = os.stat(path)
+        memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                    h.update(block)
+            digest = self._digests[memo_key] = h.hexdigest()
+        return digest
+
+    def key(self, converter, input_path, output_paths, options):
+        """
+        Returns the cache key of one conversion.
+        """
+        level = options.get("compress_level")
+        description = json.dumps({
+            "input": self.file_digest(input_path),
+            "converter": f"{converter.__module__}.{converter.__qualname__}",
+            # Compressed and plain outputs, and compression levels, give different bytes
+            "outputs": [
+                None if path is None else
+                [compression_suffix(path) or "", compression_level(compression_suffix(path), level)]
+                for path in output_paths
+            ],
+            "options": {name: value for name, value in options.items() if name not in _IO_OPTIONS},
+        }, sort_keys=True, default=repr)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def convert(self, converter, input_path, *output_paths, **options):
+        """
+        Runs `converter(input_path, *output_paths, **options)` through the cache.
+
+        Output paths given as None are passed through as None and not cached.
+
+        Returns:
+            The converter's return value (stored with the entry on a miss).
+        """
+        entry = os.path.join(self.cache_dir, self.key(converter, input_path, output_paths, options))
+
+        if os.path.isdir(entry):
+            try:
+                result = self._restore(entry, output_paths)
+            except FileNotFoundError:
+                pass  # evicted by another process while we were reading it
+            else:
+                self.hits += 1
+                os.utime(entry)
+                return result
+
+        self.misses += 1
+        result = converter(input_path, *output_paths, **options)
+        self._store(entry, output_paths, result)
+        self.evict()
+        return result
+
+    def _place(self, source, destination):
+        if self.link:
+            if os.path.lexists(destination):
+                os.remove(destination)
+            try:
+                os.link(source, destination)
+                return
+            except OSError:
+                pass  # e.g. cache and output on different filesystems
+        shutil.copyfile(source, destination)
+
+    def _restore(self, entry, output_paths):
+        with open(os.path.join(entry, _RESULT_FILE), "r") as f:
+            result = json.load(f)
+        for index, path in enumerate(output_paths):
+            if path is not None:
+                self._place(os.path.join(entry, str(index)), path)
+        return result
+
+    def _store(self, entry, output_paths, result):
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            for index, path in enumerate(output_paths):
+                if path is not None:
+                    # A copy: the caller may still edit the output in place
+                    shutil.copyfile(path, os.path.join(staging, str(index)))
+            with open(os.path.join(staging, _RESULT_FILE), "w") as f:
+                json.dump(result, f)
+            os.rename(staging, entry)
+        except OSError:
+            # Another process stored the same entry first, or the cache is unwritable;
+            # the conversion itself already succeeded.
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _entries(self):
+        """
+        Returns (last_used, size_bytes, path) for every complete cache entry.
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for d in it:
+                if d.name.startswith(".") or not d.is_dir():
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(d.path))
+                    entries.append((d.stat().st_mtime, size, d.path))
+                except FileNotFoundError:
+                    continue
+        return entries
+
+    def evict(self):
+        """
+        Removes least-recently-used entries until the cache fits in `max_bytes`.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes every cache entry.
+        """
+        for _, _, path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self):
+        """
+        Returns hit/miss/eviction counters of this instance and the cache's current size.
+        """
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+        }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clear a conversion cache.")
+    parser.add_argument("action", choices=("stats", "clear"))
+    parser.add_argument("cache_dir")
+    args = parser.parse_args(argv)
+
+    cache = ConversionCache(args.cache_dir)
+    if args.action == "clear":
+        cache.clear()
+        print(f"Cleared {cache.cache_dir}")
+    else:
+        stats = cache.stats()
+        print(f"{stats['entries']} entries, {stats['size_bytes']} bytes in {cache.cache_dir}")
+    return 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# convert/cif_reader.py
+
+from collections import namedtuple
+
+from convert.compression import compression_suffix, open_file
+
+# Number of ATOM records held in memory at once by the streaming reader.
+DEFAULT_CHUNK_SIZE = 65536
+
+# Suffix of the binary intermediate format written by convert/binary.py.
+BINARY_SUFFIX = ".npz"
+
+# Fields of an ATOM record
+ATOM_FIELDS = 11
+
+AtomSite = namedtuple(
+    "AtomSite",
+    ["serial", "label", "resname", "chain", "x", "y", "z", "occupancy", "bfactor", "element"],
+)
+
+
+def is_binary(path):
+    """
+    Returns True if `path` names a binary intermediate file rather than a CIF file.
+    """
+    return path.endswith(BINARY_SUFFIX)
+
+
+def parse_workers_for(cif_path, workers=None):
+    """
+    Returns the number of processes that will parse `cif_path` when `workers` are
+    requested: `workers` for uncompressed text files, each taking a byte range of
+    the file (see convert/sharding.py), and 1 otherwise or for None.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"parse workers must be positive, got {workers}")
+    if workers is None or is_binary(cif_path) or compression_suffix(cif_path) is not None:
+        return 1
+    return workers
+
+
+def parse_atom_line(line):
+    """
+    Parses one PDB-style ATOM record of an ioNERDSS CIF file.
+
+    The expected layout is:
+        ATOM  <id> <label> <resname> <chain> <x> <y> <z> <occupancy> <bfactor> <element>
+
+    Parameters:
+        line (str): A line starting with "ATOM".
+
+    Returns:
+        AtomSite or None: The parsed record, or None if the line has fewer than 11 fields.
+    """
+    parts = line.split()
+    if len(parts) < ATOM_FIELDS:
+        return None
+    return AtomSite(
+        int(parts[1]), parts[2], parts[3], parts[4],
+        float(parts[5]), float(parts[6]), float(parts[7]),
+        float(parts[8]), float(parts[9]), parts[10],
+    )
+
+
+def split_atom_lines(lines):
+    """
+    Splits ATOM lines into one flat list of tokens, 11 per record, for the bulk
+    parsers (convert/columnar.py, convert/sharding.py).
+
+    Like parse_atom_line, lines with fewer than 11 fields are dropped and longer
+    lines are cut to their first 11 fields. The whole block is split at once when
+    every line starts a record at a multiple of 11 tokens; otherwise the lines are
+    split one by one.
+
+    Returns:
+        list[str]: The tokens; record k is tokens[11 * k:11 * (k + 1)].
+    """
+    tokens = "".join(lines).split()
+    n = len(lines)
+    # The total alone would miss a short record followed by a long one
+    if len(tokens) == ATOM_FIELDS * n and tokens[0::ATOM_FIELDS].count("ATOM") == n:
+        return tokens
+    return [t for parts in map(str.split, lines) if len(parts) >= ATOM_FIELDS for t in parts[:ATOM_FIELDS]]
+
+
+def iter_atom_chunks(cif_path, chunk_size=DEFAULT_CHUNK_SIZE, selection=None, workers=None):
+    """
+    Streams the ATOM records of a CIF file as lists of at most `chunk_size` AtomSite tuples.
+
+    The file is read line by line, so peak memory is bounded by the chunk size rather
+    than by the size of the file.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file (or a binary `.npz` file).
+        chunk_size (int): Maximum number of records per yielded chunk.
+        selection (Selection, optional): Keep only the matching records (see
+            convert/selection.py).
+        workers (int, optional): Parse an uncompressed text file with this many
+            processes (see parse_workers_for).
+
+    Yields:
+        list[AtomSite]: Consecutive ATOM records in file order.
+    """
+    if selection is not None:
+        yield from selection.iter_chunks(cif_path, chunk_size, workers)
+        return
+    if is_binary(cif_path):
+        from convert.binary import iter_binary_chunks
+        yield from iter_binary_chunks(cif_path, chunk_size)
+        return
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    workers = parse_workers_for(cif_path, workers)
+    if workers > 1:
+        from convert.sharding import iter_sharded_chunks
+        yield from iter_sharded_chunks(cif_path, workers, chunk_size)
+        return
+
+    chunk = []
+    with open_file(cif_path, "r") as f:
+        for line in f:
+            if not line.startswith("ATOM"):
+                continue
+            site = parse_atom_line(line)
+            if site is None:
+                continue
+            chunk.append(site)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_atom_sites(cif_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams the ATOM records of a CIF file one AtomSite at a time.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file.
+        chunk_size (int): Number of records read ahead per chunk.
+
+    Yields:
+        AtomSite: ATOM records in file order.
+    """
+    for chunk in iter_atom_chunks(cif_path, chunk_size):
+        yield from chunk
+
+
+def count_atom_sites(cif_path, selection=None, workers=None):
+    """
+    Counts the ATOM records of a CIF file without keeping them in memory.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file.
+        selection (Selection, optional): Count only the matching records.
+        workers (int, optional): Processes counting an uncompressed text file.
+
+    Returns:
+        int: Number of records that `iter_atom_sites` would yield.
+    """
+    if selection is not None:
+        return sum(map(len, selection.iter_chunks(cif_path, workers=workers)))
+    if is_binary(cif_path):
+        from convert.binary import count_binary_sites
+        return count_binary_sites(cif_path)
+    workers = parse_workers_for(cif_path, workers)
+    if workers > 1:
+        from convert.sharding import count_sharded_sites
+        return count_sharded_sites(cif_path, workers)
+    count = 0
+    with open_file(cif_path, "r") as f:
+        for line in f:
+            if line.startswith("ATOM") and len(line.split()) >= ATOM_FIELDS:
+                count += 1
+    return count
+
+
+def iter_cif_frames(cif_path):
+    """
+    Streams a multi-block CIF file one frame (data_ block) at a time.
+
+    Each `data_` block is one snapshot; a file without `data_` lines is one frame.
+    Only the current frame is held in memory.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file.
+
+    Yields:
+        list[AtomSite]: The ATOM records of each non-empty block, in file order.
+    """
+    if is_binary(cif_path):
+        # A binary file holds a single frame
+        frame = [site for chunk in iter_atom_chunks(cif_path) for site in chunk]
+        if frame:
+            yield frame
+        return
+    frame = []
+    with open_file(cif_path, "r") as f:
+        for line in f:
+            if line.startswith("ATOM"):
+                site = parse_atom_line(line)
+                if site is not None:
+                    frame.append(site)
+            elif line.startswith("data_") and frame:
+                yield frame
+                frame = []
+    if frame:
+        yield frame
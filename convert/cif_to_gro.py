@@ -0,0 +1,140 @@
+from convert.cif_reader import count_atom_sites, is_binary, iter_atom_chunks
+from convert.cif_to_lammps import BOX_PADDING
+from convert.compression import open_file
+from convert.profiling import profiled, stage, timed
+
+# Residue and atom numbers wrap around in the 5-digit columns, as in GROMACS
+GRO_WRAP = 100000
+
+# Å -> nm
+GRO_SCALE = 0.1
+
+
+def format_gro_atom(residue_number, atom_number, atom):
+    """
+    Formats an AtomSite as a .gro atom line. Names are cut to five characters and
+    coordinates converted from Å to nm.
+    """
+    return "%5d%-5s%5s%5d%8.3f%8.3f%8.3f\n" % (
+        residue_number % GRO_WRAP, atom.resname[:5], atom.label[:5], atom_number % GRO_WRAP,
+        atom.x * GRO_SCALE, atom.y * GRO_SCALE, atom.z * GRO_SCALE,
+    )
+
+
+def format_gro_box(lo, hi, padding=BOX_PADDING):
+    """
+    Formats the box line of a .gro file: the edge lengths (nm) of the bounding box
+    of the coordinates `lo`..`hi` (Å), padded by `padding` Å on every side.
+    """
+    return "".join(f"{(h - l + 2 * padding) * GRO_SCALE:10.5f}" for l, h in zip(lo, hi)) + "\n"
+
+
+@profiled(inputs=("cif_path",), outputs=("gro_path",))
+def cif_to_gro(cif_path, gro_path, columnar=False, selection=None, compress_level=None, write_queue=None,
+               parse_workers=None):
+    """
+    Converts a PDB-style CIF file to a GROMACS .gro file.
+
+    Each chain (e.g. "A", "A-2") is one residue, numbered in order of appearance;
+    the residue name and atom name are the CIF resname and label. The box line
+    holds the edge lengths of the bounding box padded by BOX_PADDING, like the box
+    of cif_to_lammps. The CIF file is read twice: once to count the atoms for the
+    header, then streamed in chunks while the atom lines are written.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file.
+        gro_path (str): Path to save the output .gro file.
+        columnar (bool): Parse into NumPy arrays and write in blocks (requires NumPy).
+            Always used for binary `.npz` inputs (see convert/binary.py).
+        selection (Selection, optional): Convert only the matching atoms (see
+            convert/selection.py).
+        compress_level (int, optional): Compression level (0-9) of .gz/.bz2/.xz
+            outputs (see convert/compression.py).
+        write_queue (int, optional): Write the outputs from a background thread,
+            queueing up to this many blocks (see convert/async_writer.py).
+        parse_workers (int, optional): Parse a text CIF file with this many
+            processes (see convert/sharding.py).
+
+    Returns:
+        int: Number of atoms written.
+    """
+    if columnar or is_binary(cif_path):
+        return _cif_to_gro_columnar(cif_path, gro_path, selection, compress_level, write_queue, parse_workers)
+
+    residues = {}  # chain_id -> residue number
+    lo = [float("inf")] * 3
+    hi = [float("-inf")] * 3
+
+    with open_file(gro_path, "w", compress_level, write_queue) as out:
+        out.write("Converted from CIF to GRO\n")
+        with stage("count"):
+            out.write(f"{count_atom_sites(cif_path, selection, parse_workers)}\n")
+
+        n_atoms = 0
+        for chunk in timed("parse", iter_atom_chunks(cif_path, selection=selection, workers=parse_workers)):
+            with stage("format"):
+                rows = []
+                for atom_number, atom in enumerate(chunk, n_atoms + 1):
+                    residue_number = residues.setdefault(atom.chain, len(residues) + 1)
+                    rows.append(format_gro_atom(residue_number, atom_number, atom))
+                out.write("".join(rows))
+                n_atoms += len(chunk)
+
+                for axis, column in enumerate(zip(*(site[4:7] for site in chunk))):
+                    lo[axis] = min(lo[axis], min(column))
+                    hi[axis] = max(hi[axis], max(column))
+
+        if n_atoms == 0:
+            raise ValueError(f"no ATOM records found in {cif_path}")
+        out.write(format_gro_box(lo, hi))
+
+    return n_atoms
+
+
+def _cif_to_gro_columnar(cif_path, gro_path, selection=None, compress_level=None, write_queue=None,
+                         parse_workers=None):
+    from convert.columnar import read_cif_columns, write_gro_atoms_columns
+
+    with stage("parse"):
+        cols = read_cif_columns(cif_path, selection=selection, workers=parse_workers)
+    if len(cols) == 0:
+        raise ValueError(f"no ATOM records found in {cif_path}")
+
+    with stage("format"), open_file(gro_path, "w", compress_level, write_queue) as out:
+        out.write("Converted from CIF to GRO\n")
+        out.write(f"{len(cols)}\n")
+        write_gro_atoms_columns(out, cols)
+        out.write(format_gro_box(cols.coords.min(axis=0), cols.coords.max(axis=0)))
+
+    return len(cols)
+
+
+def main(argv=None):
+    import argparse
+
+    from convert.cli import add_io_arguments, io_options_from_args
+    from convert.selection import add_selection_arguments, selection_from_args
+
+    parser = argparse.ArgumentParser(description="Convert a coarse-grained CIF file to a GROMACS .gro file.")
+    parser.add_argument("input_cif")
+    parser.add_argument("output_gro")
+    parser.add_argument("--columnar", action="store_true", help="use the NumPy columnar backend")
+    add_io_arguments(parser)
+    add_selection_arguments(parser)
+    args = parser.parse_args(argv)
+
+    io_options = io_options_from_args(args)
+
+    cif_to_gro(args.input_cif, args.output_gro, args.columnar, selection_from_args(args), **io_options)
+
+    print(f"Converted {args.input_cif} → {args.output_gro}")
+    return 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
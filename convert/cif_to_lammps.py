@@ -1,17 +1,91 @@
-def cif_to_lammps(cif_path, lammps_path):
+import itertools
+import os
+import shutil
+import tempfile
+from contextlib import nullcontext
+
+from convert.cif_reader import DEFAULT_CHUNK_SIZE, is_binary, iter_atom_chunks
+from convert.compression import open_file
+from convert.contacts import IntContacts
+from convert.periodic import PERIODIC_MODES, parse_box, resolve_box, unwrap_by_chain, wrap_coords
+from convert.profiling import count, profiled, stage, timed
+from convert.spill import SpilledBonds, memory_size
+from convert.templates import build_templates, count_bond_types, template_path, write_molecule_template
+
+# Padding (Å) added on every side of the coordinate bounding box.
+BOX_PADDING = 10.0
+
+# Supported LAMMPS atom styles and the columns of their Atoms lines.
+ATOM_STYLES = {
+    "atomic": "%d %d %.4f %.4f %.4f\n",           # atom-ID type x y z
+    "molecular": "%d %d %d %.4f %.4f %.4f\n",     # atom-ID molecule-ID type x y z
+    "full": "%d %d %d 0.0 %.4f %.4f %.4f\n",      # atom-ID molecule-ID type q x y z
+}
+
+
+def write_lammps_header(f, n_atoms, n_bonds, lo, hi, n_bond_types=1, n_atom_types=1, padding=BOX_PADDING):
+    """
+    Writes the LAMMPS data file header up to (not including) the Atoms section.
+
+    Parameters:
+    ----------
+    f : file
+        Open text file.
+    n_atoms, n_bonds : int
+        Number of atoms and bonds in the file.
+    lo, hi : sequence of float
+        Minimum and maximum (x, y, z) coordinates; `padding` is added on every side.
+    n_bond_types : int
+        Number of bond types (1 for COM-INT bonds only).
+    n_atom_types : int
+        Number of atom types (1 unless atoms are typed by label).
+    padding : float
+        Box padding (Å); 0 when lo/hi already are the simulation box.
+    """
+    xlo, ylo, zlo = (v - padding for v in lo)
+    xhi, yhi, zhi = (v + padding for v in hi)
+    f.write("LAMMPS data file with COM-INT bonds\n\n")
+    f.write(f"{n_atoms} atoms\n")
+    f.write(f"{n_bonds} bonds\n")
+    f.write(f"{n_atom_types} atom types\n")
+    f.write(f"{n_bond_types} bond types\n\n")
+    f.write(f"{xlo:.3f} {xhi:.3f} xlo xhi\n")
+    f.write(f"{ylo:.3f} {yhi:.3f} ylo yhi\n")
+    f.write(f"{zlo:.3f} {zhi:.3f} zlo zhi\n\n")
+
+
+def atoms_section_title(atom_style):
+    """
+    Returns the Atoms section title; non-default styles carry the LAMMPS style hint.
+    """
+    if atom_style not in ATOM_STYLES:
+        raise ValueError(f"unsupported atom style {atom_style!r}; expected one of {', '.join(ATOM_STYLES)}")
+    return "Atoms\n\n" if atom_style == "atomic" else f"Atoms # {atom_style}\n\n"
+
+
+@profiled(inputs=("cif_path",), outputs=("lammps_path",))
+def cif_to_lammps(cif_path, lammps_path, columnar=False, atom_style="atomic", label_types=False, selection=None,
+                  templates=False, box=None, periodic="wrap", max_memory=None, contact_cutoff=None,
+                  compress_level=None, write_queue=None, parse_workers=None):
     """
     Converts a PDB-style CIF file to a LAMMPS data file with bonds between COM and
     associated INT atoms (same residue name).
 
+    The CIF file is read once in chunks: Atoms lines are spilled to a temporary file
+    while the atom count, the bounding box and the COM/INT indices are accumulated,
+    then the header, the spilled Atoms section and the Bonds section are written.
+    Memory stays bounded by the chunk size plus the bond indices.
+
     Assumptions:
     ----------
     1. CIF lines start with "ATOM" and follow the PDB-style format:
        ATOM  <id> <label> <resname> <chain> <x> <y> <z> <occupancy> <bfactor> <element>
     2. COM and INT atoms are grouped by the <chain> field (e.g. "A", "A-2").
     3. Each COM is bonded to all INTs that share the same chain ID.
-    4. Atom type is set to 1 for all atoms.
-    5. Simulation box is inferred from coordinates with ±10 Å padding.
-    6. No velocities, charges, or molecule IDs are written.
+    4. Atom type is 1 for all atoms, unless `label_types` (or `templates`) is set.
+    5. Simulation box is inferred from coordinates with ±10 Å padding, unless a
+       periodic `box` is given.
+    6. No velocities are written; charges are 0.0 in the "full" style.
 
     Parameters:
     ----------
@@ -19,72 +93,341 @@ def cif_to_lammps(cif_path, lammps_path):
         Path to the input CIF file.
     lammps_path : str
         Path to the output LAMMPS data file.
+    columnar : bool
+        Parse into NumPy arrays and write the sections in blocks (requires NumPy).
+        Always used for binary `.npz` inputs (see convert/binary.py).
+    atom_style : str
+        "atomic" (id type x y z), "molecular" (id mol type x y z) or "full"
+        (id mol type q x y z). Molecule IDs number the chains in order of appearance.
+    label_types : bool
+        Give every label (COM, INT, ...) its own atom type, numbered in order of
+        appearance, instead of a single type.
+    selection : Selection, optional
+        Convert only the matching atoms (see convert/selection.py).
+    templates : bool
+        Group the molecules by topology and write one LAMMPS molecule file per
+        template next to the data file (see convert/templates.py). Implies
+        `label_types` and molecule IDs ("atomic" becomes "molecular"), and every
+        interface (INT of a template) gets its own bond type.
+    box : tuple or str, optional
+        Periodic box ((xlo, xhi), (ylo, yhi), (zlo, zhi)), or "cell" for the
+        `_cell.length_a/b/c` of the CIF file (see convert/periodic.py). Molecules
+        are made whole by chain, and the columnar backend is always used (requires
+        NumPy).
+    periodic : str
+        With a box: "wrap" writes every atom inside the box with its image flags
+        (ix iy iz); "unwrap" writes the whole molecules as they are, without
+        image flags.
+    max_memory : int, optional
+        Build the bonds out of core with about this many bytes of buffered records
+        (see convert/spill.py) instead of keeping per-chain lists; the output is
+        identical. Only the molecule IDs of the "molecular" and "full" styles are
+        still kept per chain. Not supported with the columnar backend or
+        `templates`.
+    contact_cutoff : float, optional
+        Also write INT-INT contacts between molecules (residue name and chain) at
+        most this far apart as bonds of their own type, after the COM-INT bonds:
+        type 2, or one past the template bond types (see convert/contacts.py).
+        Contacts are found from the input coordinates, without periodic images.
+    compress_level : int, optional
+        Compression level (0-9) of a .gz/.bz2/.xz output (see convert/compression.py).
+    write_queue : int, optional
+        Write the output from a background thread, queueing up to this many blocks
+        (see convert/async_writer.py).
+    parse_workers : int, optional
+        Parse a text CIF file with this many processes (see convert/sharding.py).
+
+    Returns:
+    -------
+    int
+        Number of atoms written.
+    """
+    title = atoms_section_title(atom_style)
+    if templates:
+        label_types = True
+        if atom_style == "atomic":
+            atom_style, title = "molecular", atoms_section_title("molecular")
+    if periodic not in PERIODIC_MODES:
+        raise ValueError(f"unsupported periodic mode {periodic!r}; expected one of {', '.join(PERIODIC_MODES)}")
+    if max_memory is not None and (columnar or box is not None or is_binary(cif_path) or templates):
+        raise ValueError("max_memory applies to the streaming backend of text CIF files, without templates")
+    if columnar or box is not None or is_binary(cif_path):
+        return _cif_to_lammps_columnar(cif_path, lammps_path, atom_style, label_types, selection, templates,
+                                       box, periodic, contact_cutoff, compress_level, write_queue, parse_workers)
+
+    fmt = ATOM_STYLES[atom_style]
+    molecular = atom_style != "atomic"
+    residues = {}  # chain_id -> [COM id, [INT ids]]
+    molecules = {}  # chain_id -> molecule ID
+    types = {}  # label -> atom type
+    members = {}  # chain_id -> [resname, [atom IDs], [atom types]], with templates
+    int_sites = IntContacts() if contact_cutoff else None
+    n_atoms = 0
+    lo = [float("inf")] * 3
+    hi = [float("-inf")] * 3
+
+    with tempfile.TemporaryFile("w+") as body, \
+            (SpilledBonds(max_memory) if max_memory is not None else nullcontext()) as spilled:
+        for chunk in timed("parse", iter_atom_chunks(cif_path, selection=selection, workers=parse_workers)):
+            with stage("format"):
+                rows = []
+                for atom_id, site in enumerate(chunk, n_atoms + 1):
+                    chain_id = site.chain
+                    if spilled is not None:
+                        spilled.add(chain_id, site.label, atom_id)
+                        if molecular and chain_id not in molecules:
+                            molecules[chain_id] = len(molecules) + 1
+                    else:
+                        group = residues.get(chain_id)
+                        if group is None:
+                            group = residues[chain_id] = [None, []]
+                            molecules[chain_id] = len(molecules) + 1
+                            if templates:
+                                members[chain_id] = [site.resname, [], []]
+                        if site.label == "COM":
+                            group[0] = atom_id
+                        elif site.label == "INT":
+                            group[1].append(atom_id)
+
+                    atom_type = types.setdefault(site.label, len(types) + 1) if label_types else 1
+                    if templates:
+                        member = members[chain_id]
+                        member[1].append(atom_id)
+                        member[2].append(atom_type)
+                    if molecular:
+                        rows.append(fmt % (atom_id, molecules[chain_id], atom_type, site.x, site.y, site.z))
+                    else:
+                        rows.append(fmt % (atom_id, atom_type, site.x, site.y, site.z))
+                body.write("".join(rows))
+                if int_sites:
+                    int_sites.add(chunk, range(n_atoms + 1, n_atoms + len(chunk) + 1))
+                n_atoms += len(chunk)
+
+                # Bounding box
+                for axis, column in enumerate(zip(*(site[4:7] for site in chunk))):
+                    lo[axis] = min(lo[axis], min(column))
+                    hi[axis] = max(hi[axis], max(column))
+
+        if n_atoms == 0:
+            raise ValueError(f"no ATOM records found in {cif_path}")
+
+        # Bonds: COM to each INT in same chain group
+        if spilled is not None:
+            with stage("bonds"):
+                n_bonds = spilled.finish()
+        else:
+            n_bonds = sum(len(ints) for com, ints in residues.values() if com is not None)
+        count("bonds", n_bonds)
+
+        first_bond_types = itertools.repeat(1)
+        n_bond_types = 1
+        if templates:
+            with stage("templates"):
+                mol_templates, molecule_templates = build_templates(
+                    ((resname, tuple(atom_types)) for resname, _, atom_types in members.values()),
+                    types.get("COM"), types.get("INT"),
+                )
+                # Coordinates of the first molecule of every template, from the spilled Atoms lines
+                firsts = {}
+                for (_, atom_ids, _), index in zip(members.values(), molecule_templates):
+                    firsts.setdefault(index, atom_ids)
+                coords = _spilled_coords(body, {atom_id for atom_ids in firsts.values() for atom_id in atom_ids})
+                for index, template in enumerate(mol_templates):
+                    write_molecule_template(template_path(lammps_path, template.name), template,
+                                            [coords[atom_id] for atom_id in firsts[index]], os.path.basename(cif_path))
+            first_bond_types = (mol_templates[index].first_bond_type for index in molecule_templates)
+            n_bond_types = count_bond_types(mol_templates)
+
+        contacts = []
+        if int_sites:
+            with stage("contacts"):
+                contacts = int_sites.contacts(contact_cutoff)
+            count("contacts", len(contacts))
+            n_bond_types += 1
+
+        with open_file(lammps_path, "w", compress_level, write_queue) as f:
+            write_lammps_header(f, n_atoms, n_bonds + len(contacts), lo, hi, n_bond_types,
+                                n_atom_types=len(types) or 1)
+
+            f.write(title)
+            with stage("copy"):
+                body.seek(0)
+                shutil.copyfileobj(body, f)
+
+            f.write("\nBonds\n\n")
+            with stage("bonds"):
+                if spilled is not None:
+                    bonds = enumerate(spilled.bonds(), 1)
+                    while True:
+                        block = itertools.islice(bonds, DEFAULT_CHUNK_SIZE)
+                        text = "".join(f"{bond_id} 1 {com_id} {int_id}\n" for bond_id, (com_id, int_id) in block)
+                        if not text:
+                            break
+                        f.write(text)
+                bond_id = 1
+                for (com_id, ints), bond_type in zip(residues.values(), first_bond_types):
+                    if com_id is not None:
+                        f.write("".join(
+                            f"{bond_id + k} {bond_type + k if templates else 1} {com_id} {int_id}\n"
+                            for k, int_id in enumerate(ints)
+                        ))
+                        bond_id += len(ints)
+                f.write("".join(
+                    f"{bond_id} {n_bond_types} {i} {j}\n" for bond_id, (i, j) in enumerate(contacts, n_bonds + 1)
+                ))
+
+    return n_atoms
+
+
+def _spilled_coords(body, atom_ids):
     """
+    Reads the coordinates of `atom_ids` back from spilled Atoms lines (line k holds
+    atom k; x y z are the last three columns).
+    """
+    coords = {}
+    last = max(atom_ids)
+    body.seek(0)
+    for atom_id, line in enumerate(body, 1):
+        if atom_id in atom_ids:
+            coords[atom_id] = tuple(map(float, line.split()[-3:]))
+            if atom_id == last:
+                break
+    return coords
+
+
+def _cif_to_lammps_columnar(cif_path, lammps_path, atom_style="atomic", label_types=False, selection=None,
+                            templates=False, box=None, periodic="wrap", contact_cutoff=None,
+                            compress_level=None, write_queue=None, parse_workers=None):
+    from convert.columnar import chain_bonds, read_cif_columns, write_lammps_atoms_columns, write_lammps_bonds_columns
+    from convert.contacts import int_contacts_columns
+
+    with stage("parse"):
+        cols = read_cif_columns(cif_path, selection=selection, workers=parse_workers)
+    if len(cols) == 0:
+        raise ValueError(f"no ATOM records found in {cif_path}")
+    with stage("bonds"):
+        coms, ints = chain_bonds(cols)
+    count("bonds", len(coms))
+    contact_i = contact_j = ()
+    if contact_cutoff:
+        with stage("contacts"):
+            contact_i, contact_j = int_contacts_columns(cols, contact_cutoff)
+        count("contacts", len(contact_i))
+    # Codes are assigned in order of first appearance, like the streaming path
+    atom_types = cols.label_codes + 1 if label_types else 1
+    molecule_ids = cols.chain_codes + 1 if atom_style != "atomic" else None
 
-    atoms = []
-    residues = {}  # chain_id -> {"COM": id, "INT": [ids]}
-    atom_index = 1
-
-    with open(cif_path, "r") as f:
-        lines = f.readlines()
-
-    for line in lines:
-        if line.startswith("ATOM"):
-            parts = line.split()
-            label = parts[2]         # e.g. COM or INT
-            chain_id = parts[4]      # e.g. A, A-2, etc.
-            x, y, z = map(float, parts[5:8])
-            atom_type = 1
-
-            atoms.append((atom_index, atom_type, x, y, z))
-            if chain_id not in residues:
-                residues[chain_id] = {"COM": None, "INT": []}
-
-            if label == "COM":
-                residues[chain_id]["COM"] = atom_index
-            elif label == "INT":
-                residues[chain_id]["INT"].append(atom_index)
-
-            atom_index += 1
-
-    # Generate bonds: COM to each INT in same chain group
-    bonds = []
-    bond_id = 1
-    bond_type = 1
-    for chain, group in residues.items():
-        com_id = group["COM"]
-        for int_id in group["INT"]:
-            if com_id is not None:
-                bonds.append((bond_id, bond_type, com_id, int_id))
-                bond_id += 1
-
-    # Bounding box
-    xs = [a[2] for a in atoms]
-    ys = [a[3] for a in atoms]
-    zs = [a[4] for a in atoms]
-    buffer = 10.0
-    xlo, xhi = min(xs) - buffer, max(xs) + buffer
-    ylo, yhi = min(ys) - buffer, max(ys) + buffer
-    zlo, zhi = min(zs) - buffer, max(zs) + buffer
-
-    # Write LAMMPS data file
-    with open(lammps_path, "w") as f:
-        f.write("LAMMPS data file with COM-INT bonds\n\n")
-        f.write(f"{len(atoms)} atoms\n")
-        f.write(f"{len(bonds)} bonds\n")
-        f.write("1 atom types\n")
-        f.write("1 bond types\n\n")
-        f.write(f"{xlo:.3f} {xhi:.3f} xlo xhi\n")
-        f.write(f"{ylo:.3f} {yhi:.3f} ylo yhi\n")
-        f.write(f"{zlo:.3f} {zhi:.3f} zlo zhi\n\n")
-
-        f.write("Atoms\n\n")
-        for atom_id, atom_type, x, y, z in atoms:
-            f.write(f"{atom_id} {atom_type} {x:.4f} {y:.4f} {z:.4f}\n")
+    lo, hi, padding = cols.coords.min(axis=0), cols.coords.max(axis=0), BOX_PADDING
+    images = None
+    if box is not None:
+        with stage("periodic"):
+            box = resolve_box(box, cif_path)
+            cols.coords = unwrap_by_chain(cols.coords, cols.chain_codes, cols.label_mask("COM"), box)
+        lo, hi, padding = [b[0] for b in box], [b[1] for b in box], 0.0
+
+    bond_types, n_bond_types = 1, 1
+    if templates:
+        with stage("templates"):
+            bond_types, n_bond_types = _write_templates_columns(cif_path, lammps_path, cols, ints)
+    if contact_cutoff:
+        n_bond_types += 1
+    if box is not None and periodic == "wrap":
+        with stage("periodic"):
+            cols.coords, images = wrap_coords(cols.coords, box)
+
+    with open_file(lammps_path, "w", compress_level, write_queue) as f:
+        n_atom_types = len(cols.labels) if label_types else 1
+        write_lammps_header(f, len(cols), len(coms) + len(contact_i), lo, hi, n_bond_types,
+                            n_atom_types=n_atom_types, padding=padding)
+
+        f.write(atoms_section_title(atom_style))
+        with stage("format"):
+            write_lammps_atoms_columns(f, cols, atom_types, molecule_ids, atom_style, images=images)
 
         f.write("\nBonds\n\n")
-        for bond_id, bond_type, atom1, atom2 in bonds:
-            f.write(f"{bond_id} {bond_type} {atom1} {atom2}\n")
+        with stage("bonds"):
+            write_lammps_bonds_columns(f, coms, ints, bond_types)
+            if contact_cutoff:
+                write_lammps_bonds_columns(f, contact_i, contact_j, n_bond_types, first_id=len(coms) + 1)
+
+    return len(cols)
+
+
+def _write_templates_columns(cif_path, lammps_path, cols, ints):
+    """
+    Columnar counterpart of the template pass of cif_to_lammps: writes the molecule
+    files and returns the bond type of every bond (of chain_bonds order) and the
+    number of bond types.
+    """
+    from convert.columnar import np
+
+    # Atoms grouped by chain (molecule ID order), file order within a chain
+    order = np.argsort(cols.chain_codes, kind="stable")
+    ends = np.cumsum(np.bincount(cols.chain_codes, minlength=len(cols.chains)))
+    starts = ends - np.bincount(cols.chain_codes, minlength=len(cols.chains))
+    atom_types = (cols.label_codes + 1)[order].tolist()
+    first_resnames = cols.resname_codes[order[starts]].tolist()
+    label_type = {label: code + 1 for code, label in enumerate(cols.labels)}
+    mol_templates, molecule_templates = build_templates(
+        ((cols.resnames[r], tuple(atom_types[a:b])) for r, a, b in zip(first_resnames, starts.tolist(), ends.tolist())),
+        label_type.get("COM"), label_type.get("INT"),
+    )
+
+    firsts = {}
+    for chain, index in enumerate(molecule_templates):
+        firsts.setdefault(index, chain)
+    for index, template in enumerate(mol_templates):
+        rows = order[starts[firsts[index]]:ends[firsts[index]]]
+        # Rounded like the Atoms lines, so both backends write the same templates
+        coords = [tuple(float("%.4f" % v) for v in xyz) for xyz in cols.coords[rows].tolist()]
+        write_molecule_template(template_path(lammps_path, template.name), template, coords,
+                                os.path.basename(cif_path))
+
+    # Bond k of a molecule (its k-th INT) has type first_bond_type + k
+    chains = cols.chain_codes[ints]
+    run_starts = np.flatnonzero(np.r_[True, chains[1:] != chains[:-1]])
+    position = np.arange(len(chains)) - np.repeat(run_starts, np.diff(np.r_[run_starts, len(chains)]))
+    first_bond_type = np.array([t.first_bond_type for t in mol_templates], dtype=np.int64)
+    bond_types = first_bond_type[np.asarray(molecule_templates, dtype=np.int64)[chains]] + position
+    return bond_types, count_bond_types(mol_templates)
+
+
+def main(argv=None):
+    import argparse
+
+    from convert.cli import add_io_arguments, io_options_from_args
+    from convert.selection import add_selection_arguments, selection_from_args
+
+    parser = argparse.ArgumentParser(description="Convert a coarse-grained CIF file to a LAMMPS data file.")
+    parser.add_argument("input_cif")
+    parser.add_argument("output_lmp")
+    parser.add_argument("--atom-style", choices=list(ATOM_STYLES), default="atomic",
+                        help="LAMMPS atom style; molecular/full add per-chain molecule IDs (default: atomic)")
+    parser.add_argument("--label-types", action="store_true", help="one atom type per label (COM, INT, ...)")
+    parser.add_argument("--molecule-templates", action="store_true",
+                        help="write one LAMMPS molecule file per molecule topology, with one bond type per interface")
+    parser.add_argument("--box", type=parse_box, metavar="BOX",
+                        help="periodic box: 'cell' (from the CIF _cell items), L, Lx,Ly,Lz or xlo,xhi,ylo,yhi,zlo,zhi; "
+                             "molecules are made whole and image flags written (requires NumPy)")
+    parser.add_argument("--unwrap", action="store_true",
+                        help="with --box, write whole molecules without wrapping them into the box or image flags")
+    parser.add_argument("--columnar", action="store_true", help="use the NumPy columnar backend")
+    parser.add_argument("--max-memory", type=memory_size, metavar="SIZE",
+                        help="build bonds out of core within about SIZE (e.g. 512M, 2G) of buffered records")
+    parser.add_argument("--contact-cutoff", type=float, metavar="DIST",
+                        help="also write INT-INT contacts between molecules within DIST as bonds of their own type")
+    add_io_arguments(parser)
+    add_selection_arguments(parser)
+    args = parser.parse_args(argv)
+
+    io_options = io_options_from_args(args)
+
+    cif_to_lammps(args.input_cif, args.output_lmp, args.columnar, args.atom_style, args.label_types,
+                  selection_from_args(args), args.molecule_templates, args.box, "unwrap" if args.unwrap else "wrap",
+                  args.max_memory, args.contact_cutoff, **io_options)
+
+    print(f"Converted {args.input_cif} → {args.output_lmp}")
+    return 0
 
 
 # -------------------------------
@@ -93,13 +436,4 @@ def cif_to_lammps(cif_path, lammps_path):
 if __name__ == "__main__":
     import sys
 
-    if len(sys.argv) != 3:
-        print("Usage: python convert_cif_to_lammps.py input.cif output.lmp")
-        sys.exit(1)
-
-    input_cif = sys.argv[1]
-    output_lmp = sys.argv[2]
-
-    cif_to_lammps(input_cif, output_lmp)
-
-    print(f"Converted {input_cif} → {output_lmp}")
\ No newline at end of file
+    sys.exit(main())
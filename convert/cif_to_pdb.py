@@ -1,69 +1,290 @@
 # convert/cif_to_pdb.py
 
-def cif_to_pdb(cif_path, pdb_path):
+import string
+from collections import defaultdict
+from contextlib import nullcontext
+
+from convert.cif_reader import is_binary, iter_atom_chunks
+from convert.compression import open_file
+from convert.contacts import IntContacts
+from convert.hybrid36 import hy36encode
+from convert.profiling import count, profiled, stage, timed
+from convert.spill import SpilledBonds, memory_size
+
+# Single-character chain IDs available in the fixed-column PDB format.
+PDB_CHAIN_IDS = string.ascii_uppercase + string.ascii_lowercase + string.digits
+
+# Maximum number of bonded partners per CONECT record.
+CONECT_PARTNERS = 4
+
+
+class ChainIdMap:
+    """
+    Assigns single-character PDB chain IDs to ioNERDSS chain IDs ("A", "A-2", ...).
+
+    IDs are assigned in order of first appearance: a one-character chain keeps its
+    own ID if it is still free, every other chain gets the next free ID from
+    PDB_CHAIN_IDS. Once all 62 IDs are taken they are reused cyclically; the original
+    IDs stay available through `mapping`.
+
+    Every remapped chain also gets a segID (see `segment`) that is unique within the
+    file, so molecules stay distinct after the chain IDs are reused.
+    """
+
+    def __init__(self):
+        self.mapping = {}  # original chain -> PDB chain
+        self.segments = {}  # original chain -> segID
+        self._used = set()
+        self._next = 0
+        self._used_segments = set()
+        self._next_segment = 0
+
+    def __getitem__(self, chain):
+        pdb_chain = self.mapping.get(chain)
+        if pdb_chain is None:
+            pdb_chain = self.mapping[chain] = self._assign(chain)
+        return pdb_chain
+
+    def _assign(self, chain):
+        if len(chain) == 1 and chain not in self._used:
+            self._used.add(chain)
+            return chain
+        while self._next < len(PDB_CHAIN_IDS):
+            candidate = PDB_CHAIN_IDS[self._next]
+            self._next += 1
+            if candidate not in self._used:
+                self._used.add(candidate)
+                return candidate
+        pdb_chain = PDB_CHAIN_IDS[self._next % len(PDB_CHAIN_IDS)]
+        self._next += 1
+        return pdb_chain
+
+    def segment(self, chain):
+        """
+        Returns the segID (columns 73-76) of a chain: "" when the chain keeps its own
+        ID, the original ID when it has at most four characters ("A-2"), and otherwise
+        a generated hybrid-36 code ("A000", "A001", ..., "zzzz") not used by any other
+        chain. Raises ValueError past the 2,426,112 generated codes; use cif_to_mmcif
+        for such systems.
+        """
+        segment = self.segments.get(chain)
+        if segment is None:
+            segment = self.segments[chain] = self._assign_segment(chain)
+        return segment
+
+    def _assign_segment(self, chain):
+        if self[chain] == chain:
+            return ""
+        if len(chain) <= 4 and chain not in self._used_segments:
+            self._used_segments.add(chain)
+            return chain
+        while True:
+            try:
+                segment = hy36encode(4, 10000 + self._next_segment)
+            except ValueError:
+                raise ValueError(f"too many chains for unique PDB segIDs ({chain!r}); use cif_to_mmcif") from None
+            self._next_segment += 1
+            if segment not in self._used_segments:
+                self._used_segments.add(segment)
+                return segment
+
+    def write(self, path, compress_level=None, write_queue=None):
+        """
+        Writes the remapping table as tab-separated "pdb_chain original_chain" lines.
+        """
+        with open_file(path, "w", compress_level, write_queue) as f:
+            f.write("pdb_chain\toriginal_chain\n")
+            for chain, pdb_chain in self.mapping.items():
+                f.write(f"{pdb_chain}\t{chain}\n")
+
+
+def format_pdb_atom(atom, chain_ids):
+    """
+    Formats an AtomSite as a fixed-column PDB ATOM record (with trailing newline).
+
+    The serial is hybrid-36 encoded and the chain is mapped to one character through
+    `chain_ids` (a ChainIdMap). Remapped chains get a unique segID (columns 73-76,
+    which VMD reads as the segment name): their original ID if it has at most four
+    characters, a generated code otherwise (see ChainIdMap.segment).
+    """
+    chain = atom.chain
+    return (
+        f"ATOM  {hy36encode(5, atom.serial)} {atom.label:^4} {atom.resname:>3} {chain_ids[chain]:1}   "
+        f"1    {atom.x:8.3f}{atom.y:8.3f}{atom.z:8.3f}{atom.occupancy:6.2f}{atom.bfactor:6.2f}      "
+        f"{chain_ids.segment(chain):<4}{atom.element:>2}\n"
+    )
+
+
+def iter_conect_records(pairs):
+    """
+    Packs (serial, partner_serial) bonds into CONECT records.
+
+    Consecutive bonds of the same atom share a record of up to CONECT_PARTNERS
+    partners; serials are hybrid-36 encoded.
+
+    Yields:
+        str: CONECT lines with trailing newline.
+    """
+    atom, partners = None, []
+    for serial, partner in pairs:
+        if serial != atom or len(partners) == CONECT_PARTNERS:
+            if partners:
+                yield "CONECT" + hy36encode(5, atom) + "".join(hy36encode(5, p) for p in partners) + "\n"
+            atom, partners = serial, []
+        partners.append(partner)
+    if partners:
+        yield "CONECT" + hy36encode(5, atom) + "".join(hy36encode(5, p) for p in partners) + "\n"
+
+
+@profiled(inputs=("cif_path",), outputs=("pdb_path", "chain_map_path"))
+def cif_to_pdb(cif_path, pdb_path, columnar=False, chain_map_path=None, selection=None, max_memory=None,
+               contact_cutoff=None, compress_level=None, write_queue=None, parse_workers=None):
     """
     Converts a coarse-grained CIF file (PDB-style) to a PDB file.
+
+    ATOM records are streamed from the CIF file in chunks and written as they are
+    read; only the COM/INT serials needed for the CONECT records are kept in memory.
+    With `columnar=True` the file is parsed into NumPy arrays and written in blocks.
+
+    Serials above 99,999 are hybrid-36 encoded and multi-character chain IDs are
+    remapped to single characters (see ChainIdMap), so the fixed columns never
+    overflow. Each COM's bonds are packed up to four partners per CONECT record.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file.
+        pdb_path (str): Path to the output PDB file.
+        columnar (bool): Use the NumPy columnar backend (always used for `.npz` inputs).
+        chain_map_path (str, optional): Where to write the chain-ID remapping table.
+        selection (Selection, optional): Convert only the matching atoms (see
+            convert/selection.py).
+        max_memory (int, optional): Build the CONECT records out of core with about
+            this many bytes of buffered records (see convert/spill.py); the output
+            is identical. Streaming backend only.
+        contact_cutoff (float, optional): Also write INT-INT contacts between
+            molecules (residue name and chain) at most this far apart as CONECT
+            records after the COM-INT ones (see convert/contacts.py).
+        compress_level (int, optional): Compression level (0-9) of .gz/.bz2/.xz
+            outputs (see convert/compression.py).
+        write_queue (int, optional): Write the outputs from a background thread,
+            queueing up to this many blocks (see convert/async_writer.py).
+        parse_workers (int, optional): Parse a text CIF file with this many
+            processes (see convert/sharding.py).
+
+    Returns the number of atoms written.
     """
-    atoms = []
-    bonds = []
-
-    with open(cif_path, "r") as f:
-        for line in f:
-            if not line.startswith("ATOM"):
-                continue
-            parts = line.split()
-            if len(parts) < 11:
-                continue
-
-            serial = int(parts[1])
-            atom_name = parts[2]
-            res_name = parts[3]
-            chain_id = parts[4]
-            x, y, z = map(float, parts[5:8])
-            occupancy = float(parts[8])
-            bfactor = float(parts[9])
-            element = parts[10]
-
-            atoms.append({
-                "serial": serial,
-                "name": atom_name,
-                "res_name": res_name,
-                "chain_id": chain_id,
-                "x": x, "y": y, "z": z,
-                "occupancy": occupancy,
-                "bfactor": bfactor,
-                "element": element
-            })
+    if max_memory is not None and (columnar or is_binary(cif_path)):
+        raise ValueError("max_memory applies to the streaming backend of text CIF files")
+    if columnar or is_binary(cif_path):
+        return _cif_to_pdb_columnar(cif_path, pdb_path, chain_map_path, selection, contact_cutoff,
+                                    compress_level, write_queue, parse_workers)
 
     # Build a mapping from (res_name, chain_id) to COM and INTs
-    from collections import defaultdict
     groups = defaultdict(lambda: {"COM": None, "INTs": []})
+    chain_ids = ChainIdMap()
+    int_sites = IntContacts() if contact_cutoff else None
+    n_atoms = 0
 
-    for atom in atoms:
-        key = (atom["res_name"], atom["chain_id"])
-        if atom["name"] == "COM":
-            groups[key]["COM"] = atom["serial"]
-        elif atom["name"] == "INT":
-            groups[key]["INTs"].append(atom["serial"])
-
-    # Build CONECT records: COM — INT
-    for group in groups.values():
-        com = group["COM"]
-        for int_serial in group["INTs"]:
-            if com is not None:
-                bonds.append((com, int_serial))
-
-    with open(pdb_path, "w") as out:
+    with open_file(pdb_path, "w", compress_level, write_queue) as out, \
+            (SpilledBonds(max_memory) if max_memory is not None else nullcontext()) as spilled:
         # Write ATOM lines
-        for atom in atoms:
-            out.write(
-                f"ATOM  {atom['serial']:5d} {atom['name']:^4} {atom['res_name']:>3} {atom['chain_id']:1}   "
-                f"1    {atom['x']:8.3f}{atom['y']:8.3f}{atom['z']:8.3f}{atom['occupancy']:6.2f}{atom['bfactor']:6.2f}          {atom['element']:>2}\n"
-            )
+        for chunk in timed("parse", iter_atom_chunks(cif_path, selection=selection, workers=parse_workers)):
+            with stage("format"):
+                rows = []
+                for atom in chunk:
+                    key = (atom.resname, atom.chain)
+                    if spilled is not None:
+                        if atom.label == "COM" or atom.label == "INT":
+                            spilled.add(key, atom.label, atom.serial)
+                    elif atom.label == "COM":
+                        groups[key]["COM"] = atom.serial
+                    elif atom.label == "INT":
+                        groups[key]["INTs"].append(atom.serial)
+
+                    rows.append(format_pdb_atom(atom, chain_ids))
+                out.write("".join(rows))
+                if int_sites:
+                    int_sites.add(chunk, (atom.serial for atom in chunk))
+            n_atoms += len(chunk)
+
+        # Write CONECT lines: COM — INTs
+        with stage("bonds"):
+            if spilled is not None:
+                bonds = spilled.bonds()
+            else:
+                bonds = (
+                    (group["COM"], int_serial)
+                    for group in groups.values() if group["COM"] is not None
+                    for int_serial in group["INTs"]
+                )
+            out.writelines(iter_conect_records(bonds))
+
+        # Write CONECT lines: INT — INT contacts
+        if int_sites:
+            with stage("contacts"):
+                contacts = int_sites.contacts(contact_cutoff)
+                count("contacts", len(contacts))
+                out.writelines(iter_conect_records(contacts))
+
+    if chain_map_path:
+        chain_ids.write(chain_map_path, compress_level, write_queue)
+
+    return n_atoms
+
 
-        # Write CONECT lines
-        for com, int_atom in bonds:
-            out.write(f"CONECT{com:5d}{int_atom:5d}\n")
+def _cif_to_pdb_columnar(cif_path, pdb_path, chain_map_path=None, selection=None, contact_cutoff=None,
+                         compress_level=None, write_queue=None, parse_workers=None):
+    from convert.columnar import read_cif_columns, residue_chain_bonds, write_conect_columns, write_pdb_atoms_columns
+    from convert.contacts import int_contacts_columns
+
+    with stage("parse"):
+        cols = read_cif_columns(cif_path, selection=selection, workers=parse_workers)
+    chain_ids = ChainIdMap()
+
+    with open_file(pdb_path, "w", compress_level, write_queue) as out:
+        with stage("format"):
+            write_pdb_atoms_columns(out, cols, chain_ids)
+        with stage("bonds"):
+            coms, ints = residue_chain_bonds(cols)
+            count("bonds", len(coms))
+            write_conect_columns(out, cols.serial[coms], cols.serial[ints])
+        if contact_cutoff:
+            with stage("contacts"):
+                contact_i, contact_j = int_contacts_columns(cols, contact_cutoff)
+                count("contacts", len(contact_i))
+                write_conect_columns(out, cols.serial[contact_i], cols.serial[contact_j])
+
+    if chain_map_path:
+        chain_ids.write(chain_map_path, compress_level, write_queue)
+
+    return len(cols)
+
+
+def main(argv=None):
+    import argparse
+
+    from convert.cli import add_io_arguments, io_options_from_args
+    from convert.selection import add_selection_arguments, selection_from_args
+
+    parser = argparse.ArgumentParser(description="Convert a coarse-grained CIF file to PDB.")
+    parser.add_argument("input_cif")
+    parser.add_argument("output_pdb")
+    parser.add_argument("chain_map_tsv", nargs="?")
+    parser.add_argument("--max-memory", type=memory_size, metavar="SIZE",
+                        help="build CONECT records out of core within about SIZE (e.g. 512M, 2G) of buffered records")
+    parser.add_argument("--contact-cutoff", type=float, metavar="DIST",
+                        help="also write INT-INT contacts between molecules within DIST as CONECT records")
+    add_io_arguments(parser)
+    add_selection_arguments(parser)
+    args = parser.parse_args(argv)
+
+    input_file, output_file, chain_map_file = args.input_cif, args.output_pdb, args.chain_map_tsv
+    io_options = io_options_from_args(args)
+    cif_to_pdb(input_file, output_file, chain_map_path=chain_map_file, selection=selection_from_args(args),
+               max_memory=args.max_memory, contact_cutoff=args.contact_cutoff, **io_options)
+    print(f"Converted {input_file} → {output_file}")
+    if chain_map_file:
+        print(f"Chain IDs written to {chain_map_file}")
+    return 0
 
 
 # -------------------------------------
@@ -71,12 +292,5 @@ def cif_to_pdb(cif_path, pdb_path):
 # -------------------------------------
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) != 3:
-        print("Usage: python convert_cif_to_pdb.py input.cif output.pdb")
-        sys.exit(1)
-
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
 
-    cif_to_pdb(input_file, output_file)
-    print(f"Converted {input_file} → {output_file}")
+    sys.exit(main())
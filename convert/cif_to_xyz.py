@@ -1,4 +1,31 @@
-def cif_to_xyz(cif_path, xyz_path, bonds_path=None):
+from contextlib import nullcontext
+
+from convert.cif_reader import count_atom_sites, is_binary, iter_atom_chunks
+from convert.compression import open_file
+from convert.contacts import IntContacts
+from convert.profiling import count, profiled, stage, timed
+from convert.spill import memory_size
+
+
+def format_coordinate(value):
+    """
+    Formats an XYZ coordinate with 3 decimals, like the ioNERDSS CIF files, or with
+    as many digits as needed (repr) when 3 decimals would not reproduce the value.
+    """
+    text = f"{value:.3f}"
+    return text if float(text) == value else repr(value)
+
+
+def format_xyz_atom(atom):
+    """
+    Formats an AtomSite as an XYZ atom line: element x y z (see format_coordinate).
+    """
+    return f"{atom.element} {format_coordinate(atom.x)} {format_coordinate(atom.y)} {format_coordinate(atom.z)}\n"
+
+
+@profiled(inputs=("cif_path",), outputs=("xyz_path", "bonds_path"))
+def cif_to_xyz(cif_path, xyz_path, bonds_path=None, columnar=False, selection=None, max_memory=None,
+               contact_cutoff=None, compress_level=None, write_queue=None, parse_workers=None):
     """
     Converts a PDB-style CIF file to XYZ format.
 
@@ -6,61 +33,156 @@ def cif_to_xyz(cif_path, xyz_path, bonds_path=None):
     - Each atom line starts with 'ATOM' and follows a PDB-style format.
     - Bonds connect each COM atom to all INT atoms with the same residue name (column 4).
 
+    The CIF file is read twice: once to count the atoms for the XYZ header, then
+    streamed in chunks while the atom lines are written.
+
+    Coordinates are parsed, then written with 3 decimals, or in full when the input
+    has more precision (see format_coordinate), so no digits are lost. ATOM records
+    with fewer than 11 fields are skipped like in the other converters, and the
+    bond indices count the atoms actually written.
+
     Parameters:
         cif_path (str): Path to the input CIF file.
         xyz_path (str): Path to save the output XYZ file.
         bonds_path (str, optional): Path to save bonds file.
+        columnar (bool): Parse into NumPy arrays and write in blocks (requires NumPy).
+            Always used for binary `.npz` inputs (see convert/binary.py).
+        selection (Selection, optional): Convert only the matching atoms (see
+            convert/selection.py).
+        max_memory (int, optional): Stream the bonds to `bonds_path` chunk by chunk
+            instead of keeping the whole bond list; the output is identical. Bonds
+            only depend on the latest COM of each residue name, so no spilling is
+            needed and any value enables it. Streaming backend only.
+        contact_cutoff (float, optional): Also write INT-INT contacts between
+            molecules (residue name and chain) at most this far apart to
+            `bonds_path`, after the COM-INT bonds (see convert/contacts.py).
+        compress_level (int, optional): Compression level (0-9) of .gz/.bz2/.xz
+            outputs (see convert/compression.py).
+        write_queue (int, optional): Write the outputs from a background thread,
+            queueing up to this many blocks (see convert/async_writer.py).
+        parse_workers (int, optional): Parse a text CIF file with this many
+            processes (see convert/sharding.py).
+
+    Returns:
+        int: Number of atoms written.
     """
-    with open(cif_path, "r") as f:
-        lines = f.readlines()
+    if max_memory is not None and (columnar or is_binary(cif_path)):
+        raise ValueError("max_memory applies to the streaming backend of text CIF files")
+    if columnar or is_binary(cif_path):
+        return _cif_to_xyz_columnar(cif_path, xyz_path, bonds_path, selection, contact_cutoff,
+                                    compress_level, write_queue, parse_workers)
 
-    atom_lines = [line for line in lines if line.startswith("ATOM")]
-    atoms = []
     resname_to_com_index = {}
     bonds = []
-
-    for i, line in enumerate(atom_lines):
-        parts = line.split()
-        atom_name = parts[2]  # e.g. COM or INT
-        resname = parts[3]    # e.g. MOL, MOL-2
-        x, y, z = parts[5], parts[6], parts[7]
-        atoms.append((parts[-1], x, y, z))  # element symbol, x, y, z
-
-        if atom_name == "COM":
-            resname_to_com_index[resname] = i
-        elif atom_name == "INT" and resname in resname_to_com_index:
-            bonds.append((resname_to_com_index[resname], i))
+    n_bonds = 0  # bonds already streamed, with max_memory
+    int_sites = IntContacts() if contact_cutoff and bonds_path else None
 
     # Write XYZ file
-    with open(xyz_path, "w") as out:
-        out.write(f"{len(atoms)}\n")
+    with open_file(xyz_path, "w", compress_level, write_queue) as out, \
+            (open_file(bonds_path, "w", compress_level, write_queue)
+             if bonds_path and max_memory is not None else nullcontext()) as bout:
+        with stage("count"):
+            out.write(f"{count_atom_sites(cif_path, selection, parse_workers)}\n")
         out.write("Converted from CIF to XYZ\n")
-        for atom, x, y, z in atoms:
-            out.write(f"{atom} {x} {y} {z}\n")
+
+        n_atoms = 0
+        for chunk in timed("parse", iter_atom_chunks(cif_path, selection=selection, workers=parse_workers)):
+            with stage("format"):
+                out.write("".join(map(format_xyz_atom, chunk)))
+                for atom in chunk:
+                    if atom.label == "COM":
+                        resname_to_com_index[atom.resname] = n_atoms
+                    elif atom.label == "INT" and atom.resname in resname_to_com_index:
+                        bonds.append((resname_to_com_index[atom.resname], n_atoms))
+                    n_atoms += 1
+                if int_sites:
+                    int_sites.add(chunk, range(n_atoms - len(chunk), n_atoms))
+            if max_memory is not None:
+                if bout is not None:
+                    with stage("bonds"):
+                        bout.write("".join(f"{i} {j}\n" for i, j in bonds))
+                n_bonds += len(bonds)
+                bonds = []
+
+        contacts = []
+        if int_sites:
+            with stage("contacts"):
+                contacts = int_sites.contacts(contact_cutoff)
+            count("contacts", len(contacts))
+            if bout is not None:
+                bout.write("".join(f"{i} {j}\n" for i, j in contacts))
 
     # Write bonds file
-    if bonds_path:
-        with open(bonds_path, "w") as bout:
+    count("bonds", n_bonds + len(bonds))
+    if bonds_path and max_memory is None:
+        with stage("bonds"), open_file(bonds_path, "w", compress_level, write_queue) as bout:
             for i, j in bonds:
                 bout.write(f"{i} {j}\n")
+            bout.write("".join(f"{i} {j}\n" for i, j in contacts))
 
+    return n_atoms
 
-# -------------------------
-# CLI usage
-# -------------------------
-if __name__ == "__main__":
-    import sys
 
-    if len(sys.argv) not in (3, 4):
-        print("Usage: python cif_to_xyz.py input.cif output.xyz [output.bonds]")
-        sys.exit(1)
+def _cif_to_xyz_columnar(cif_path, xyz_path, bonds_path=None, selection=None, contact_cutoff=None,
+                         compress_level=None, write_queue=None, parse_workers=None):
+    from convert.columnar import preceding_resname_bonds, read_cif_columns, write_rows, write_xyz_columns
+    from convert.contacts import int_contacts_columns
+
+    with stage("parse"):
+        cols = read_cif_columns(cif_path, selection=selection, workers=parse_workers)
+
+    with stage("format"), open_file(xyz_path, "w", compress_level, write_queue) as out:
+        out.write(f"{len(cols)}\n")
+        out.write("Converted from CIF to XYZ\n")
+        write_xyz_columns(out, cols)
+
+    if bonds_path:
+        with stage("bonds"), open_file(bonds_path, "w", compress_level, write_queue) as bout:
+            coms, ints = preceding_resname_bonds(cols)
+            count("bonds", len(coms))
+            write_rows(bout, "%d %d\n", [coms, ints])
+            if contact_cutoff:
+                with stage("contacts"):
+                    contact_i, contact_j = int_contacts_columns(cols, contact_cutoff)
+                count("contacts", len(contact_i))
+                write_rows(bout, "%d %d\n", [contact_i, contact_j])
+
+    return len(cols)
+
 
-    input_file = sys.argv[1]
-    output_xyz = sys.argv[2]
-    output_bonds = sys.argv[3] if len(sys.argv) == 4 else None
+def main(argv=None):
+    import argparse
 
-    cif_to_xyz(input_file, output_xyz, output_bonds)
+    from convert.cli import add_io_arguments, io_options_from_args
+    from convert.selection import add_selection_arguments, selection_from_args
+
+    parser = argparse.ArgumentParser(description="Convert a coarse-grained CIF file to XYZ.")
+    parser.add_argument("input_cif")
+    parser.add_argument("output_xyz")
+    parser.add_argument("output_bonds", nargs="?")
+    parser.add_argument("--max-memory", type=memory_size, metavar="SIZE",
+                        help="stream bonds to the bonds file instead of keeping them in memory")
+    parser.add_argument("--contact-cutoff", type=float, metavar="DIST",
+                        help="also write INT-INT contacts between molecules within DIST to the bonds file")
+    add_io_arguments(parser)
+    add_selection_arguments(parser)
+    args = parser.parse_args(argv)
+
+    input_file, output_xyz, output_bonds = args.input_cif, args.output_xyz, args.output_bonds
+    io_options = io_options_from_args(args)
+    cif_to_xyz(input_file, output_xyz, output_bonds, selection=selection_from_args(args), max_memory=args.max_memory,
+               contact_cutoff=args.contact_cutoff, **io_options)
 
     print(f"Converted {input_file} → {output_xyz}")
     if output_bonds:
         print(f"Bonds written to {output_bonds}")
+    return 0
+
+
+# -------------------------
+# CLI usage
+# -------------------------
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
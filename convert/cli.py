@@ -0,0 +1,327 @@
+# convert/cli.py
+
+"""
+Single entry point for all converters, run as `python -m convert` (prog name
+"formatconvert"):
+
+    python -m convert convert input.cif output.pdb other.cif other.lmp
+    python -m convert convert --to xyz run1/*.cif
+    find sweep -name "*.cif" | python -m convert convert --to pdb --manifest -
+    python -m convert batch sweep/ --to xyz,pdb -j 16
+    python -m convert trajectory "frames/*.cif" --xyz traj.xyz
+    python -m convert watch output/ --xyz live.xyz --state live.watch.json
+
+The `convert` subcommand detects the source format from the input extension and
+the target format from the output extension (compression suffixes such as ".gz"
+are ignored), and runs any number of conversions in one process. The other
+subcommands are the CLIs of the individual modules. Only the module a subcommand or
+conversion needs is imported, so starting the CLI costs a few milliseconds and
+thousands of small conversions can share a single process.
+"""
+
+import importlib
+import os
+import sys
+import time
+
+from convert.compression import COMPRESSION_SUFFIXES, strip_compression
+
+PROG = "formatconvert"
+
+# Subcommand -> (module with a main(argv) function, description)
+COMMANDS = {
+    "convert": ("convert.cli", "convert files, detecting formats from their extensions"),
+    "batch": ("convert.batch", "convert directory trees in parallel, skipping up-to-date outputs"),
+    "fanout": ("convert.fanout", "convert one CIF file to several formats in a single pass"),
+    "trajectory": ("convert.trajectory", "convert CIF/PDB frames to a multi-frame XYZ file, LAMMPS dump or DCD file"),
+    "watch": ("convert.watch", "append new frames of a running simulation to XYZ/dump/DCD outputs"),
+    "assemble": ("convert.assemble", "assemble a simulation box from an ioNERDSS model.json"),
+    "binary": ("convert.binary", "parse a CIF file into a memory-mappable .npz archive"),
+    "cache": ("convert.cache", "inspect or clear a conversion cache"),
+}
+
+# Input extension -> source format
+SOURCE_FORMATS = {".cif": "cif", ".npz": "cif", ".json": "json"}
+
+# Output extension -> target format
+TARGET_FORMATS = {
+    ".xyz": "xyz", ".pdb": "pdb", ".mmcif": "mmcif", ".cif": "mmcif",
+    ".lmp": "lammps", ".data": "lammps", ".gro": "gro", ".npz": "npz",
+}
+
+# Target format -> extension of outputs named after their input (--to)
+TARGET_EXTENSIONS = {"xyz": ".xyz", "pdb": ".pdb", "mmcif": ".mmcif", "lammps": ".lmp", "gro": ".gro", "npz": ".npz"}
+
+# Options of the text outputs, and of CIF inputs, that every converter accepts
+OUTPUT_OPTIONS = ("compress_level", "write_queue")
+CIF_OPTIONS = OUTPUT_OPTIONS + ("parse_workers",)
+
+# (source, target) -> (module, function, options the function accepts)
+CONVERTERS = {
+    ("cif", "xyz"): ("convert.cif_to_xyz", "cif_to_xyz",
+                     ("columnar", "selection", "max_memory", "contact_cutoff") + CIF_OPTIONS),
+    ("cif", "pdb"): ("convert.cif_to_pdb", "cif_to_pdb",
+                     ("columnar", "selection", "max_memory", "contact_cutoff") + CIF_OPTIONS),
+    ("cif", "mmcif"): ("convert.cif_to_mmcif", "cif_to_mmcif", ("selection",) + CIF_OPTIONS),
+    ("cif", "lammps"): ("convert.cif_to_lammps", "cif_to_lammps",
+                        ("columnar", "atom_style", "selection", "max_memory", "contact_cutoff") + CIF_OPTIONS),
+    ("cif", "gro"): ("convert.cif_to_gro", "cif_to_gro", ("columnar", "selection") + CIF_OPTIONS),
+    ("cif", "npz"): ("convert.binary", "write_binary", ("parse_workers",)),
+    ("json", "xyz"): ("convert.ionerdss_json_to_xyz", "ionerdss_json_to_xyz", OUTPUT_OPTIONS),
+}
+
+
+def detect_format(path, formats):
+    """
+    Returns the format of `path` according to its extension, ignoring compression
+    suffixes, or None if the extension is not in `formats`.
+    """
+    return formats.get(os.path.splitext(strip_compression(path))[1].lower())
+
+
+def read_manifest(f):
+    """
+    Parses a manifest: one conversion per line, "input output" or just "input"
+    (with --to). Fields are separated by a tab if the line has one (for paths with
+    spaces), otherwise by whitespace. Blank lines and lines starting with "#" are
+    skipped.
+
+    Returns:
+        list[list[str]]: The fields of every line.
+    """
+    entries = []
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split("\t") if "\t" in line else line.split()
+        if len(fields) > 2:
+            raise ValueError(f"manifest line {number}: expected 'input [output]', got {line!r}")
+        entries.append(fields)
+    return entries
+
+
+def plan_conversions(entries, to=None, output_dir=None, compress=None):
+    """
+    Resolves manifest-style entries into conversions.
+
+    Parameters:
+        entries (list): [input, output] pairs, or [input] when `to` is given.
+        to (str, optional): Target format of entries without an output; the output
+            is named after the input (see TARGET_EXTENSIONS).
+        output_dir (str, optional): Directory for outputs named after their input.
+        compress (str, optional): "gz", "bz2" or "xz" suffix for those outputs.
+
+    Returns:
+        list[tuple]: (input path, output path, (module, function, options)).
+    """
+    if to is not None and to not in TARGET_EXTENSIONS:
+        raise ValueError(f"unknown target format {to!r}; choose from {', '.join(TARGET_EXTENSIONS)}")
+    if compress and f".{compress}" not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"unsupported compression: {compress}")
+
+    conversions = []
+    for entry in entries:
+        input_path = entry[0]
+        if len(entry) > 1:
+            output_path = entry[1]
+        elif to is None:
+            raise ValueError(f"no output for {input_path}; give one or use --to")
+        else:
+            stem = os.path.splitext(strip_compression(input_path))[0]
+            if output_dir:
+                stem = os.path.join(output_dir, os.path.basename(stem))
+            output_path = stem + TARGET_EXTENSIONS[to] + (f".{compress}" if compress else "")
+
+        source = detect_format(input_path, SOURCE_FORMATS)
+        target = detect_format(output_path, TARGET_FORMATS)
+        if source is None:
+            raise ValueError(f"cannot detect the format of input {input_path}")
+        if target is None:
+            raise ValueError(f"cannot detect the format of output {output_path}")
+        if (source, target) not in CONVERTERS:
+            raise ValueError(f"no converter from {source} to {target} ({input_path} → {output_path})")
+        if os.path.abspath(output_path) == os.path.abspath(input_path):
+            raise ValueError(f"output would overwrite its input: {input_path}")
+        conversions.append((input_path, output_path, CONVERTERS[source, target]))
+    return conversions
+
+
+def run_conversions(conversions, options=None, keep_going=False, report=None):
+    """
+    Runs planned conversions one after the other in this process.
+
+    Parameters:
+        conversions (list): As returned by plan_conversions.
+        options (dict, optional): Converter options ("columnar", "atom_style",
+            "selection", "max_memory", "contact_cutoff", and OUTPUT_OPTIONS and
+            CIF_OPTIONS); each converter receives the ones it accepts.
+        keep_going (bool): Continue after a failed conversion instead of raising.
+        report (callable, optional): Called with one message per conversion.
+
+    Returns:
+        tuple[int, list]: Number of atoms converted and (input, error) failures.
+    """
+    options = options or {}
+    n_atoms, failures = 0, []
+    for input_path, output_path, (module, function, accepted) in conversions:
+        converter = getattr(importlib.import_module(module), function)
+        kwargs = {name: options[name] for name in accepted if name in options}
+        try:
+            n_atoms += converter(input_path, output_path, **kwargs)
+        except Exception as exc:
+            if not keep_going:
+                raise
+            failures.append((input_path, f"{type(exc).__name__}: {exc}"))
+            if report:
+                report(f"FAILED {input_path}: {type(exc).__name__}: {exc}")
+            continue
+        if report:
+            report(f"Converted {input_path} → {output_path}")
+    return n_atoms, failures
+
+
+def add_io_arguments(parser, parse_workers=True):
+    """
+    Adds the options shared by the converter CLIs: --compress-level, --async-write,
+    --parse-workers (for CLIs that read CIF files) and --profile.
+    """
+    from convert.compression import DEFAULT_WRITE_QUEUE
+
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        help="compression level of .gz/.bz2/.xz outputs")
+    parser.add_argument("--async-write", nargs="?", type=int, const=DEFAULT_WRITE_QUEUE, metavar="BLOCKS",
+                        help="write outputs from a background thread, queueing up to BLOCKS 1 MiB blocks "
+                             f"(default: {DEFAULT_WRITE_QUEUE})")
+    if parse_workers:
+        parser.add_argument("--parse-workers", type=int, metavar="N",
+                            help="parse the input CIF with N processes, each reading a byte range of the file")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="LOG",
+                        help="report per-stage timings as JSON lines to LOG (default: stderr)")
+
+
+def io_options_from_args(args):
+    """
+    Enables profiling if --profile was given and returns the converter keyword
+    arguments set by the options of add_io_arguments ("compress_level",
+    "write_queue" and, with --parse-workers, "parse_workers").
+    """
+    from convert import profiling
+
+    if args.profile:
+        profiling.enable(log=args.profile)
+    options = {"compress_level": args.compress_level, "write_queue": args.async_write}
+    if "parse_workers" in vars(args):
+        options["parse_workers"] = args.parse_workers
+    return options
+
+
+def convert_main(argv=None):
+    import argparse
+
+    from convert.selection import add_selection_arguments, selection_from_args
+    from convert.spill import memory_size
+
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} convert",
+        description="Convert files, detecting source and target formats from their extensions.",
+    )
+    parser.add_argument("paths", nargs="*",
+                        help="input output pairs, or only inputs with --to")
+    parser.add_argument("--to", choices=list(TARGET_EXTENSIONS),
+                        help="target format; outputs are named after their inputs")
+    parser.add_argument("--manifest", metavar="FILE",
+                        help="read conversions from FILE ('-' for stdin), one 'input [output]' per line")
+    parser.add_argument("-o", "--output-dir", help="directory for outputs named after their inputs (with --to)")
+    parser.add_argument("--compress", choices=[s[1:] for s in COMPRESSION_SUFFIXES],
+                        help="compress outputs named after their inputs (with --to)")
+    parser.add_argument("--columnar", action="store_true", help="use the NumPy columnar backend for CIF inputs")
+    parser.add_argument("--atom-style", choices=("atomic", "molecular", "full"), default="atomic",
+                        help="LAMMPS atom style (default: atomic)")
+    parser.add_argument("--max-memory", type=memory_size, metavar="SIZE",
+                        help="build bonds of CIF inputs out of core within about SIZE (e.g. 512M, 2G)")
+    parser.add_argument("--contact-cutoff", type=float, metavar="DIST",
+                        help="also write INT-INT contacts between molecules within DIST (xyz bonds, pdb, lammps)")
+    parser.add_argument("-k", "--keep-going", action="store_true", help="continue after a failed conversion")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every conversion")
+    add_io_arguments(parser)
+    add_selection_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.to:
+        entries = [[path] for path in args.paths]
+    elif len(args.paths) % 2:
+        parser.error("paths must be input/output pairs unless --to is given")
+    else:
+        entries = [args.paths[i:i + 2] for i in range(0, len(args.paths), 2)]
+    if args.manifest == "-":
+        entries += read_manifest(sys.stdin)
+    elif args.manifest:
+        with open(args.manifest, "r") as f:
+            entries += read_manifest(f)
+    if not entries:
+        parser.error("nothing to convert")
+
+    try:
+        conversions = plan_conversions(entries, args.to, args.output_dir, args.compress)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    options = io_options_from_args(args)
+    start = time.perf_counter()
+    options.update(columnar=args.columnar, atom_style=args.atom_style, selection=selection_from_args(args))
+    if args.max_memory is not None:
+        options["max_memory"] = args.max_memory
+    if args.contact_cutoff is not None:
+        options["contact_cutoff"] = args.contact_cutoff
+    if options["selection"] is not None:
+        for input_path, output_path, (_, function, accepted) in conversions:
+            if "selection" not in accepted:
+                parser.error(f"{function} does not support selections ({input_path} → {output_path})")
+    n_atoms, failures = run_conversions(conversions, options, args.keep_going, print if args.verbose else None)
+    elapsed = time.perf_counter() - start
+    if failures and not args.verbose:
+        for path, error in failures:
+            print(f"FAILED {path}: {error}")
+    print(f"Converted {len(conversions) - len(failures)} files ({len(failures)} failed, "
+          f"{n_atoms} atoms) in {elapsed:.2f} s")
+    return 1 if failures else 0
+
+
+def print_usage(file=sys.stdout):
+    print(f"usage: {PROG} <command> [options]\n       {PROG} input output [input output ...]\n", file=file)
+    print("commands:", file=file)
+    for name, (_, description) in COMMANDS.items():
+        print(f"  {name:<12}{description}", file=file)
+    print(f"\nRun '{PROG} <command> --help' for the options of a command.", file=file)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage(sys.stdout if argv else sys.stderr)
+        return 0 if argv else 2
+
+    command = argv[0]
+    if command == "convert":
+        return convert_main(argv[1:])
+    if command in COMMANDS:
+        module = importlib.import_module(COMMANDS[command][0])
+        sys.argv[0] = f"{PROG} {command}"  # program name in the module's usage messages
+        return module.main(argv[1:])
+    if detect_format(command, SOURCE_FORMATS):
+        # "formatconvert in.cif out.pdb" is short for "formatconvert convert in.cif out.pdb"
+        return convert_main(argv)
+
+    print(f"{PROG}: unknown command {command!r}\n", file=sys.stderr)
+    print_usage(sys.stderr)
+    return 2
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,499 @@
+# convert/columnar.py
+
+"""
+Columnar (NumPy) backend for the CIF converters.
+
+Instead of one tuple or dict per atom, a parsed CIF file is held as a handful of
+arrays: float arrays for coordinates, occupancy and B-factor, an int array for the
+serials, and integer category codes for the atom labels, residue names, chains and
+elements. The writers below format whole blocks of rows with a single
+`%`-formatting call instead of one f-string per atom.
+
+NumPy is an optional dependency; it is only imported by this module.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+from convert.cif_reader import (
+    ATOM_FIELDS as _FIELDS, DEFAULT_CHUNK_SIZE, is_binary, parse_workers_for, split_atom_lines,
+)
+from convert.compression import open_file
+
+# Number of rows formatted per write() call by the block writers.
+DEFAULT_BLOCK_SIZE = 65536
+
+# Approximate number of bytes pulled from the file per readlines() call.
+_READ_HINT = 1 << 20
+
+
+def require_numpy():
+    """
+    Raises ImportError with an actionable message when NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError("The columnar backend requires NumPy (pip install numpy).")
+
+
+class AtomColumns:
+    """
+    Column-oriented ATOM records of a CIF file.
+
+    Attributes:
+        serial (ndarray[int64]): Atom serials as written in the file.
+        coords (ndarray[float64], shape (n, 3)): Cartesian coordinates.
+        occupancy (ndarray[float64]): Occupancies.
+        bfactor (ndarray[float64]): B-factors.
+        label_codes, resname_codes, chain_codes, element_codes (ndarray[int32]):
+            Category codes indexing into `labels`, `resnames`, `chains` and `elements`.
+        labels, resnames, chains, elements (list[str]): Category tables, in order of
+            first appearance in the file.
+        bonds (dict): Precomputed (com_index, int_index) arrays by bond rule ("chain",
+            "residue_chain", "preceding_resname"), as stored by convert/binary.py;
+            the bond functions below compute any rule that is missing.
+    """
+
+    def __init__(self, serial, coords, occupancy, bfactor,
+                 label_codes, labels, resname_codes, resnames,
+                 chain_codes, chains, element_codes, elements, bonds=None):
+        self.serial = serial
+        self.coords = coords
+        self.occupancy = occupancy
+        self.bfactor = bfactor
+        self.label_codes = label_codes
+        self.labels = labels
+        self.resname_codes = resname_codes
+        self.resnames = resnames
+        self.chain_codes = chain_codes
+        self.chains = chains
+        self.element_codes = element_codes
+        self.elements = elements
+        self.bonds = bonds or {}
+
+    def __len__(self):
+        return len(self.serial)
+
+    def take(self, mask):
+        """
+        Returns the rows selected by a boolean `mask` as a new AtomColumns. The
+        category tables are rebuilt in order of first appearance among the kept
+        rows, and precomputed bonds are dropped.
+        """
+        columns = {}
+        for name in ("label", "resname", "chain", "element"):
+            codes = getattr(self, f"{name}_codes")[mask]
+            present, first = np.unique(codes, return_index=True)
+            present = present[np.argsort(first, kind="stable")]
+            recode = np.zeros(len(getattr(self, f"{name}s")), dtype=np.int32)
+            recode[present] = np.arange(len(present), dtype=np.int32)
+            columns[f"{name}_codes"] = recode[codes]
+            columns[f"{name}s"] = [getattr(self, f"{name}s")[code] for code in present.tolist()]
+        return AtomColumns(
+            serial=self.serial[mask], coords=self.coords[mask],
+            occupancy=self.occupancy[mask], bfactor=self.bfactor[mask], **columns,
+        )
+
+    def label_mask(self, label):
+        """
+        Returns a boolean array selecting the atoms whose label equals `label`.
+        """
+        if label not in self.labels:
+            return np.zeros(len(self), dtype=bool)
+        return self.label_codes == self.labels.index(label)
+
+
+def _encode(values, table):
+    """
+    Maps strings to category codes, extending `table` (str -> code) with unseen values.
+    """
+    for value in dict.fromkeys(values):
+        table.setdefault(value, len(table))
+    return np.fromiter(map(table.__getitem__, values), dtype=np.int32, count=len(values))
+
+
+def _parse_lines(lines, tables):
+    """
+    Parses a list of ATOM lines into a dict of column arrays.
+    """
+    tokens = split_atom_lines(lines)
+    n = len(tokens) // _FIELDS
+
+    numeric = np.array([tokens[k::_FIELDS] for k in range(5, 10)], dtype=np.float64).reshape(5, n)
+    return {
+        "serial": np.array(tokens[1::_FIELDS], dtype=np.int64),
+        "coords": numeric[:3].T,
+        "occupancy": numeric[3],
+        "bfactor": numeric[4],
+        "label_codes": _encode(tokens[2::_FIELDS], tables["labels"]),
+        "resname_codes": _encode(tokens[3::_FIELDS], tables["resnames"]),
+        "chain_codes": _encode(tokens[4::_FIELDS], tables["chains"]),
+        "element_codes": _encode(tokens[10::_FIELDS], tables["elements"]),
+    }
+
+
+def iter_atom_line_chunks(cif_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams the raw ATOM lines of a CIF file in lists of at most `chunk_size` lines.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    lines = []
+    with open_file(cif_path, "r") as f:
+        while True:
+            block = f.readlines(_READ_HINT)
+            if not block:
+                break
+            lines += [line for line in block if line.startswith("ATOM")]
+            while len(lines) >= chunk_size:
+                yield lines[:chunk_size]
+                lines = lines[chunk_size:]
+    if lines:
+        yield lines
+
+
+def read_cif_columns(cif_path, chunk_size=DEFAULT_CHUNK_SIZE, selection=None, workers=None):
+    """
+    Parses the ATOM records of a CIF file into an AtomColumns instance.
+
+    The file is streamed in chunks of `chunk_size` lines; each chunk is split and
+    converted to arrays in bulk, so no per-atom Python objects outlive a chunk.
+
+    A binary `.npz` file written by convert/binary.py is memory-mapped instead of
+    parsed, with its precomputed bond indices attached.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file.
+        chunk_size (int): Number of ATOM lines parsed per chunk.
+        selection (Selection, optional): Keep only the matching records (see
+            convert/selection.py).
+        workers (int, optional): Parse an uncompressed text file with this many
+            processes (see cif_reader.parse_workers_for).
+
+    Returns:
+        AtomColumns: The parsed records, in file order.
+    """
+    require_numpy()
+    if selection is not None:
+        cols = read_cif_columns(cif_path, chunk_size, workers=workers)
+        return cols.take(selection.mask(cols))
+    if is_binary(cif_path):
+        from convert.binary import load_binary
+        return load_binary(cif_path)
+    workers = parse_workers_for(cif_path, workers)
+    if workers > 1:
+        from convert.sharding import read_sharded_columns
+        return read_sharded_columns(cif_path, workers, chunk_size)
+    tables = {"labels": {}, "resnames": {}, "chains": {}, "elements": {}}
+    parts = [_parse_lines(lines, tables) for lines in iter_atom_line_chunks(cif_path, chunk_size)]
+    return columns_from_parts(parts, tables)
+
+
+def columns_from_parts(parts, tables):
+    """
+    Concatenates the column dicts of _parse_lines, whose codes index `tables`, into
+    an AtomColumns.
+    """
+    def column(name, dtype, shape=(0,)):
+        if not parts:
+            return np.empty(shape, dtype=dtype)
+        return np.concatenate([p[name] for p in parts])
+
+    return AtomColumns(
+        serial=column("serial", np.int64),
+        coords=column("coords", np.float64, (0, 3)),
+        occupancy=column("occupancy", np.float64),
+        bfactor=column("bfactor", np.float64),
+        label_codes=column("label_codes", np.int32),
+        labels=list(tables["labels"]),
+        resname_codes=column("resname_codes", np.int32),
+        resnames=list(tables["resnames"]),
+        chain_codes=column("chain_codes", np.int32),
+        chains=list(tables["chains"]),
+        element_codes=column("element_codes", np.int32),
+        elements=list(tables["elements"]),
+    )
+
+
+# -------------------------------
+# COM-INT bond construction
+# -------------------------------
+
+def _group_bonds(keys, is_com, is_int, order_mask):
+    """
+    Bonds the last COM of every group to all INTs of that group.
+
+    Groups are ordered by the first atom selected by `order_mask`, and INTs keep file
+    order within a group, which matches the dict-based loops in the converters.
+
+    Returns:
+        tuple[ndarray, ndarray]: 0-based (com_index, int_index) arrays.
+    """
+    n_groups = int(keys.max()) + 1 if len(keys) else 0
+    index = np.arange(len(keys))
+
+    com_of_group = np.full(n_groups, -1, dtype=np.int64)
+    np.maximum.at(com_of_group, keys[is_com], index[is_com])
+
+    first_seen = np.full(n_groups, len(keys), dtype=np.int64)
+    np.minimum.at(first_seen, keys[order_mask], index[order_mask])
+    rank = np.empty(n_groups, dtype=np.int64)
+    rank[np.argsort(first_seen, kind="stable")] = np.arange(n_groups)
+
+    ints = index[is_int]
+    ints = ints[np.argsort(rank[keys[ints]], kind="stable")]
+    coms = com_of_group[keys[ints]]
+    bonded = coms >= 0
+    return coms[bonded], ints[bonded]
+
+
+def chain_bonds(cols):
+    """
+    COM-INT bonds grouped by chain (the cif_to_lammps rule).
+
+    Returns:
+        tuple[ndarray, ndarray]: 0-based (com_index, int_index) arrays.
+    """
+    if "chain" in cols.bonds:
+        return cols.bonds["chain"]
+    everything = np.ones(len(cols), dtype=bool)
+    return _group_bonds(cols.chain_codes, cols.label_mask("COM"), cols.label_mask("INT"), everything)
+
+
+def residue_chain_bonds(cols):
+    """
+    COM-INT bonds grouped by (residue name, chain) (the cif_to_pdb rule).
+
+    Returns:
+        tuple[ndarray, ndarray]: 0-based (com_index, int_index) arrays.
+    """
+    if "residue_chain" in cols.bonds:
+        return cols.bonds["residue_chain"]
+    keys = cols.resname_codes.astype(np.int64) * max(len(cols.chains), 1) + cols.chain_codes
+    _, keys = np.unique(keys, return_inverse=True)
+    is_com = cols.label_mask("COM")
+    is_int = cols.label_mask("INT")
+    return _group_bonds(keys.reshape(-1), is_com, is_int, is_com | is_int)
+
+
+def preceding_resname_bonds(cols):
+    """
+    Bonds every INT to the most recent preceding COM with the same residue name
+    (the cif_to_xyz rule).
+
+    Returns:
+        tuple[ndarray, ndarray]: 0-based (com_index, int_index) arrays.
+    """
+    if "preceding_resname" in cols.bonds:
+        return cols.bonds["preceding_resname"]
+    n = len(cols)
+    is_com = cols.label_mask("COM")
+    is_int = cols.label_mask("INT")
+    index = np.arange(n, dtype=np.int64)
+
+    # Sort COM/INT atoms by residue name, keeping file order within each name, then
+    # carry the latest COM index forward with a running maximum. Each group is
+    # offset by group * (n + 1) so maxima never leak between residue names.
+    members = index[is_com | is_int]
+    group = cols.resname_codes[members].astype(np.int64)
+    members = members[np.argsort(group, kind="stable")]
+    group = cols.resname_codes[members].astype(np.int64)
+    offset = group * (n + 1)
+    latest = np.maximum.accumulate(np.where(is_com[members], members, -1) + offset) - offset
+
+    selected = is_int[members] & (latest >= 0)
+    coms, ints = latest[selected], members[selected]
+    order = np.argsort(ints, kind="stable")
+    return coms[order], ints[order]
+
+
+# -------------------------------
+# Block writers
+# -------------------------------
+
+def write_rows(out, fmt, columns, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Writes rows formatted with `fmt` (one %-placeholder per column) in bulk.
+
+    Parameters:
+        out (file): Open text file.
+        fmt (str): Per-row %-format string, including the trailing newline.
+        columns (list): Equal-length arrays or lists, one per placeholder.
+        block_size (int): Number of rows formatted per write() call.
+    """
+    n = len(columns[0]) if columns else 0
+    width = len(columns)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        flat = [None] * ((stop - start) * width)
+        for k, col in enumerate(columns):
+            block = col[start:stop]
+            flat[k::width] = block.tolist() if hasattr(block, "tolist") else block
+        out.write((fmt * (stop - start)) % tuple(flat))
+
+
+def _names(table, codes, spec=""):
+    """
+    Expands category codes into an object array of (optionally padded) names.
+    """
+    return np.array([format(name, spec) for name in table], dtype=object)[codes]
+
+
+def write_xyz_columns(out, cols, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Writes the atom lines of an XYZ file (element x y z), with coordinates formatted
+    like cif_to_xyz.format_coordinate.
+    """
+    from convert.cif_to_xyz import format_coordinate
+
+    coords = cols.coords
+    if np.array_equal(np.round(coords, 3), coords):
+        # Every value is the double nearest to its 3-decimal rounding: %.3f is exact
+        fmt, columns = "%s %.3f %.3f %.3f\n", [coords[:, 0], coords[:, 1], coords[:, 2]]
+    else:
+        fmt = "%s %s %s %s\n"
+        columns = [list(map(format_coordinate, coords[:, k].tolist())) for k in range(3)]
+    write_rows(out, fmt, [_names(cols.elements, cols.element_codes)] + columns, block_size)
+
+
+def write_gro_atoms_columns(out, cols, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Writes the atom lines of a .gro file using the same layout as
+    cif_to_gro.format_gro_atom (one residue per chain, coordinates in nm).
+    """
+    from convert.cif_to_gro import GRO_SCALE, GRO_WRAP
+
+    n = len(cols)
+    nm = cols.coords * GRO_SCALE
+    write_rows(
+        out, "%5d%s%s%5d%8.3f%8.3f%8.3f\n",
+        [
+            (cols.chain_codes + 1) % GRO_WRAP,
+            _names([name[:5] for name in cols.resnames], cols.resname_codes, "<5"),
+            _names([name[:5] for name in cols.labels], cols.label_codes, ">5"),
+            np.arange(1, n + 1) % GRO_WRAP,
+            nm[:, 0], nm[:, 1], nm[:, 2],
+        ],
+        block_size,
+    )
+
+
+def hy36encode_column(width, values):
+    """
+    Vectorized hybrid36.hy36encode: encodes an integer array as `width`-character strings.
+
+    Raises:
+        ValueError: If a value does not fit the field.
+    """
+    from convert.hybrid36 import DIGITS_LOWER, DIGITS_UPPER
+
+    values = np.asarray(values, dtype=np.int64)
+    encoded = np.empty(len(values), dtype=f"U{width}")
+    decimal = (values >= 1 - 10 ** (width - 1)) & (values < 10 ** width)
+    encoded[decimal] = [f"{v:{width}d}" for v in values[decimal].tolist()]
+
+    rest = values[~decimal] - 10 ** width
+    block = 26 * 36 ** (width - 1)
+    if len(rest) and (rest.min() < 0 or rest.max() >= 2 * block):
+        raise ValueError(f"values do not fit a hybrid-36 field of width {width}")
+    lower = rest >= block
+    rest = rest - block * lower + 10 * 36 ** (width - 1)
+    digits = np.empty((len(rest), width), dtype=np.int64)
+    for position in range(width - 1, -1, -1):
+        rest, digits[:, position] = np.divmod(rest, 36)
+    table = np.frombuffer((DIGITS_UPPER + DIGITS_LOWER).encode(), dtype=np.uint8)
+    chars = np.ascontiguousarray(table[digits + 36 * lower[:, None]])
+    encoded[~decimal] = chars.view(f"S{width}").ravel().astype(f"U{width}")
+    return encoded
+
+
+def write_conect_columns(out, atoms, partners, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Writes (atom, partner) serial pairs as CONECT records, packed exactly like
+    cif_to_pdb.iter_conect_records: consecutive pairs of the same atom share a record
+    of up to four partners, and serials are hybrid-36 encoded.
+    """
+    from convert.cif_to_pdb import CONECT_PARTNERS
+
+    n = len(atoms)
+    if n == 0:
+        return
+    atoms = np.asarray(atoms)
+    # Position of each pair within its run of equal atoms, then record boundaries
+    new_run = np.ones(n, dtype=bool)
+    new_run[1:] = atoms[1:] != atoms[:-1]
+    run_start = np.maximum.accumulate(np.where(new_run, np.arange(n), 0))
+    slot = (np.arange(n) - run_start) % CONECT_PARTNERS
+    record = np.cumsum(slot == 0) - 1
+
+    table = np.full((record[-1] + 1, CONECT_PARTNERS + 1), "", dtype="U5")
+    table[record[slot == 0], 0] = hy36encode_column(5, atoms[slot == 0])
+    table[record, slot + 1] = hy36encode_column(5, partners)
+    write_rows(out, "CONECT" + "%s" * (CONECT_PARTNERS + 1) + "\n", list(table.T), block_size)
+
+
+def write_pdb_atoms_columns(out, cols, chain_ids, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Writes PDB ATOM records using the same column layout as cif_to_pdb.format_pdb_atom,
+    mapping chains through `chain_ids` (a cif_to_pdb.ChainIdMap).
+    """
+    if len(cols) and (cols.serial.max() > 99999 or cols.serial.min() < -9999):
+        serial_fmt, serials = "%s", hy36encode_column(5, cols.serial)
+    else:
+        serial_fmt, serials = "%5d", cols.serial
+
+    # cols.chains is in order of first appearance, like the streaming writer
+    pdb_chains = np.array([format(chain_ids[chain], "1") for chain in cols.chains], dtype=object)
+    segments = np.array([format(chain_ids.segment(chain), "<4") for chain in cols.chains], dtype=object)
+    write_rows(
+        out, f"ATOM  {serial_fmt} %s %s %s   1    %8.3f%8.3f%8.3f%6.2f%6.2f      %s%s\n",
+        [
+            serials,
+            _names(cols.labels, cols.label_codes, "^4"),
+            _names(cols.resnames, cols.resname_codes, ">3"),
+            pdb_chains[cols.chain_codes],
+            cols.coords[:, 0], cols.coords[:, 1], cols.coords[:, 2],
+            cols.occupancy, cols.bfactor,
+            segments[cols.chain_codes],
+            _names(cols.elements, cols.element_codes, ">2"),
+        ],
+        block_size,
+    )
+
+
+def write_lammps_atoms_columns(out, cols, atom_type=1, molecule_ids=None, atom_style="atomic",
+                               first_id=1, block_size=DEFAULT_BLOCK_SIZE, images=None):
+    """
+    Writes the body of a LAMMPS Atoms section, IDs starting at `first_id`.
+
+    `atom_type` is a scalar or a per-atom array; `molecule_ids` (per-atom array) is
+    required by the "molecular" and "full" styles (see cif_to_lammps.ATOM_STYLES).
+    `images` (int array, shape (n, 3)) appends the image flags ix iy iz.
+    """
+    from convert.cif_to_lammps import ATOM_STYLES
+
+    n = len(cols)
+    fmt = ATOM_STYLES[atom_style]
+    columns = [np.arange(first_id, first_id + n), np.broadcast_to(atom_type, n)]
+    if atom_style != "atomic":
+        columns.insert(1, molecule_ids)
+    columns += [cols.coords[:, 0], cols.coords[:, 1], cols.coords[:, 2]]
+    if images is not None:
+        fmt = fmt[:-1] + " %d %d %d\n"
+        columns += [images[:, 0], images[:, 1], images[:, 2]]
+    write_rows(out, fmt, columns, block_size)
+
+
+def write_lammps_bonds_columns(out, coms, ints, bond_type=1, first_id=1, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Writes LAMMPS Bonds section lines from 0-based (com_index, int_index) arrays,
+    numbering the bonds from `first_id`. `bond_type` is a scalar or a per-bond array.
+    """
+    n = len(coms)
+    write_rows(
+        out, "%d %d %d %d\n",
+        [np.arange(first_id, first_id + n), np.broadcast_to(bond_type, n), coms + 1, ints + 1],
+        block_size,
+    )
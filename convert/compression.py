@@ -0,0 +1,192 @@
+# convert/compression.py
+
+"""
+Transparent compressed file I/O.
+
+Every converter opens its input and output files through `open_file`, which picks
+gzip, bz2 or xz (LZMA) from the file extension (".gz", ".bz2", ".xz") and otherwise
+falls back to the built-in `open`. Compressed files are read and written as
+streams, so `model.json.gz` or `traj.xyz.xz` never hit the disk uncompressed.
+
+The compression level of written files defaults to DEFAULT_LEVELS and can be
+changed per file with the `level` argument of `open_file` (the converters'
+`compress_level`, `--compress-level` on the CLIs). `write_queue` (`--async-write`)
+makes `open_file` write an output from a background thread (see
+convert/async_writer.py).
+
+Files opened with mode "w" are written under a temporary name next to the output
+and renamed over it when closed. A reader never sees a half-written output, and
+a file that was hardlinked to the old output (see convert/cache.py) keeps its
+content.
+"""
+
+import importlib
+import os
+import shutil
+import tempfile
+
+# Extension -> (module whose open() handles it, name of its compression level
+# argument). The modules are imported on first use, to keep start-up fast.
+_OPENERS = {
+    ".gz": ("gzip", "compresslevel"),
+    ".bz2": ("bz2", "compresslevel"),
+    ".xz": ("lzma", "preset"),
+}
+
+COMPRESSION_SUFFIXES = tuple(_OPENERS)
+
+# Default level per format, as in the gzip, bzip2 and xz command-line tools.
+DEFAULT_LEVELS = {".gz": 6, ".bz2": 9, ".xz": 6}
+
+# Valid (lowest, highest) level per format.
+LEVEL_RANGES = {".gz": (0, 9), ".bz2": (1, 9), ".xz": (0, 9)}
+
+# Default queue size (blocks) of outputs written from a background thread.
+DEFAULT_WRITE_QUEUE = 8
+
+
+def compression_suffix(path):
+    """
+    Returns the compression extension of `path` (".gz", ".bz2", ".xz") or None.
+    """
+    for suffix in COMPRESSION_SUFFIXES:
+        if path.endswith(suffix):
+            return suffix
+    return None
+
+
+def strip_compression(path):
+    """
+    Returns `path` without its compression extension ("a.cif.gz" -> "a.cif").
+    """
+    suffix = compression_suffix(path)
+    return path[:-len(suffix)] if suffix else path
+
+
+def compression_level(suffix, level=None):
+    """
+    Returns the level at which a file with compression extension `suffix` is
+    written when `level` (0-9, None for DEFAULT_LEVELS) is requested, or None for
+    uncompressed files. Levels outside a format's range are clamped to it (e.g. 0
+    becomes 1 for bz2).
+    """
+    if level is not None and not 0 <= level <= 9:
+        raise ValueError(f"compression level must be between 0 and 9, got {level}")
+    if suffix is None:
+        return None
+    if level is None:
+        return DEFAULT_LEVELS[suffix]
+    lowest, highest = LEVEL_RANGES[suffix]
+    return min(max(level, lowest), highest)
+
+
+class ReplacingFile:
+    """
+    Text file written under a temporary name and renamed to `path` by `close`.
+
+    The temporary file has the same name as `path`, in a hidden directory next to
+    it, so a gzip header records the same file name. Leaving a `with` block through
+    an exception discards the temporary file and keeps the previous `path`.
+
+    Parameters:
+        path (str): Final path.
+        opener (callable): Opens a path for writing and returns a text file.
+    """
+
+    def __init__(self, path, opener):
+        self.path = path
+        directory, name = os.path.split(path)
+        self.tmp_dir = tempfile.mkdtemp(prefix=f".{name}.", suffix=".tmp", dir=directory or ".")
+        try:
+            self.file = opener(os.path.join(self.tmp_dir, name))
+        except BaseException:
+            os.rmdir(self.tmp_dir)
+            raise
+        self.write = self.file.write
+        self.writelines = self.file.writelines
+        self.closed = False
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def close(self):
+        """
+        Closes the temporary file and renames it to `path`.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.file.close()
+            os.replace(os.path.join(self.tmp_dir, os.path.basename(self.path)), self.path)
+        finally:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def discard(self):
+        """
+        Closes and removes the temporary file, leaving `path` unchanged.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.file.close()
+        finally:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def open_file(path, mode="r", level=None, write_queue=None):
+    """
+    Opens a text file, decompressing or compressing it on the fly when its name ends
+    with ".gz", ".bz2" or ".xz".
+
+    Parameters:
+        path (str): File path.
+        mode (str): "r", "w" or "a" (text mode).
+        level (int, optional): Compression level (0-9) of a written compressed
+            file; None for DEFAULT_LEVELS.
+        write_queue (int, optional): Write from a background thread, queueing up
+            to this many blocks; None for direct writes.
+
+    Returns:
+        file: A text file object usable as a context manager. Files opened with mode
+        "w" are ReplacingFile objects (unless `path` exists and is not a regular
+        file, e.g. /dev/null), and files opened for writing with `write_queue` are
+        wrapped in an AsyncWriter.
+    """
+    if write_queue is not None and write_queue < 1:
+        raise ValueError(f"write queue size must be positive, got {write_queue}")
+    suffix = compression_suffix(path)
+    level = compression_level(suffix, level)
+    if suffix is None:
+        def opener(target):
+            return open(target, mode)
+    else:
+        module, level_argument = _OPENERS[suffix]
+        if mode == "r":
+            return importlib.import_module(module).open(path, "rt")
+
+        def opener(target):
+            return importlib.import_module(module).open(
+                target, mode + "t", **{level_argument: level}
+            )
+
+    if mode == "w" and (os.path.isfile(path) or not os.path.exists(path)):
+        f = ReplacingFile(path, opener)
+    else:
+        f = opener(path)
+
+    if write_queue is None or mode == "r":
+        return f
+    from convert.async_writer import AsyncWriter
+
+    return AsyncWriter(f, write_queue)
@@ -0,0 +1,197 @@
+# convert/contacts.py
+
+"""
+Distance-based contact detection with a cell list.
+
+Space is cut into cubic cells with edge `cutoff`, so every pair closer than the
+cutoff lies in the same or in adjacent cells. Each cell is compared with itself
+and with 13 of its 26 neighbours (a "half shell"), so every pair is visited once
+and the work is O(N) for a roughly uniform density instead of O(N²).
+
+`find_contacts` is pure Python; `find_contacts_array` is the vectorized NumPy
+version used by the columnar backend. Both return pairs sorted by (i, j).
+
+The converters' `contact_cutoff` option looks for INT-INT contacts between
+different molecules (residue name and chain): IntContacts collects the INT sites
+while a CIF file is streamed, and int_contacts_columns searches an AtomColumns.
+"""
+
+import math
+from array import array
+from collections import defaultdict
+
+# Cell offsets that, together with the cell itself, visit every neighbouring pair once.
+HALF_SHELL = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+# Number of points whose candidate pairs are expanded at once by find_contacts_array.
+DEFAULT_BLOCK_SIZE = 65536
+
+
+def find_contacts(points, cutoff, molecule_ids=None):
+    """
+    Finds all pairs of points closer than or at `cutoff`.
+
+    Parameters:
+        points (sequence): (x, y, z) coordinates.
+        cutoff (float): Contact distance; must be positive.
+        molecule_ids (sequence, optional): Molecule of each point; pairs within the
+            same molecule are skipped.
+
+    Returns:
+        list[tuple[int, int]]: Sorted (i, j) index pairs with i < j.
+    """
+    if cutoff <= 0:
+        raise ValueError(f"cutoff must be positive, got {cutoff}")
+
+    inv = 1.0 / cutoff
+    cells = defaultdict(list)
+    for index, (x, y, z) in enumerate(points):
+        cells[(math.floor(x * inv), math.floor(y * inv), math.floor(z * inv))].append(index)
+
+    cutoff2 = cutoff * cutoff
+    pairs = []
+
+    def close(i, j):
+        xi, yi, zi = points[i]
+        xj, yj, zj = points[j]
+        if (xi - xj) ** 2 + (yi - yj) ** 2 + (zi - zj) ** 2 > cutoff2:
+            return False
+        return molecule_ids is None or molecule_ids[i] != molecule_ids[j]
+
+    for (cx, cy, cz), members in cells.items():
+        for a, i in enumerate(members):
+            for j in members[a + 1:]:
+                if close(i, j):
+                    pairs.append((i, j))
+        for dx, dy, dz in HALF_SHELL:
+            others = cells.get((cx + dx, cy + dy, cz + dz))
+            if others is None:
+                continue
+            for i in members:
+                for j in others:
+                    if close(i, j):
+                        pairs.append((i, j) if i < j else (j, i))
+
+    pairs.sort()
+    return pairs
+
+
+def find_contacts_array(coords, cutoff, molecule_ids=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Vectorized cell-list contact search (requires NumPy).
+
+    Points are sorted by cell; for every half-shell offset, the matching cell's range
+    in the sorted order is located with a binary search and the candidate pairs are
+    expanded and distance-filtered in blocks of `block_size` points.
+
+    Parameters:
+        coords (ndarray, shape (n, 3)): Coordinates.
+        cutoff (float): Contact distance; must be positive.
+        molecule_ids (ndarray, optional): Molecule of each point; pairs within the same
+            molecule are skipped.
+        block_size (int): Points expanded per step, bounding temporary memory.
+
+    Returns:
+        tuple[ndarray, ndarray]: (i, j) index arrays with i < j, sorted by (i, j).
+    """
+    import numpy as np
+
+    if cutoff <= 0:
+        raise ValueError(f"cutoff must be positive, got {cutoff}")
+    n = len(coords)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    # Integer cell coordinates, shifted by one so every neighbour index is >= 0
+    cell = np.floor((coords - coords.min(axis=0)) / cutoff).astype(np.int64) + 1
+    dims = cell.max(axis=0) + 2
+    key = (cell[:, 0] * dims[1] + cell[:, 1]) * dims[2] + cell[:, 2]
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    cutoff2 = cutoff * cutoff
+
+    found_i, found_j = [], []
+    for dx, dy, dz in [(0, 0, 0)] + HALF_SHELL:
+        shift = (dx * dims[1] + dy) * dims[2] + dz
+        for start in range(0, n, block_size):
+            # Walking points in cell order keeps the searchsorted queries sorted
+            points = order[start:start + block_size]
+            neighbour = key[points] + shift
+            lo = np.searchsorted(sorted_key, neighbour, side="left")
+            counts = np.searchsorted(sorted_key, neighbour, side="right") - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+
+            i = np.repeat(points, counts)
+            first = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            j = order[first + np.arange(total)]
+
+            keep = i < j if shift == 0 else np.ones(total, dtype=bool)
+            d = coords[i] - coords[j]
+            keep &= np.einsum("ij,ij->i", d, d) <= cutoff2
+            if molecule_ids is not None:
+                keep &= molecule_ids[i] != molecule_ids[j]
+            i, j = i[keep], j[keep]
+            found_i.append(np.minimum(i, j))
+            found_j.append(np.maximum(i, j))
+
+    if not found_i:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    i, j = np.concatenate(found_i), np.concatenate(found_j)
+    ordering = np.lexsort((j, i))
+    return i[ordering], j[ordering]
+
+
+class IntContacts:
+    """
+    INT sites of a streamed CIF file, for a contact search between molecules.
+
+    Call `add` for every chunk, with the ID each output gives its atoms (index,
+    1-based atom ID or serial), then `contacts` once.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.points = []
+        self.molecules = array("q")
+        self._numbers = {}  # (resname, chain) -> molecule number
+
+    def add(self, chunk, ids):
+        """
+        Records the INT sites of `chunk`; `ids` gives the ID of every site.
+        """
+        numbers = self._numbers
+        for atom, atom_id in zip(chunk, ids):
+            if atom.label == "INT":
+                self.ids.append(atom_id)
+                self.points.append((atom.x, atom.y, atom.z))
+                self.molecules.append(numbers.setdefault((atom.resname, atom.chain), len(numbers)))
+
+    def contacts(self, cutoff):
+        """
+        Returns the (id, id) pairs of INTs of different molecules within `cutoff`,
+        in stream order of the first then the second site.
+        """
+        ids = self.ids
+        return [(ids[i], ids[j]) for i, j in find_contacts(self.points, cutoff, self.molecules)]
+
+
+def int_contacts_columns(cols, cutoff):
+    """
+    Columnar counterpart of IntContacts: INT-INT contacts between molecules of an
+    AtomColumns.
+
+    Returns:
+        tuple[ndarray, ndarray]: 0-based (i, j) row indices, sorted by (i, j).
+    """
+    import numpy as np
+
+    sites = np.flatnonzero(cols.label_mask("INT"))
+    molecules = cols.resname_codes[sites].astype(np.int64) * max(len(cols.chains), 1) + cols.chain_codes[sites]
+    i, j = find_contacts_array(cols.coords[sites], cutoff, molecules)
+    return sites[i], sites[j]
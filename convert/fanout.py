@@ -0,0 +1,242 @@
+# convert/fanout.py
+
+import shutil
+import tempfile
+from array import array
+from contextlib import ExitStack
+
+from convert.cif_reader import is_binary, iter_atom_chunks
+from convert.cif_to_lammps import write_lammps_header
+from convert.cif_to_pdb import ChainIdMap, format_pdb_atom, iter_conect_records
+from convert.cif_to_xyz import format_xyz_atom
+from convert.compression import open_file
+from convert.contacts import IntContacts
+from convert.profiling import count, profiled, stage, timed
+from convert.topology import ComIntGroups
+
+OUTPUT_FORMATS = ("xyz", "pdb", "lammps", "bonds")
+
+
+@profiled(inputs=("cif_path",), outputs=("outputs",))
+def convert_many(cif_path, outputs, columnar=False, contact_cutoff=None, selection=None, compress_level=None,
+                 write_queue=None, parse_workers=None):
+    """
+    Converts one CIF file to several output formats with a single read of the input.
+
+    The ATOM records are parsed once and streamed to every requested writer, and the
+    COM-INT grouping is built once and shared by the PDB CONECT records, the LAMMPS
+    Bonds section and the `.bonds` file. Atom lines for formats whose header needs the
+    final atom count (XYZ, LAMMPS) are spilled to temporary files while streaming.
+
+    Bonds connect each COM to the INTs with the same residue name and chain (the
+    cif_to_pdb rule). For ioNERDSS structures, where every chain is one molecule, this
+    gives the same bonds as the individual converters.
+
+    With `contact_cutoff`, INT-INT contacts between different molecules that are at
+    most that far apart (found with a cell list, see convert.contacts) are appended
+    after the COM-INT bonds: as extra CONECT records, as LAMMPS bonds of type 2, and
+    as extra `.bonds` lines.
+
+    Parameters:
+        cif_path (str): Path to the input CIF file.
+        outputs (dict): Maps output format ("xyz", "pdb", "lammps", "bonds") to the
+            path to write. Formats mapped to None are skipped.
+        columnar (bool): Parse into NumPy arrays and write in blocks (requires NumPy).
+            Always used for binary `.npz` inputs (see convert/binary.py).
+        contact_cutoff (float, optional): Also write INT-INT contacts within this distance.
+        selection (Selection, optional): Convert only the matching atoms (see
+            convert/selection.py).
+        compress_level (int, optional): Compression level (0-9) of .gz/.bz2/.xz
+            outputs (see convert/compression.py).
+        write_queue (int, optional): Write the outputs from a background thread,
+            queueing up to this many blocks (see convert/async_writer.py).
+        parse_workers (int, optional): Parse a text CIF file with this many
+            processes (see convert/sharding.py).
+
+    Returns:
+        int: Number of atoms converted.
+    """
+    unknown = sorted(set(outputs) - set(OUTPUT_FORMATS))
+    if unknown:
+        raise ValueError(f"Unsupported output format(s): {', '.join(unknown)}")
+    outputs = {fmt: path for fmt, path in outputs.items() if path}
+
+    if columnar or is_binary(cif_path):
+        return _convert_many_columnar(cif_path, outputs, contact_cutoff, selection, compress_level, write_queue,
+                                      parse_workers)
+
+    groups = ComIntGroups()
+    serials = array("q")
+    chain_ids = ChainIdMap()
+    lo = [float("inf")] * 3
+    hi = [float("-inf")] * 3
+    n_atoms = 0
+
+    int_sites = IntContacts() if contact_cutoff else None
+
+    with ExitStack() as stack:
+        pdb = (stack.enter_context(open_file(outputs["pdb"], "w", compress_level, write_queue))
+               if "pdb" in outputs else None)
+        xyz_body = stack.enter_context(tempfile.TemporaryFile("w+")) if "xyz" in outputs else None
+        lammps_body = stack.enter_context(tempfile.TemporaryFile("w+")) if "lammps" in outputs else None
+
+        for chunk in timed("parse", iter_atom_chunks(cif_path, selection=selection, workers=parse_workers)):
+            with stage("format"):
+                groups.add(chunk)
+                if int_sites:
+                    int_sites.add(chunk, range(n_atoms, n_atoms + len(chunk)))
+                if pdb:
+                    pdb.write("".join(format_pdb_atom(atom, chain_ids) for atom in chunk))
+                    serials.extend(atom.serial for atom in chunk)
+                if xyz_body:
+                    xyz_body.write("".join(map(format_xyz_atom, chunk)))
+                if lammps_body:
+                    lammps_body.write("".join(
+                        f"{atom_id} 1 {atom.x:.4f} {atom.y:.4f} {atom.z:.4f}\n"
+                        for atom_id, atom in enumerate(chunk, n_atoms + 1)
+                    ))
+                    columns = ([atom.x for atom in chunk], [atom.y for atom in chunk], [atom.z for atom in chunk])
+                    for axis, values in enumerate(columns):
+                        lo[axis] = min(lo[axis], min(values))
+                        hi[axis] = max(hi[axis], max(values))
+
+            n_atoms += len(chunk)
+
+        if lammps_body and n_atoms == 0:
+            raise ValueError(f"no ATOM records found in {cif_path}")
+
+        contacts = []
+        if int_sites:
+            with stage("contacts"):
+                contacts = int_sites.contacts(contact_cutoff)
+            del int_sites
+        count("bonds", groups.n_bonds)
+        count("contacts", len(contacts))
+
+        if pdb:
+            with stage("pdb"):
+                pdb.writelines(iter_conect_records((serials[com], serials[i]) for com, i in groups.bonds()))
+                pdb.writelines(iter_conect_records((serials[i], serials[j]) for i, j in contacts))
+
+        if xyz_body:
+            with stage("xyz"), open_file(outputs["xyz"], "w", compress_level, write_queue) as out:
+                out.write(f"{n_atoms}\n")
+                out.write("Converted from CIF to XYZ\n")
+                xyz_body.seek(0)
+                shutil.copyfileobj(xyz_body, out)
+
+        if lammps_body:
+            with stage("lammps"), open_file(outputs["lammps"], "w", compress_level, write_queue) as out:
+                n_bond_types = 2 if contact_cutoff else 1
+                write_lammps_header(out, n_atoms, groups.n_bonds + len(contacts), lo, hi, n_bond_types)
+                out.write("Atoms\n\n")
+                lammps_body.seek(0)
+                shutil.copyfileobj(lammps_body, out)
+                out.write("\nBonds\n\n")
+                bond_id = 0
+                for bond_id, (com, int_index) in enumerate(groups.bonds(), 1):
+                    out.write(f"{bond_id} 1 {com + 1} {int_index + 1}\n")
+                for bond_id, (i, j) in enumerate(contacts, bond_id + 1):
+                    out.write(f"{bond_id} 2 {i + 1} {j + 1}\n")
+
+    if "bonds" in outputs:
+        with stage("bonds"), open_file(outputs["bonds"], "w", compress_level, write_queue) as out:
+            for com, int_index in groups.bonds():
+                out.write(f"{com} {int_index}\n")
+            for i, j in contacts:
+                out.write(f"{i} {j}\n")
+
+    return n_atoms
+
+
+def _convert_many_columnar(cif_path, outputs, contact_cutoff=None, selection=None, compress_level=None,
+                           write_queue=None, parse_workers=None):
+    import numpy as np
+    from convert.columnar import (
+        read_cif_columns, residue_chain_bonds, write_conect_columns, write_lammps_atoms_columns,
+        write_lammps_bonds_columns, write_pdb_atoms_columns, write_rows, write_xyz_columns,
+    )
+    from convert.cif_to_pdb import ChainIdMap
+    from convert.contacts import int_contacts_columns
+
+    with stage("parse"):
+        cols = read_cif_columns(cif_path, selection=selection, workers=parse_workers)
+    if "lammps" in outputs and len(cols) == 0:
+        raise ValueError(f"no ATOM records found in {cif_path}")
+    with stage("group"):
+        coms, ints = residue_chain_bonds(cols)
+    count("bonds", len(coms))
+
+    contact_i = contact_j = np.empty(0, dtype=np.int64)
+    if contact_cutoff:
+        with stage("contacts"):
+            contact_i, contact_j = int_contacts_columns(cols, contact_cutoff)
+        count("contacts", len(contact_i))
+
+    if "xyz" in outputs:
+        with stage("xyz"), open_file(outputs["xyz"], "w", compress_level, write_queue) as out:
+            out.write(f"{len(cols)}\n")
+            out.write("Converted from CIF to XYZ\n")
+            write_xyz_columns(out, cols)
+
+    if "pdb" in outputs:
+        with stage("pdb"), open_file(outputs["pdb"], "w", compress_level, write_queue) as out:
+            write_pdb_atoms_columns(out, cols, ChainIdMap())
+            write_conect_columns(out, cols.serial[coms], cols.serial[ints])
+            write_conect_columns(out, cols.serial[contact_i], cols.serial[contact_j])
+
+    if "lammps" in outputs:
+        with stage("lammps"), open_file(outputs["lammps"], "w", compress_level, write_queue) as out:
+            lo, hi = cols.coords.min(axis=0), cols.coords.max(axis=0)
+            n_bond_types = 2 if contact_cutoff else 1
+            write_lammps_header(out, len(cols), len(coms) + len(contact_i), lo, hi, n_bond_types)
+            out.write("Atoms\n\n")
+            write_lammps_atoms_columns(out, cols)
+            out.write("\nBonds\n\n")
+            write_lammps_bonds_columns(out, coms, ints)
+            write_lammps_bonds_columns(out, contact_i, contact_j, bond_type=2, first_id=len(coms) + 1)
+
+    if "bonds" in outputs:
+        with stage("bonds"), open_file(outputs["bonds"], "w", compress_level, write_queue) as out:
+            write_rows(out, "%d %d\n", [coms, ints])
+            write_rows(out, "%d %d\n", [contact_i, contact_j])
+
+    return len(cols)
+
+
+def main(argv=None):
+    import argparse
+
+    from convert.cli import add_io_arguments, io_options_from_args
+    from convert.selection import add_selection_arguments, selection_from_args
+
+    parser = argparse.ArgumentParser(description="Convert one CIF file to several formats in a single pass.")
+    parser.add_argument("input_cif")
+    for fmt in OUTPUT_FORMATS:
+        parser.add_argument(f"--{fmt}", metavar="PATH", help=f"write {fmt} output to PATH")
+    parser.add_argument("--columnar", action="store_true", help="use the NumPy columnar backend")
+    parser.add_argument("--contact-cutoff", type=float, metavar="DIST",
+                        help="also write INT-INT contacts between molecules within DIST")
+    add_io_arguments(parser)
+    add_selection_arguments(parser)
+    args = parser.parse_args(argv)
+
+    requested = {fmt: getattr(args, fmt) for fmt in OUTPUT_FORMATS if getattr(args, fmt)}
+    if not requested:
+        parser.error("at least one output (--xyz, --pdb, --lammps, --bonds) is required")
+
+    io_options = io_options_from_args(args)
+    convert_many(args.input_cif, requested, columnar=args.columnar, contact_cutoff=args.contact_cutoff,
+                 selection=selection_from_args(args), **io_options)
+    for path in requested.values():
+        print(f"Converted {args.input_cif} → {path}")
+    return 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# convert/hybrid36.py
+
+"""
+Hybrid-36 encoding of PDB serial numbers.
+
+Numbers that fit the fixed-width field are written in decimal. Larger numbers
+continue in base 36, first with upper-case digits ("A0000" follows "99999" in a
+5-character field), then with lower-case digits. A 5-character field holds serials
+up to 87,440,031 this way, and the result stays readable by hybrid-36-aware tools
+(VMD, PyMOL, ChimeraX, iotbx).
+"""
+
+DIGITS_UPPER = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITS_LOWER = "0123456789abcdefghijklmnopqrstuvwxyz"
+_UPPER_VALUES = {c: i for i, c in enumerate(DIGITS_UPPER)}
+_LOWER_VALUES = {c: i for i, c in enumerate(DIGITS_LOWER)}
+
+
+def _encode_pure(digits, value):
+    result = []
+    while True:
+        value, rest = divmod(value, len(digits))
+        result.append(digits[rest])
+        if value == 0:
+            return "".join(reversed(result))
+
+
+def _decode_pure(values, s):
+    result = 0
+    for c in s:
+        result = result * len(values) + values[c]
+    return result
+
+
+def hy36encode(width, value):
+    """
+    Encodes an integer as a hybrid-36 string of exactly `width` characters.
+
+    Raises:
+        ValueError: If the value does not fit the field.
+    """
+    if 1 - 10 ** (width - 1) <= value < 10 ** width:
+        return f"{value:{width}d}"
+    i = value - 10 ** width
+    block = 26 * 36 ** (width - 1)
+    if 0 <= i < block:
+        return _encode_pure(DIGITS_UPPER, i + 10 * 36 ** (width - 1))
+    i -= block
+    if 0 <= i < block:
+        return _encode_pure(DIGITS_LOWER, i + 10 * 36 ** (width - 1))
+    raise ValueError(f"{value} does not fit a hybrid-36 field of width {width}")
+
+
+def hy36decode(width, s):
+    """
+    Decodes a hybrid-36 string of `width` characters (decimal fields included).
+
+    Raises:
+        ValueError: If the string is not a valid hybrid-36 literal.
+    """
+    if len(s) == width:
+        first = s[0]
+        try:
+            if first in "- " or first.isdigit():
+                return int(s)
+            if first in _UPPER_VALUES:
+                return _decode_pure(_UPPER_VALUES, s) - 10 * 36 ** (width - 1) + 10 ** width
+            if first in _LOWER_VALUES:
+                return _decode_pure(_LOWER_VALUES, s) + 16 * 36 ** (width - 1) + 10 ** width
+        except KeyError:
+            pass
+    raise ValueError(f"invalid hybrid-36 literal: {s!r}")
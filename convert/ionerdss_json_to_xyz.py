@@ -1,60 +1,82 @@
-import json
+import shutil
+import tempfile
+from contextlib import ExitStack
 
-def ionerdss_json_to_xyz(json_path, xyz_path, bonds_path=None):
+from convert.compression import open_file
+from convert.json_stream import iter_model_items
+from convert.profiling import profiled, stage
+
+
+@profiled(inputs=("json_path",), outputs=("xyz_path", "bonds_path"))
+def ionerdss_json_to_xyz(json_path, xyz_path, bonds_path=None, compress_level=None, write_queue=None):
     """
     Converts an ioNERDSS-style JSON file to XYZ format with:
       - Center of mass at (0, 0, 0)
       - Interface atoms at their given coordinates
       - Optionally writes bonds file
+
+    The JSON file is streamed (see convert/json_stream.py) and the atom lines are
+    spilled to a temporary file until the count for the XYZ header is known, so
+    memory does not grow with the size of the model. `compress_level` and
+    `write_queue` apply to both outputs (see open_file in convert/compression.py).
+
+    Returns the number of atoms written.
     """
-    with open(json_path, "r") as f:
-        data = json.load(f)
+    atom_index = 0
+    com_index = None
 
-    entries = []
+    with ExitStack() as stack:
+        body = stack.enter_context(tempfile.TemporaryFile("w+"))
+        bonds = stack.enter_context(open_file(bonds_path, "w", compress_level, write_queue)) if bonds_path else None
 
-    bonds = []  # List of (index1, index2)
+        with stage("convert"):
+            for kind, item in iter_model_items(json_path):
+                if kind == "molecule_type":
+                    # Add COM
+                    body.write(f"{item} {0.0:.3f} {0.0:.3f} {0.0:.3f}\n")
+                    com_index = atom_index
+                else:
+                    coord = item["coord"]
+                    body.write(f"{item['name']} {coord['x']:.3f} {coord['y']:.3f} {coord['z']:.3f}\n")
+                    if bonds:
+                        bonds.write(f"{com_index} {atom_index}\n")  # COM to interface
+                atom_index += 1
 
-    atom_index = 0
-    for moltype in data.get("molecule_types", []):
-        mol_name = moltype["name"]
-
-        # Add COM
-        entries.append((mol_name, 0.0, 0.0, 0.0))
-        com_index = atom_index
-        atom_index += 1
-
-        for iface in moltype.get("interfaces", []):
-            iface_name = iface["name"]
-            coord = iface["coord"]
-            entries.append((iface_name, coord["x"], coord["y"], coord["z"]))
-            bonds.append((com_index, atom_index))  # COM to interface
-            atom_index += 1
-
-    with open(xyz_path, "w") as out:
-        out.write(f"{len(entries)}\n")
-        out.write("Converted from ioNERDSS JSON to XYZ\n")
-        for label, x, y, z in entries:
-            out.write(f"{label} {x:.3f} {y:.3f} {z:.3f}\n")
-
-    if bonds_path:
-        with open(bonds_path, "w") as b:
-            for i, j in bonds:
-                b.write(f"{i} {j}\n")
+        with stage("copy"), open_file(xyz_path, "w", compress_level, write_queue) as out:
+            out.write(f"{atom_index}\n")
+            out.write("Converted from ioNERDSS JSON to XYZ\n")
+            body.seek(0)
+            shutil.copyfileobj(body, out)
+
+    return atom_index
 
-if __name__ == "__main__":
-    import sys
 
-    if len(sys.argv) not in (3, 4):
-        print("Usage: python ionerdss_json_to_xyz.py input.json output.xyz [output.bonds]")
-        sys.exit(1)
+def main(argv=None):
+    import argparse
 
-    input_file = sys.argv[1]
-    output_xyz = sys.argv[2]
-    output_bonds = sys.argv[3] if len(sys.argv) == 4 else None
+    from convert.cli import add_io_arguments, io_options_from_args
 
-    ionerdss_json_to_xyz(input_file, output_xyz, output_bonds)
+    parser = argparse.ArgumentParser(description="Convert an ioNERDSS model.json to XYZ.")
+    parser.add_argument("input_json")
+    parser.add_argument("output_xyz")
+    parser.add_argument("output_bonds", nargs="?")
+    add_io_arguments(parser, parse_workers=False)
+    args = parser.parse_args(argv)
+
+    input_file, output_xyz, output_bonds = args.input_json, args.output_xyz, args.output_bonds
+    io_options = io_options_from_args(args)
+    ionerdss_json_to_xyz(input_file, output_xyz, output_bonds, **io_options)
 
     print(f"Converted {input_file} → {output_xyz}")
     if output_bonds:
         print(f"Bonds written to {output_bonds}")
+    return 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
 
+    sys.exit(main())
@@ -0,0 +1,232 @@
+# convert/json_stream.py
+
+"""
+Incremental reader for ioNERDSS model.json files.
+
+`json.load` builds the whole document before anything can be converted, which for
+large multi-species models, or for JSON files that also carry the full system state,
+costs memory proportional to the file. The reader below walks the document from a
+buffered stream instead: it descends into `molecule_types` and skips every other
+member. Values that are complete in the buffer (usually a whole molecule type) are
+decoded in one call of the C decoder of the standard library
+(`JSONDecoder.raw_decode`); only values that continue past the buffer end are
+walked element by element. Memory is bounded by the read buffer and the largest
+single interface.
+
+    for kind, item in iter_model_items("model.json"):
+        if kind == "molecule_type":
+            ...  # item is the molecule type's name
+        else:
+            ...  # item is an interface dict of the last molecule type
+"""
+
+import json
+import re
+
+from convert.compression import open_file
+
+# Characters read from the file per refill of the buffer.
+DEFAULT_READ_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters that may continue a number ("1." or "2e" cut off by the buffer end).
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+_decoder = json.JSONDecoder()
+
+
+class _Scanner:
+    """
+    A read position in a buffered text stream, with just the JSON primitives the
+    model reader needs. The consumed part of the buffer is dropped on every refill.
+    """
+
+    def __init__(self, f, read_size=DEFAULT_READ_SIZE):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        """
+        Appends at least `size` more characters (default: read_size); False at EOF.
+        """
+        data = self.f.read(max(size or 0, self.read_size))
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character without consuming it.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("unexpected end of JSON input")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} but found {found!r} in JSON input")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decodes and consumes the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete value: read as much again as is buffered, so a large
+                # value is decoded in O(size) rather than O(size²) retries.
+                if not self.fill(len(self.buf) - self.pos):
+                    raise
+                continue
+            # A number or literal reaching the buffer end may continue in the file
+            if not self.eof and _NUMBER_TAIL.match(self.buf, end).end() == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def buffered_value(self):
+        """
+        Decodes and consumes the next JSON value if it is complete in the buffer.
+
+        Returns:
+            tuple: (True, value), or (False, None) with nothing consumed.
+        """
+        self.peek()
+        try:
+            value, end = _decoder.raw_decode(self.buf, self.pos)
+        except json.JSONDecodeError:
+            return False, None
+        if not self.eof and _NUMBER_TAIL.match(self.buf, end).end() == len(self.buf):
+            return False, None
+        self.pos = end
+        return True, value
+
+    def skip(self):
+        """
+        Consumes the next JSON value without keeping it.
+
+        A value that is complete in the buffer is decoded in one call and dropped;
+        a container that continues past the buffer end is walked member by member,
+        so skipping never holds more than the buffer.
+        """
+        complete, _ = self.buffered_value()
+        if complete:
+            return
+        char = self.peek()
+        if char == "[":
+            for _ in self.elements():
+                self.skip()
+        elif char == "{":
+            for _ in self.members():
+                self.skip()
+        else:
+            self.value()
+
+    def members(self):
+        """
+        Iterates over the members of the next JSON object, yielding each key; the
+        caller must consume (value() or skip()) the member's value before resuming.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError(f"object key must be a string, got {key!r}")
+            self.expect(":")
+            yield key
+            if self._close("}"):
+                return
+
+    def elements(self):
+        """
+        Iterates over the elements of the next JSON array; the caller must consume
+        each element before resuming.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self._close("]"):
+                return
+
+    def _close(self, bracket):
+        separator = self.peek()
+        self.pos += 1
+        if separator == bracket:
+            return True
+        if separator != ",":
+            raise ValueError(f"expected ',' or {bracket!r} but found {separator!r} in JSON input")
+        return False
+
+
+def _iter_molecule_type(scanner):
+    name, pending = None, []
+    for key in scanner.members():
+        if key == "name":
+            name = scanner.value()
+            yield "molecule_type", name
+            # Interfaces listed before the name are held back until here
+            for interface in pending:
+                yield "interface", interface
+            pending = []
+        elif key == "interfaces" and scanner.peek() == "[":
+            for _ in scanner.elements():
+                interface = scanner.value()
+                if name is None:
+                    pending.append(interface)
+                else:
+                    yield "interface", interface
+        else:
+            scanner.skip()
+    if name is None:
+        raise ValueError("molecule type without a name in JSON input")
+
+
+def iter_model_items(json_path, read_size=DEFAULT_READ_SIZE):
+    """
+    Streams the molecule types of an ioNERDSS model.json and their interfaces.
+
+    Parameters:
+        json_path (str): Path to the model.json file.
+        read_size (int): Characters read per refill of the buffer.
+
+    Yields:
+        tuple: ("molecule_type", name) for each entry of `molecule_types`, followed
+        by ("interface", interface_dict) for each of its interfaces, in file order.
+    """
+    with open_file(json_path, "r") as f:
+        scanner = _Scanner(f, read_size)
+        if scanner.peek() != "{":
+            raise ValueError(f"{json_path} is not a JSON object")
+        for key in scanner.members():
+            if key == "molecule_types" and scanner.peek() == "[":
+                for _ in scanner.elements():
+                    complete, moltype = scanner.buffered_value()
+                    if not complete:
+                        yield from _iter_molecule_type(scanner)
+                        continue
+                    # Fast path: the whole molecule type was in the buffer
+                    if "name" not in moltype:
+                        raise ValueError("molecule type without a name in JSON input")
+                    yield "molecule_type", moltype["name"]
+                    for interface in moltype.get("interfaces", []):
+                        yield "interface", interface
+            else:
+                scanner.skip()
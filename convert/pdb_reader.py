@@ -0,0 +1,59 @@
+# convert/pdb_reader.py
+
+from convert.cif_reader import AtomSite
+from convert.compression import open_file
+from convert.hybrid36 import hy36decode
+
+
+def parse_pdb_atom_line(line):
+    """
+    Parses a fixed-column PDB ATOM/HETATM record into an AtomSite.
+
+    Serials may be hybrid-36 encoded, as written by cif_to_pdb for large systems. A
+    non-blank segID (columns 73-76) is used as the chain, since cif_to_pdb keeps a
+    unique segID there for chains whose single-character ID is reused.
+
+    Parameters:
+        line (str): A line starting with "ATOM" or "HETATM".
+
+    Returns:
+        AtomSite or None: The parsed record, or None if the numeric columns are malformed.
+    """
+    try:
+        serial = hy36decode(5, line[6:11])
+        x, y, z = float(line[30:38]), float(line[38:46]), float(line[46:54])
+        occupancy = float(line[54:60]) if line[54:60].strip() else 1.0
+        bfactor = float(line[60:66]) if line[60:66].strip() else 0.0
+    except ValueError:
+        return None
+    name = line[12:16].strip()
+    element = line[76:78].strip() or name[:1]
+    chain = line[72:76].strip() or line[21:22].strip()
+    return AtomSite(serial, name, line[17:20].strip(), chain, x, y, z, occupancy, bfactor, element)
+
+
+def iter_pdb_models(pdb_path):
+    """
+    Streams a PDB file one model (MODEL ... ENDMDL) at a time.
+
+    A file without MODEL records is a single model. Only the current model is held in
+    memory.
+
+    Parameters:
+        pdb_path (str): Path to the input PDB file.
+
+    Yields:
+        list[AtomSite]: The ATOM/HETATM records of each non-empty model.
+    """
+    model = []
+    with open_file(pdb_path, "r") as f:
+        for line in f:
+            if line.startswith(("ATOM", "HETATM")):
+                site = parse_pdb_atom_line(line)
+                if site is not None:
+                    model.append(site)
+            elif line.startswith(("ENDMDL", "END")) and model:
+                yield model
+                model = []
+    if model:
+        yield model
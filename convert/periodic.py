@@ -0,0 +1,151 @@
+# convert/periodic.py
+
+"""
+Periodic boxes for the LAMMPS output (requires NumPy).
+
+A box is ((xlo, xhi), (ylo, yhi), (zlo, zhi)), orthogonal. It comes either from
+the `_cell.length_a/b/c` items of the CIF file (the box then spans [0, a) x [0, b)
+x [0, c)), or from the command line.
+
+Molecules whose atoms were written wrapped into the box one by one are first made
+whole again. Each atom is moved by whole box lengths to the image nearest to its
+molecule's reference atom, which is the (last) COM of the chain, or its first atom
+if it has no COM. Then, for LAMMPS, every atom is wrapped back into the box and
+its image flags record the shift. LAMMPS uses the image flags to rebuild whole
+molecules, so no bond spans the box.
+
+Every step is a constant number of NumPy operations over the n coordinates, with
+no sort, so the cost stays linear in the number of sites.
+"""
+
+from convert.columnar import np, require_numpy
+from convert.compression import open_file
+
+PERIODIC_MODES = ("wrap", "unwrap")
+
+_CELL_ITEMS = {
+    "_cell.length_a": 0, "_cell.length_b": 1, "_cell.length_c": 2,
+    "_cell.angle_alpha": 3, "_cell.angle_beta": 4, "_cell.angle_gamma": 5,
+}
+
+
+def _cif_number(value):
+    # "100.5(3)" -> 100.5
+    return float(value.split("(")[0])
+
+
+def read_cif_cell(cif_path):
+    """
+    Reads the unit cell of a CIF file from its `_cell.*` items (before the first ATOM
+    record).
+
+    Returns:
+        tuple or None: The box ((0, a), (0, b), (0, c)), or None if the file has no
+        cell lengths.
+
+    Raises:
+        ValueError: If the cell is not orthogonal.
+    """
+    cell = [None, None, None, 90.0, 90.0, 90.0]
+    with open_file(cif_path, "r") as f:
+        for line in f:
+            if line.startswith("ATOM"):
+                break
+            parts = line.split()
+            if len(parts) >= 2 and parts[0] in _CELL_ITEMS:
+                cell[_CELL_ITEMS[parts[0]]] = _cif_number(parts[1])
+    if None in cell[:3]:
+        return None
+    if any(abs(angle - 90.0) > 1e-6 for angle in cell[3:]):
+        raise ValueError(f"{cif_path}: only orthogonal cells are supported, got angles {cell[3:]}")
+    return tuple((0.0, length) for length in cell[:3])
+
+
+def resolve_box(box, cif_path):
+    """
+    Returns `box`, or the cell of `cif_path` when `box` is "cell".
+    """
+    if box != "cell":
+        return box
+    from convert.cif_reader import is_binary
+
+    cell = None if is_binary(cif_path) else read_cif_cell(cif_path)
+    if cell is None:
+        raise ValueError(f"{cif_path} has no _cell.length_a/b/c; give the box explicitly")
+    return cell
+
+
+def parse_box(value):
+    """
+    Parses a box given on the command line: "L" (a cube [0, L)), "Lx,Ly,Lz",
+    "xlo,xhi,ylo,yhi,zlo,zhi", or "cell" to read it from the input CIF file.
+    """
+    if value == "cell":
+        return value
+    values = [float(v) for v in value.split(",")]
+    if len(values) == 1:
+        values *= 3
+    if len(values) == 3:
+        return tuple((0.0, length) for length in values)
+    if len(values) == 6:
+        return tuple(zip(values[0::2], values[1::2]))
+    raise ValueError(f"expected L, Lx,Ly,Lz or xlo,xhi,ylo,yhi,zlo,zhi, got {value!r}")
+
+
+def _box_arrays(box):
+    lo = np.array([b[0] for b in box], dtype=np.float64)
+    length = np.array([b[1] - b[0] for b in box], dtype=np.float64)
+    if np.any(length <= 0):
+        raise ValueError(f"box edges must be positive, got {box}")
+    return lo, length
+
+
+def reference_atoms(chain_codes, is_com):
+    """
+    Returns the index of the reference atom of every chain code: its last COM, or
+    its first atom if it has none. Codes must be numbered in order of first
+    appearance (as in AtomColumns).
+    """
+    n_chains = int(chain_codes.max()) + 1 if len(chain_codes) else 0
+    index = np.arange(len(chain_codes))
+    # A code seen for the first time is larger than every code before it
+    first = np.empty(len(chain_codes), dtype=bool)
+    first[:1] = True
+    first[1:] = chain_codes[1:] > np.maximum.accumulate(chain_codes[:-1])
+    reference = np.empty(n_chains, dtype=np.int64)
+    reference[chain_codes[first]] = index[first]
+    np.maximum.at(reference, chain_codes[is_com], index[is_com])
+    return reference
+
+
+def unwrap_by_chain(coords, chain_codes, is_com, box):
+    """
+    Makes every molecule (chain) whole: each atom moves by whole box lengths to the
+    image nearest to its chain's reference atom (see reference_atoms).
+
+    Returns:
+        ndarray: The unwrapped coordinates, shape (n, 3).
+    """
+    require_numpy()
+    _, length = _box_arrays(box)
+    reference = coords[reference_atoms(chain_codes, is_com)[chain_codes]]
+    return coords - np.round((coords - reference) / length) * length
+
+
+def wrap_coords(coords, box):
+    """
+    Wraps coordinates into the box, atom by atom.
+
+    Returns:
+        tuple[ndarray, ndarray]: The wrapped coordinates and the int64 image flags,
+        such that coords = wrapped + images * box length.
+    """
+    require_numpy()
+    lo, length = _box_arrays(box)
+    images = np.floor((coords - lo) / length).astype(np.int64)
+    wrapped = coords - images * length
+    # x just below lo can round up to exactly lo + length
+    edge = wrapped >= lo + length
+    wrapped[edge] -= np.broadcast_to(length, wrapped.shape)[edge]
+    images[edge] += 1
+    return wrapped, images
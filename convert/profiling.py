@@ -0,0 +1,255 @@
+# convert/profiling.py
+
+"""
+Optional instrumentation of the converters.
+
+Every converter is wrapped with `profiled`, and its hot paths are split into named
+stages ("parse", "format", "bonds", ...). Profiling is off by default. It is turned on by
+setting the environment variable FORMATCONVERT_PROFILE (to "1" or "-" for stderr, or to a
+log file path), by the `--profile` flag of the CLIs, or from Python:
+
+    from convert import profiling
+    profiling.enable(callback=print)
+
+Each converter call then produces one report: a dict with the wall time of every
+stage, record counts, bytes read and written and the peak RSS of the process. The
+report is passed to the registered callbacks and, with a log, appended to it as
+one JSON line.
+
+When profiling is off, `stage` returns a shared no-op context manager and `timed`
+returns its iterable unchanged; both are called once per chunk, never per atom,
+so the cost is negligible.
+"""
+
+import contextlib
+import functools
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+ENV_VAR = "FORMATCONVERT_PROFILE"
+
+_NULL_STAGE = contextlib.nullcontext()
+
+_enabled = False
+_log = None  # "-" for stderr, else a file path
+_callbacks = []
+_active = None  # Profile of the converter call in progress
+
+
+def enable(log=None, callback=None):
+    """
+    Turns profiling on.
+
+    Parameters:
+        log (str, optional): "-" for stderr or a file path; every report is appended
+            as one JSON line. Also exported in FORMATCONVERT_PROFILE, so worker
+            processes started afterwards log as well.
+        callback (callable, optional): Called with every report dict.
+    """
+    global _enabled, _log
+    _enabled = True
+    if log is not None:
+        _log = log
+        os.environ[ENV_VAR] = log
+    if callback is not None:
+        _callbacks.append(callback)
+
+
+def disable():
+    """
+    Turns profiling off and forgets the log and the callbacks.
+    """
+    global _enabled, _log
+    _enabled = False
+    _log = None
+    _callbacks.clear()
+    os.environ.pop(ENV_VAR, None)
+
+
+def is_enabled():
+    return _enabled
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of this process in MiB (None on Windows).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # bytes on macOS, KiB elsewhere
+
+
+class _Stage:
+    __slots__ = ("times", "name", "start")
+
+    def __init__(self, times, name):
+        self.times = times
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        entry = self.times.setdefault(self.name, [0.0, 0])
+        entry[0] += time.perf_counter() - self.start
+        entry[1] += 1
+
+
+class Profile:
+    """
+    Measurements of one converter call.
+    """
+
+    def __init__(self, converter, inputs=(), outputs=()):
+        self.converter = converter
+        self.inputs = [path for path in inputs if path]
+        self.outputs = [path for path in outputs if path]
+        self.stages = {}  # name -> [seconds, calls]
+        self.counts = {}
+        self.start = time.perf_counter()
+        self.seconds = None
+
+    def stage(self, name):
+        return _Stage(self.stages, name)
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def report(self):
+        """
+        Returns the measurements as a JSON-serializable dict.
+        """
+        rss = peak_rss_mb()
+        return {
+            "converter": self.converter,
+            "inputs": self.inputs,
+            "outputs": self.outputs,
+            "seconds": round(self.seconds, 6),
+            "stages": {name: {"seconds": round(t, 6), "calls": calls} for name, (t, calls) in self.stages.items()},
+            "counts": self.counts,
+            "bytes_read": sum(_size(path) for path in self.inputs),
+            "bytes_written": sum(_size(path) for path in self.outputs),
+            "peak_rss_mb": None if rss is None else round(rss, 1),
+        }
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def stage(name):
+    """
+    Context manager timing a stage of the converter call in progress; a no-op when
+    profiling is off.
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name)
+
+
+def timed(name, iterable):
+    """
+    Counts the time spent producing the items of `iterable` (e.g. reading and
+    parsing chunks) as stage `name`; returns `iterable` itself when profiling is off.
+    """
+    if _active is None:
+        return iterable
+    return _timed(_active, name, iterable)
+
+
+def _timed(profile, name, iterable):
+    iterator = iter(iterable)
+    while True:
+        with profile.stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def count(name, n=1):
+    """
+    Adds `n` to counter `name` of the converter call in progress (no-op when off).
+    """
+    if _active is not None:
+        _active.count(name, n)
+
+
+def _emit(report):
+    for callback in list(_callbacks):
+        callback(report)
+    if _log:
+        import json
+
+        line = json.dumps(report) + "\n"
+        if _log == "-":
+            sys.stderr.write(line)
+        else:
+            with open(_log, "a") as f:
+                f.write(line)
+
+
+def _paths(value):
+    if isinstance(value, dict):
+        return [path for path in value.values() if isinstance(path, str)]
+    if isinstance(value, (list, tuple)):
+        return [path for path in value if isinstance(path, str)]
+    return [value] if isinstance(value, str) else []
+
+
+def profiled(inputs=(), outputs=()):
+    """
+    Decorates a converter so that, when profiling is on, each call is measured and
+    reported. `inputs` and `outputs` name the parameters that hold file paths (a
+    path, a list of paths or a dict of paths); their sizes are reported as bytes
+    read and written. An int return value is reported as the "records" count.
+
+    A converter called while another call is being measured is counted as part
+    of the outer call.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            global _active
+            if not _enabled or _active is not None:
+                return fn(*args, **kwargs)
+
+            # Imported here: inspect alone would double the start-up time of the CLIs
+            import inspect
+
+            arguments = inspect.signature(fn).bind(*args, **kwargs).arguments
+            profile = Profile(
+                fn.__qualname__,
+                [path for name in inputs for path in _paths(arguments.get(name))],
+                [path for name in outputs for path in _paths(arguments.get(name))],
+            )
+            _active = profile
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                _active = None
+                profile.seconds = time.perf_counter() - profile.start
+            if isinstance(result, int):
+                profile.count("records", result)
+            _emit(profile.report())
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+_env = os.environ.get(ENV_VAR, "")
+if _env and _env != "0":
+    enable(log="-" if _env == "1" else _env)
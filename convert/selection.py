@@ -0,0 +1,277 @@
+# convert/selection.py
+
+"""
+Atom selection applied while a CIF file is streamed.
+
+A Selection keeps the ATOM records that match all of its criteria: chain IDs or
+shell-style patterns ("A", "A-*"), atom labels ("COM"), an axis-aligned bounding
+box, and every N-th molecule (chain) in order of first appearance. Every CIF
+converter accepts one as `selection=`:
+
+    from convert.selection import Selection
+    cif_to_pdb("assembly.cif", "a_chains.pdb", selection=Selection(chains=["A", "A-*"], labels=["COM"]))
+
+With `index=True`, selecting by chain (or every N-th chain) builds a chain-offset
+index next to the input on the first read (`<input>.chains.json`: the byte ranges
+of every chain's ATOM lines). Later selections from the same file seek straight to
+the ranges of the selected chains instead of scanning the whole file. The index is
+rebuilt when the input's size or modification time changes. Compressed and binary
+inputs are always scanned.
+"""
+
+import json
+import os
+from fnmatch import fnmatchcase
+
+from convert.cif_reader import DEFAULT_CHUNK_SIZE, is_binary, iter_atom_chunks, parse_atom_line
+from convert.compression import compression_suffix
+
+CHAIN_INDEX_SUFFIX = ".chains.json"
+
+
+class _ChainFilter:
+    """
+    Per-read chain decisions: the chain patterns, then every N-th of the chains that
+    pass them, numbered in order of first appearance.
+    """
+
+    def __init__(self, patterns, every):
+        self.patterns = patterns
+        self.every = every
+        self.decisions = {}
+        self.n_molecules = 0
+
+    def __call__(self, chain):
+        decision = self.decisions.get(chain)
+        if decision is None:
+            decision = self.patterns is None or any(fnmatchcase(chain, p) for p in self.patterns)
+            if decision:
+                decision = self.n_molecules % self.every == 0
+                self.n_molecules += 1
+            self.decisions[chain] = decision
+        return decision
+
+
+class Selection:
+    """
+    Criteria for the atoms kept by a conversion. An atom is kept if it matches all
+    the criteria that are given.
+
+    Parameters:
+        chains (iterable[str], optional): Chain IDs or shell-style patterns
+            (`fnmatch`, e.g. "A-*").
+        labels (iterable[str], optional): Atom labels, e.g. ["COM"].
+        bbox (tuple, optional): ((xlo, ylo, zlo), (xhi, yhi, zhi)), inclusive; atoms
+            are tested one by one, so a molecule crossing the box is cut.
+        every (int): Keep only every N-th molecule (chain) that passes `chains`,
+            starting with the first.
+        index (bool): Use (and build on first read) the chain-offset index of the
+            input when selecting by chain.
+    """
+
+    def __init__(self, chains=None, labels=None, bbox=None, every=1, index=False):
+        if every < 1:
+            raise ValueError(f"every must be positive, got {every}")
+        self.chains = None if chains is None else list(chains)
+        self.labels = None if labels is None else set(labels)
+        self.bbox = None if bbox is None else (tuple(map(float, bbox[0])), tuple(map(float, bbox[1])))
+        self.every = every
+        self.index = index
+
+    def __repr__(self):
+        labels = None if self.labels is None else sorted(self.labels)
+        return (f"Selection(chains={self.chains!r}, labels={labels!r}, bbox={self.bbox!r}, "
+                f"every={self.every!r}, index={self.index!r})")
+
+    @property
+    def by_chain(self):
+        return self.chains is not None or self.every > 1
+
+    def chain_filter(self):
+        """
+        Returns a fresh chain -> bool function; its every-N-th numbering starts over.
+        """
+        return _ChainFilter(self.chains, self.every)
+
+    def filter(self, sites, keep_chain):
+        """
+        Returns the records of `sites` that match, given a chain_filter() of this read.
+        """
+        labels, bbox = self.labels, self.bbox
+        kept = [site for site in sites if keep_chain(site.chain)]
+        if labels is not None:
+            kept = [site for site in kept if site.label in labels]
+        if bbox is not None:
+            (xlo, ylo, zlo), (xhi, yhi, zhi) = bbox
+            kept = [site for site in kept if xlo <= site.x <= xhi and ylo <= site.y <= yhi and zlo <= site.z <= zhi]
+        return kept
+
+    def mask(self, cols):
+        """
+        Returns a boolean array selecting the matching rows of an AtomColumns.
+        """
+        from convert.columnar import np
+
+        keep_chain = self.chain_filter()
+        # cols.chains is in order of first appearance, so every-N-th numbering
+        # matches the streaming path
+        mask = np.array([keep_chain(chain) for chain in cols.chains], dtype=bool)[cols.chain_codes]
+        if self.labels is not None:
+            label_ok = np.array([label in self.labels for label in cols.labels], dtype=bool)
+            mask &= label_ok[cols.label_codes]
+        if self.bbox is not None:
+            lo, hi = self.bbox
+            mask &= np.all((cols.coords >= lo) & (cols.coords <= hi), axis=1)
+        return mask
+
+    def iter_chunks(self, cif_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+        """
+        Streams the matching ATOM records of a CIF file in chunks of at most
+        `chunk_size` AtomSite tuples, in file order. `workers` is passed to
+        iter_atom_chunks when the whole file is read.
+        """
+        keep_chain = self.chain_filter()
+        if self.index and self.by_chain and compression_suffix(cif_path) is None and not is_binary(cif_path):
+            index = load_chain_index(cif_path)
+            if index is None:
+                chunks = _iter_chunks_building_index(cif_path, chunk_size)
+            else:
+                ranges = [r for chain, chain_ranges in index.items() if keep_chain(chain) for r in chain_ranges]
+                chunks = _iter_range_chunks(cif_path, sorted(ranges), chunk_size)
+        else:
+            chunks = iter_atom_chunks(cif_path, chunk_size, workers=workers)
+
+        for chunk in chunks:
+            kept = self.filter(chunk, keep_chain)
+            if kept:
+                yield kept
+
+
+def chain_index_path(cif_path):
+    return cif_path + CHAIN_INDEX_SUFFIX
+
+
+def _stamp(cif_path):
+    st = os.stat(cif_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_chain_index(cif_path):
+    """
+    Returns the chain-offset index of a CIF file, {chain: [[start, end], ...]} with
+    chains in order of first appearance, or None if it is missing or out of date.
+    """
+    try:
+        with open(chain_index_path(cif_path), "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("input") != _stamp(cif_path):
+        return None
+    return index["chains"]
+
+
+def _iter_chunks_building_index(cif_path, chunk_size):
+    """
+    Streams all ATOM records of a CIF file like iter_atom_chunks while recording the
+    byte ranges of consecutive ATOM lines of each chain, then saves the index.
+    """
+    stamp = _stamp(cif_path)
+    chains = {}  # chain -> [[start, end], ...]
+    current, current_chain = None, None  # range being extended
+    chunk = []
+    position = 0
+    with open(cif_path, "rb") as f:
+        for line in f:
+            start, position = position, position + len(line)
+            site = parse_atom_line(line.decode()) if line.startswith(b"ATOM") else None
+            if site is None:
+                current = None
+                continue
+            if current is not None and current_chain == site.chain:
+                current[1] = position
+            else:
+                current, current_chain = [start, position], site.chain
+                chains.setdefault(site.chain, []).append(current)
+            chunk.append(site)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+    try:
+        with open(chain_index_path(cif_path), "w") as f:
+            json.dump({"input": stamp, "chains": chains}, f)
+    except OSError:
+        pass  # e.g. a read-only input directory: scan again next time
+
+
+def _iter_range_chunks(cif_path, ranges, chunk_size):
+    """
+    Streams the ATOM records in the given sorted byte ranges of a CIF file.
+    """
+    chunk = []
+    with open(cif_path, "rb") as f:
+        for start, end in ranges:
+            f.seek(start)
+            position = start
+            while position < end:
+                line = f.readline()
+                position += len(line)
+                site = parse_atom_line(line.decode())
+                if site is not None:
+                    chunk.append(site)
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+    if chunk:
+        yield chunk
+
+
+def bbox(value):
+    """
+    Parses "xlo,ylo,zlo,xhi,yhi,zhi" into ((xlo, ylo, zlo), (xhi, yhi, zhi)).
+    """
+    values = [float(v) for v in value.split(",")]
+    if len(values) != 6:
+        raise ValueError(f"expected six comma-separated values, got {value!r}")
+    return tuple(values[:3]), tuple(values[3:])
+
+
+def positive_int(value):
+    n = int(value)
+    if n < 1:
+        raise ValueError(f"expected a positive integer, got {value!r}")
+    return n
+
+
+def add_selection_arguments(parser):
+    """
+    Adds the selection options (--chains, --labels, --bbox, --every, --chain-index)
+    to an argparse parser.
+    """
+    group = parser.add_argument_group("selection")
+    group.add_argument("--chains", help="comma-separated chain IDs or patterns to keep, e.g. 'A,A-*'")
+    group.add_argument("--labels", help="comma-separated atom labels to keep, e.g. COM")
+    group.add_argument("--bbox", type=bbox, metavar="XLO,YLO,ZLO,XHI,YHI,ZHI", help="keep atoms inside this box (Å)")
+    group.add_argument("--every", type=positive_int, default=1, metavar="N",
+                       help="keep every N-th molecule (chain) (default: 1)")
+    group.add_argument("--chain-index", action="store_true",
+                       help="build or use a chain-offset index next to the input to seek to selected chains")
+
+
+def selection_from_args(args):
+    """
+    Returns the Selection described by the options of add_selection_arguments, or
+    None if none of them was given.
+    """
+    if not (args.chains or args.labels or args.bbox or args.every != 1):
+        return None
+    return Selection(
+        chains=args.chains.split(",") if args.chains else None,
+        labels=args.labels.split(",") if args.labels else None,
+        bbox=args.bbox,
+        every=args.every,
+        index=args.chain_index,
+    )
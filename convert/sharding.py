@@ -0,0 +1,175 @@
+# convert/sharding.py
+
+"""
+Parallel parsing of one large CIF file.
+
+The file is cut into byte ranges ("shards") of about SHARD_BYTES, each ending at a
+line boundary, so every line belongs to exactly one shard. Worker processes read
+and parse their shards; the parent consumes the results strictly in shard order.
+Records therefore come back in file order, exactly as a serial read returns them.
+The things that depend on order are all computed by the parent afterwards: atom
+IDs, the chain and label numbering, and the COM-INT groups of a chain that spans
+two shards. They come out the same as in a serial run.
+
+At most 2 × `workers` shards are in flight at once, so memory stays bounded
+however large the file is. Compressed inputs cannot be read at an offset, so they
+are always parsed serially, and so are binary inputs.
+
+The converters use this through their `parse_workers` argument (the CLIs'
+`--parse-workers`), which iter_atom_chunks, count_atom_sites and
+columnar.read_cif_columns pass to `cif_reader.parse_workers_for`.
+"""
+
+import io
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from convert.cif_reader import ATOM_FIELDS as _FIELDS, AtomSite, split_atom_lines
+
+# Target size of one shard
+SHARD_BYTES = 16 << 20
+
+
+def shard_ranges(cif_path, n_shards):
+    """
+    Splits a file into at most `n_shards` byte ranges of similar size, each ending
+    at a line boundary.
+
+    Returns:
+        list[tuple[int, int]]: Consecutive (start, end) ranges covering the file.
+    """
+    size = os.path.getsize(cif_path)
+    bounds = [0]
+    with open(cif_path, "rb") as f:
+        for k in range(1, n_shards):
+            target = size * k // n_shards
+            if target <= bounds[-1]:
+                continue
+            # Extend to the end of the line containing `target`
+            f.seek(target - 1)
+            f.readline()
+            bound = f.tell()
+            if bound > bounds[-1]:
+                bounds.append(bound)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _read_atom_lines(cif_path, start, end):
+    with open(cif_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # Split lines like a text-mode file does; str.splitlines also splits on "\x0c", "\x85", ...
+    return [line for line in io.StringIO(data.decode(), newline=None) if line.startswith("ATOM")]
+
+
+def _parse_shard_sites(cif_path, start, end):
+    """
+    Parses the ATOM records of a shard into one list per AtomSite field.
+
+    Fields pickle several times faster than one tuple per record. Equal strings are
+    sent as one object, and the parent rebuilds the records chunk by chunk.
+    """
+    lines = _read_atom_lines(cif_path, start, end)
+    tokens = split_atom_lines(lines)
+    strings = {}
+    fields = []
+    for k, convert in enumerate((int, None, None, None, float, float, float, float, float, None), 1):
+        column = tokens[k::_FIELDS]
+        fields.append(list(map(convert, column)) if convert else [strings.setdefault(t, t) for t in column])
+    return fields
+
+
+def _count_shard_sites(cif_path, start, end):
+    return sum(1 for line in _read_atom_lines(cif_path, start, end) if len(line.split()) >= _FIELDS)
+
+
+def _parse_shard_columns(cif_path, start, end, chunk_size):
+    from convert.columnar import _parse_lines, np
+
+    lines = _read_atom_lines(cif_path, start, end)
+    tables = {"labels": {}, "resnames": {}, "chains": {}, "elements": {}}
+    parts = [_parse_lines(lines[i:i + chunk_size], tables) for i in range(0, len(lines), chunk_size)]
+    if not parts:
+        return None
+    columns = {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+    return columns, {name: list(table) for name, table in tables.items()}
+
+
+def _n_shards(cif_path, workers):
+    return max(workers, math.ceil(os.path.getsize(cif_path) / SHARD_BYTES))
+
+
+def map_shards(fn, cif_path, workers, *args):
+    """
+    Calls fn(cif_path, start, end, *args) on every shard of a file in a pool of
+    `workers` processes and yields the results in shard order, with at most
+    2 × `workers` shards submitted ahead of the one being consumed.
+    """
+    ranges = shard_ranges(cif_path, _n_shards(cif_path, workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(pool.submit(fn, cif_path, start, end, *args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_sharded_chunks(cif_path, workers, chunk_size):
+    """
+    Streams the ATOM records of a text CIF file, parsed by `workers` processes, in
+    the same chunks as cif_reader.iter_atom_chunks.
+    """
+    chunk = []
+    for fields in map_shards(_parse_shard_sites, cif_path, workers):
+        sites = map(AtomSite, *fields)
+        while True:
+            chunk += islice(sites, chunk_size - len(chunk))
+            if len(chunk) < chunk_size:
+                break
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def count_sharded_sites(cif_path, workers):
+    """
+    Counts the ATOM records of a text CIF file with `workers` processes.
+    """
+    return sum(map_shards(_count_shard_sites, cif_path, workers))
+
+
+def read_sharded_columns(cif_path, workers, chunk_size):
+    """
+    Parses the ATOM records of a text CIF file into an AtomColumns with `workers`
+    processes.
+
+    Each shard is parsed with its own category tables. The merge walks the shards
+    in order and maps every shard-local code to a code in a global table, so
+    labels, chains, ... keep their order of first appearance in the file. A chain
+    split across shards gets a single code, so it is still one group for the bond
+    functions.
+    """
+    from convert.columnar import columns_from_parts, np
+
+    tables = {"labels": {}, "resnames": {}, "chains": {}, "elements": {}}
+    parts = []
+    for result in map_shards(_parse_shard_columns, cif_path, workers, chunk_size):
+        if result is None:
+            continue
+        columns, local_tables = result
+        for name, local in local_tables.items():
+            table = tables[name]
+            recode = np.array([table.setdefault(value, len(table)) for value in local], dtype=np.int32)
+            codes = f"{name[:-1]}_codes"
+            columns[codes] = recode[columns[codes]]
+        parts.append(columns)
+
+    return columns_from_parts(parts, tables)
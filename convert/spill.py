@@ -0,0 +1,227 @@
+# convert/spill.py
+
+"""
+Out-of-core COM-INT bond construction (`--max-memory`).
+
+The streaming converters keep per-group lists of COM and INT IDs until the end of
+the file, so memory grows with the size of the structure. SpilledBonds builds the
+same bond list with bounded memory, through two external merge sorts:
+
+1. Every atom that may open a group is recorded as (group key, position, kind,
+   ID). Records are sorted by key in runs of at most `run_size` records, and the
+   runs are spilled to temporary files. Merging the runs brings each group's
+   records together, in stream order. For each group, this gives the position
+   where the group first appears, its last COM, and its INTs in order.
+2. Every bond is recorded as (first position of its group, COM ID, INT ID), and
+   the records are sorted by that position in the same way.
+
+Merging the second sort yields the bonds group by group, in order of first
+appearance, with INTs in stream order within a group. This is exactly the order
+of the in-memory dict loops, so the outputs are identical. Both sorts are
+stable, and heapq.merge takes equal keys from earlier runs first, so stream order
+is kept without being stored in the sort key.
+
+At most MAX_RUNS runs are merged at once: whenever MAX_RUNS runs of the same
+length have been spilled, they are merged into one longer run. This bounds the
+number of open temporary files, and the blocks read from them during a merge fit
+in the memory budget of a single run.
+"""
+
+import heapq
+import pickle
+import tempfile
+from operator import itemgetter
+
+# Rough size of one spilled record held in memory (tuple, key string, ints).
+RECORD_BYTES = 200
+
+# Maximum records per pickled block in a run file; one block per run is in memory
+# while the runs are merged.
+_BLOCK = 4096
+
+# Maximum number of runs merged at once (fan-in)
+MAX_RUNS = 64
+
+_KINDS = {"COM": 1, "INT": 2}
+
+_SUFFIXES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def memory_size(value):
+    """
+    Parses a memory size such as "512M", "2G" or "1000000" (bytes).
+    """
+    text = value.strip().upper()
+    if text.endswith("B"):
+        text = text[:-1]
+    number, suffix = (text[:-1], text[-1]) if text[-1:] in _SUFFIXES else (text, "")
+    size = int(float(number) * _SUFFIXES[suffix])
+    if size <= 0:
+        raise ValueError(f"expected a positive memory size, got {value!r}")
+    return size
+
+
+class ExternalSorter:
+    """
+    Stable sort of a stream of records by `key`, spilling sorted runs of at most
+    `run_size` records to temporary files and merging at most `max_runs` runs at
+    once.
+
+    Call `add` for every record, then iterate once over the sorted records.
+    """
+
+    def __init__(self, key, run_size, max_runs=MAX_RUNS):
+        if max_runs < 2:
+            raise ValueError(f"max_runs must be at least 2, got {max_runs}")
+        self.key = key
+        self.run_size = max(run_size, 1)
+        self.max_runs = max_runs
+        # Blocks of all merged runs together hold about one run
+        self.block = min(_BLOCK, max(self.run_size // max_runs, 1))
+        self.buffer = []
+        self.runs = []  # (level, file): a run of level n merges max_runs ** n spilled runs
+        self.n_records = 0
+
+    def add(self, record):
+        self.buffer.append(record)
+        self.n_records += 1
+        if len(self.buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        self.buffer.sort(key=self.key)
+        self.runs.append((0, self._write_run(self.buffer)))
+        self.buffer = []
+        # Runs are appended in stream order, so levels never increase along the list
+        while len(self.runs) >= self.max_runs and self.runs[-self.max_runs][0] == self.runs[-1][0]:
+            self._merge_runs(self.max_runs)
+
+    def _write_run(self, records):
+        run = tempfile.TemporaryFile()
+        block = []
+        for record in records:
+            block.append(record)
+            if len(block) >= self.block:
+                pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
+                block = []
+        if block:
+            pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        return run
+
+    def _merge_runs(self, n):
+        """
+        Merges the last `n` runs into one; merging adjacent runs keeps the sort stable.
+        """
+        tail = self.runs[-n:]
+        merged = heapq.merge(*(self._read_run(run) for _, run in tail), key=self.key)
+        self.runs[-n:] = [(tail[0][0] + 1, self._write_run(merged))]
+
+    @staticmethod
+    def _read_run(run):
+        try:
+            while True:
+                yield from pickle.load(run)
+        except EOFError:
+            pass
+        finally:
+            run.close()
+
+    def __iter__(self):
+        self.buffer.sort(key=self.key)
+        if not self.runs:
+            records, self.buffer = self.buffer, []
+            return iter(records)
+        excess = len(self.runs) + bool(self.buffer) - self.max_runs
+        while excess > 0:
+            n = min(excess + 1, self.max_runs)
+            self._merge_runs(n)
+            excess -= n - 1
+        runs = [self._read_run(run) for _, run in self.runs]
+        if self.buffer:
+            runs.append(iter(self.buffer))  # the last (most recent) run stays in memory
+        self.runs, self.buffer = [], []
+        return heapq.merge(*runs, key=self.key)
+
+    def close(self):
+        for _, run in self.runs:
+            run.close()
+        self.runs, self.buffer = [], []
+
+
+class SpilledBonds:
+    """
+    Out-of-core COM-INT grouping: each group's last COM is bonded to all of its
+    INTs, like the in-memory loops of cif_to_lammps and cif_to_pdb.
+
+    Parameters:
+        max_memory (int): Approximate memory budget (bytes) of the buffered records.
+
+    Groups are ordered by the first atom passed to `add` with their key, so pass
+    every atom that opens a group in the in-memory version (all atoms for
+    cif_to_lammps, COM/INT atoms for cif_to_pdb).
+
+    Example:
+        with SpilledBonds(max_memory) as groups:
+            for site in sites:
+                groups.add(site.chain, site.label, atom_id)
+            n_bonds = groups.finish()
+            for com_id, int_id in groups.bonds():
+                ...
+    """
+
+    def __init__(self, max_memory):
+        run_size = max_memory // RECORD_BYTES
+        self.atoms = ExternalSorter(itemgetter(0), run_size)
+        self.pairs = ExternalSorter(itemgetter(0), run_size)
+        self.position = 0
+        self.n_bonds = None
+
+    def add(self, key, label, atom_id):
+        """
+        Records the next atom of the stream.
+        """
+        self.atoms.add((key, self.position, _KINDS.get(label, 0), atom_id))
+        self.position += 1
+
+    def finish(self):
+        """
+        Groups the recorded atoms; returns the number of bonds.
+        """
+        pairs = self.pairs
+        group_key, first, com, ints = None, None, None, []
+        for key, position, kind, atom_id in self.atoms:
+            if key != group_key or first is None:
+                if com is not None:
+                    for int_id in ints:
+                        pairs.add((first, com, int_id))
+                group_key, first, com, ints = key, position, None, []
+            if kind == 1:
+                com = atom_id
+            elif kind == 2:
+                ints.append(atom_id)
+        if com is not None:
+            for int_id in ints:
+                pairs.add((first, com, int_id))
+        self.n_bonds = pairs.n_records
+        return self.n_bonds
+
+    def bonds(self):
+        """
+        Yields (com_id, int_id) pairs group by group in order of first appearance,
+        INTs in stream order within a group. Call `finish` first.
+        """
+        if self.n_bonds is None:
+            self.finish()
+        for _, com, int_id in self.pairs:
+            yield com, int_id
+
+    def close(self):
+        self.atoms.close()
+        self.pairs.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
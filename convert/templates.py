@@ -0,0 +1,130 @@
+# convert/templates.py
+
+"""
+LAMMPS molecule templates for cif_to_lammps.
+
+Most molecules in an assembly share their topology with thousands of other copies:
+the same sequence of atom labels, with the COM bonded to each INT. Molecules are
+grouped by that sequence of atom types (one type per label). Each group becomes a
+MoleculeTemplate, written once as a LAMMPS molecule file
+(https://docs.lammps.org/molecule.html) next to the data file. The `Coords` of a
+template are those of its first molecule in the file, relative to that molecule's
+COM.
+
+Every interface gets its own bond type: the k-th INT of a template is bonded to the
+COM with bond type `first_bond_type + k`. The data file gives its bonds these
+types, so a bond coefficient can be set per interface, and the same numbers appear
+in the molecule files. The files can then be used for `create_atoms`,
+`fix deposit` or `fix bond/react`.
+"""
+
+import os
+
+from convert.compression import open_file, strip_compression
+
+
+class MoleculeTemplate:
+    """
+    One molecule topology shared by several molecules.
+
+    Attributes:
+        name (str): Residue name of the first molecule, with "-2", "-3", ...
+            appended if another template already has it.
+        types (tuple[int]): Atom type of every atom, in file order.
+        com (int or None): Position of the (last) COM atom, None if there is none.
+        ints (list[int]): Positions of the INT atoms, bonded to `com`.
+        first_bond_type (int): Bond type of the bond to ints[0].
+        count (int): Number of molecules using the template.
+    """
+
+    def __init__(self, name, types, com, ints, first_bond_type):
+        self.name = name
+        self.types = types
+        self.com = com
+        self.ints = ints if com is not None else []
+        self.first_bond_type = first_bond_type
+        self.count = 0
+
+    @property
+    def n_bond_types(self):
+        return len(self.ints)
+
+
+def build_templates(molecules, com_type, int_type):
+    """
+    Groups molecules into templates by their sequence of atom types.
+
+    Parameters:
+        molecules (iterable): (residue name, tuple of atom types) of every molecule,
+            in order of molecule ID.
+        com_type, int_type (int or None): Atom types of the COM and INT labels.
+
+    Returns:
+        tuple[list[MoleculeTemplate], list[int]]: The templates in order of first
+        appearance, and the template index of every molecule.
+    """
+    by_types = {}
+    templates = []
+    names = set()
+    molecule_templates = []
+    for resname, types in molecules:
+        index = by_types.get(types)
+        if index is None:
+            index = by_types[types] = len(templates)
+            coms = [k for k, t in enumerate(types) if t == com_type]
+            ints = [k for k, t in enumerate(types) if t == int_type]
+            name, copy = resname, 1
+            while name in names:
+                copy += 1
+                name = f"{resname}-{copy}"
+            names.add(name)
+            first_bond_type = 1 + sum(t.n_bond_types for t in templates)
+            templates.append(MoleculeTemplate(name, types, coms[-1] if coms else None, ints, first_bond_type))
+        templates[index].count += 1
+        molecule_templates.append(index)
+    return templates, molecule_templates
+
+
+def count_bond_types(templates):
+    """
+    Returns the number of bond types of a data file using `templates` (at least 1).
+    """
+    return max(1, sum(t.n_bond_types for t in templates))
+
+
+def template_path(lammps_path, name):
+    """
+    Returns the path of a template's molecule file: "system.lmp.gz" -> "system.<name>.mol".
+    """
+    root = os.path.splitext(strip_compression(lammps_path))[0]
+    return f"{root}.{name}.mol"
+
+
+def write_molecule_template(path, template, coords, source=""):
+    """
+    Writes a LAMMPS molecule file.
+
+    Parameters:
+        path (str): Output path.
+        template (MoleculeTemplate): The template.
+        coords (list[tuple[float, float, float]]): Coordinates of the template's
+            atoms in one molecule, as written in the data file (%.4f); they are
+            written relative to the COM (or to the first atom without a COM).
+        source (str): Name of the input file, for the comment line.
+    """
+    ox, oy, oz = coords[template.com if template.com is not None else 0]
+    with open_file(path, "w") as f:
+        f.write(f"# Molecule template {template.name}{f' from {source}' if source else ''}: "
+                f"{template.count} molecules\n\n")
+        f.write(f"{len(template.types)} atoms\n")
+        f.write(f"{len(template.ints)} bonds\n\n")
+        f.write("Coords\n\n")
+        f.write("".join(f"{k} {x - ox:.4f} {y - oy:.4f} {z - oz:.4f}\n" for k, (x, y, z) in enumerate(coords, 1)))
+        f.write("\nTypes\n\n")
+        f.write("".join(f"{k} {t}\n" for k, t in enumerate(template.types, 1)))
+        if template.ints:
+            f.write("\nBonds\n\n")
+            f.write("".join(
+                f"{k} {template.first_bond_type + k - 1} {template.com + 1} {int_index + 1}\n"
+                for k, int_index in enumerate(template.ints, 1)
+            ))
@@ -0,0 +1,54 @@
+# convert/topology.py
+
+
+class ComIntGroups:
+    """
+    Incrementally built COM-INT grouping of a stream of AtomSite records.
+
+    Atoms are grouped by (residue name, chain); each COM is bonded to every INT of its
+    group (the last COM wins if a group has several). Atom indices are 0-based
+    positions in the stream. Only the indices of COM/INT atoms are kept, so memory
+    grows with the number of bonds, not with the size of the records.
+
+    Example:
+        groups = ComIntGroups()
+        for chunk in iter_atom_chunks(cif_path):
+            groups.add(chunk)
+        for com, int_index in groups.bonds():
+            ...
+    """
+
+    def __init__(self):
+        self.groups = {}  # (res_name, chain_id) -> [COM index, [INT indices]]
+        self.n_atoms = 0
+
+    def add(self, sites):
+        """
+        Adds the next consecutive records of the stream.
+        """
+        groups = self.groups
+        for index, atom in enumerate(sites, self.n_atoms):
+            if atom.label == "COM" or atom.label == "INT":
+                key = (atom.resname, atom.chain)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = [None, []]
+                if atom.label == "COM":
+                    group[0] = index
+                else:
+                    group[1].append(index)
+        self.n_atoms += len(sites)
+
+    @property
+    def n_bonds(self):
+        return sum(len(ints) for com, ints in self.groups.values() if com is not None)
+
+    def bonds(self):
+        """
+        Yields 0-based (com_index, int_index) pairs, group by group in order of first
+        appearance and INTs in stream order within a group.
+        """
+        for com, ints in self.groups.values():
+            if com is not None:
+                for int_index in ints:
+                    yield com, int_index
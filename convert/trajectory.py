@@ -0,0 +1,338 @@
+# convert/trajectory.py
+
+import os
+import re
+import struct
+import sys
+from array import array
+
+from convert.cif_reader import iter_cif_frames
+from convert.cif_to_lammps import BOX_PADDING, write_lammps_header
+from convert.cif_to_xyz import format_xyz_atom
+from convert.compression import compression_suffix, open_file, strip_compression
+from convert.pdb_reader import iter_pdb_models
+from convert.profiling import profiled, stage, timed
+from convert.topology import ComIntGroups
+
+
+def natural_sort_key(path):
+    """
+    Sort key that orders numbered file series numerically (frame_2 before frame_10).
+    """
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+
+def iter_frames(paths):
+    """
+    Streams frames from CIF files (one frame per data_ block) and PDB files (one
+    frame per MODEL) in the given order. Only one frame is held in memory at a time.
+
+    Parameters:
+        paths (list[str]): Input files; a numbered series should be sorted with
+            natural_sort_key first.
+
+    Yields:
+        list[AtomSite]: The atoms of each frame.
+    """
+    for path in paths:
+        if strip_compression(path).lower().endswith((".pdb", ".ent")):
+            yield from iter_pdb_models(path)
+        else:
+            yield from iter_cif_frames(path)
+
+
+def frame_bounds(sites):
+    """
+    Returns the (lo, hi) coordinate bounds of a frame as two (x, y, z) tuples.
+    """
+    columns = ([a.x for a in sites], [a.y for a in sites], [a.z for a in sites])
+    return tuple(min(c) for c in columns), tuple(max(c) for c in columns)
+
+
+class XYZTrajectoryWriter:
+    """
+    Writes frames to a multi-frame XYZ file, one "count / comment / atoms" block each.
+
+    Open with mode "a" to append frames to an existing trajectory. `compress_level`
+    and `write_queue` are passed to open_file.
+    """
+
+    def __init__(self, xyz_path, mode="w", compress_level=None, write_queue=None):
+        self.file = open_file(xyz_path, mode, compress_level, write_queue)
+        self.frames = 0
+
+    def write_frame(self, sites, comment=None):
+        if comment is None:
+            comment = f"Frame {self.frames}"
+        self.file.write(f"{len(sites)}\n{comment}\n" + "".join(map(format_xyz_atom, sites)))
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LammpsDumpWriter:
+    """
+    Writes frames to a LAMMPS text dump (ITEM: TIMESTEP / NUMBER OF ATOMS / BOX BOUNDS /
+    ATOMS id type x y z). Atom IDs are 1-based positions within each frame, matching
+    the LAMMPS data files written by cif_to_lammps.
+
+    Each frame's box is its coordinate bounds padded by BOX_PADDING, unless a fixed
+    `box` ((xlo, xhi), (ylo, yhi), (zlo, zhi)) is given. Open with mode "a" to append.
+    `compress_level` and `write_queue` are passed to open_file.
+    """
+
+    def __init__(self, dump_path, mode="w", box=None, compress_level=None, write_queue=None):
+        self.file = open_file(dump_path, mode, compress_level, write_queue)
+        self.box = box
+        self.frames = 0
+
+    def write_frame(self, sites, timestep=None):
+        if timestep is None:
+            timestep = self.frames
+        if self.box is not None:
+            bounds = self.box
+        else:
+            lo, hi = frame_bounds(sites)
+            bounds = [(l - BOX_PADDING, h + BOX_PADDING) for l, h in zip(lo, hi)]
+
+        header = (
+            f"ITEM: TIMESTEP\n{timestep}\n"
+            f"ITEM: NUMBER OF ATOMS\n{len(sites)}\n"
+            "ITEM: BOX BOUNDS pp pp pp\n"
+            + "".join(f"{lo:.3f} {hi:.3f}\n" for lo, hi in bounds)
+            + "ITEM: ATOMS id type x y z\n"
+        )
+        self.file.write(header + "".join(
+            f"{atom_id} 1 {atom.x:.4f} {atom.y:.4f} {atom.z:.4f}\n"
+            for atom_id, atom in enumerate(sites, 1)
+        ))
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DCDTrajectoryWriter:
+    """
+    Writes frames to a binary CHARMM/NAMD DCD trajectory (little-endian, 32-bit
+    Fortran record markers), as read by VMD and MDAnalysis. Coordinates are stored
+    in Å as float32 x, y and z blocks, so a frame takes 12 bytes per atom plus 24
+    bytes of record markers.
+
+    Every frame must have the same number of atoms. The frame count in the header
+    is updated on close. With a fixed `box` ((xlo, xhi), (ylo, yhi), (zlo, zhi)),
+    each frame carries its unit cell. Open with mode "a" to append to an existing
+    DCD file. The file must be seekable, so compressed paths are rejected.
+    """
+
+    # Byte offsets in the header of the frame count, the last timestep and the atom count
+    _NSET, _NSTEP, _NATOMS = 8, 20, 268
+
+    def __init__(self, dcd_path, mode="w", box=None, timestep_stride=1):
+        if compression_suffix(dcd_path):
+            raise ValueError(f"DCD files cannot be compressed: {dcd_path}")
+        self.box = box
+        self.timestep_stride = timestep_stride
+        self.frames = 0
+        self.n_atoms = None
+        if mode == "a" and os.path.exists(dcd_path) and os.path.getsize(dcd_path) > 0:
+            self.file = open(dcd_path, "r+b")
+            header = self.file.read(self._NATOMS + 4)
+            self.frames = struct.unpack_from("<i", header, self._NSET)[0]
+            self.n_atoms = struct.unpack_from("<i", header, self._NATOMS)[0]
+            if bool(struct.unpack_from("<i", header, 48)[0]) != (box is not None):
+                self.file.close()
+                raise ValueError(f"{dcd_path}: a fixed box is needed exactly when the file has unit cells")
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(dcd_path, "wb")
+
+    def _write_header(self, n_atoms):
+        control = [0] * 20
+        control[1] = 0  # first timestep
+        control[2] = self.timestep_stride
+        control[10] = 1 if self.box is not None else 0
+        control[19] = 24  # CHARMM version
+        title = b"Converted by FormatConvert".ljust(80) + b"Coordinates in Angstrom".ljust(80)
+        self.file.write(
+            struct.pack("<i4s9if10i", 84, b"CORD", *control[:9], 0.0, *control[10:]) + struct.pack("<i", 84)
+            + struct.pack("<ii", 164, 2) + title + struct.pack("<i", 164)
+            + struct.pack("<iii", 4, n_atoms, 4)
+        )
+        self.n_atoms = n_atoms
+
+    def write_frame(self, sites):
+        if self.n_atoms is None:
+            self._write_header(len(sites))
+        elif len(sites) != self.n_atoms:
+            raise ValueError(f"DCD frames must all have {self.n_atoms} atoms, got {len(sites)}")
+
+        parts = []
+        if self.box is not None:
+            (xlo, xhi), (ylo, yhi), (zlo, zhi) = self.box
+            # A, gamma, B, beta, alpha, C
+            parts.append(struct.pack("<i6di", 48, xhi - xlo, 90.0, yhi - ylo, 90.0, 90.0, zhi - zlo, 48))
+        marker = struct.pack("<i", 4 * len(sites))
+        for axis in zip(*(site[4:7] for site in sites)):
+            block = array("f", axis)
+            if sys.byteorder == "big":
+                block.byteswap()
+            parts += [marker, block.tobytes(), marker]
+        self.file.write(b"".join(parts))
+        self.frames += 1
+
+    def close(self):
+        if self.n_atoms is not None:
+            self.file.seek(self._NSET)
+            self.file.write(struct.pack("<i", self.frames))
+            self.file.seek(self._NSTEP)
+            self.file.write(struct.pack("<i", (self.frames - 1) * self.timestep_stride))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_topology(sites, bonds_path=None, data_path=None, compress_level=None, write_queue=None):
+    """
+    Writes the COM-INT topology of one frame as a `.bonds` file and/or a LAMMPS data file.
+    `compress_level` and `write_queue` are passed to open_file.
+    """
+    groups = ComIntGroups()
+    groups.add(sites)
+
+    if bonds_path:
+        with open_file(bonds_path, "w", compress_level, write_queue) as out:
+            for com, int_index in groups.bonds():
+                out.write(f"{com} {int_index}\n")
+
+    if data_path:
+        lo, hi = frame_bounds(sites)
+        with open_file(data_path, "w", compress_level, write_queue) as out:
+            write_lammps_header(out, len(sites), groups.n_bonds, lo, hi)
+            out.write("Atoms\n\n")
+            for atom_id, atom in enumerate(sites, 1):
+                out.write(f"{atom_id} 1 {atom.x:.4f} {atom.y:.4f} {atom.z:.4f}\n")
+            out.write("\nBonds\n\n")
+            for bond_id, (com, int_index) in enumerate(groups.bonds(), 1):
+                out.write(f"{bond_id} 1 {com + 1} {int_index + 1}\n")
+
+    return groups.n_bonds
+
+
+@profiled(inputs=("input_paths",), outputs=("xyz_path", "dump_path", "bonds_path", "data_path", "dcd_path"))
+def convert_trajectory(input_paths, xyz_path=None, dump_path=None, bonds_path=None, data_path=None,
+                       timestep_stride=1, box=None, dcd_path=None, compress_level=None, write_queue=None):
+    """
+    Streams the frames of CIF/PDB files into a multi-frame XYZ file, a LAMMPS dump
+    and/or a binary DCD trajectory.
+
+    The topology (COM-INT bonds) is taken from the first frame and written only once,
+    to `bonds_path` and/or a LAMMPS data file at `data_path`. Frames are read and
+    written one at a time, so memory does not grow with the number of frames.
+
+    Parameters:
+        input_paths (list[str]): Multi-block CIF files, multi-model PDB files or a
+            numbered series of either, in frame order.
+        xyz_path (str, optional): Multi-frame XYZ output.
+        dump_path (str, optional): LAMMPS dump output.
+        bonds_path (str, optional): `.bonds` file for the first frame.
+        data_path (str, optional): LAMMPS data file (atoms + bonds) for the first frame.
+        timestep_stride (int): Timestep increment between frames in the dump.
+        box (tuple, optional): Fixed ((xlo, xhi), (ylo, yhi), (zlo, zhi)) for the dump,
+            also stored as the unit cell of the DCD frames.
+        dcd_path (str, optional): DCD output; every frame must have the same atoms.
+        compress_level (int, optional): Compression level (0-9) of .gz/.bz2/.xz
+            outputs (see convert/compression.py).
+        write_queue (int, optional): Write the outputs from a background thread,
+            queueing up to this many blocks (see convert/async_writer.py).
+
+    Returns:
+        int: Number of frames written.
+    """
+    if not (xyz_path or dump_path or bonds_path or data_path or dcd_path):
+        raise ValueError("convert_trajectory needs at least one output path")
+
+    xyz = XYZTrajectoryWriter(xyz_path, compress_level=compress_level, write_queue=write_queue) if xyz_path else None
+    dump = (LammpsDumpWriter(dump_path, box=box, compress_level=compress_level, write_queue=write_queue)
+            if dump_path else None)
+    dcd = DCDTrajectoryWriter(dcd_path, box=box, timestep_stride=timestep_stride) if dcd_path else None
+    n_frames = 0
+    try:
+        for sites in timed("parse", iter_frames(input_paths)):
+            if n_frames == 0 and (bonds_path or data_path):
+                with stage("topology"):
+                    write_topology(sites, bonds_path, data_path, compress_level, write_queue)
+            if xyz:
+                with stage("xyz"):
+                    xyz.write_frame(sites)
+            if dump:
+                with stage("dump"):
+                    dump.write_frame(sites, n_frames * timestep_stride)
+            if dcd:
+                with stage("dcd"):
+                    dcd.write_frame(sites)
+            n_frames += 1
+    finally:
+        for writer in (xyz, dump, dcd):
+            if writer:
+                writer.close()
+    return n_frames
+
+
+def main(argv=None):
+    import argparse
+    import glob
+
+    from convert.cli import add_io_arguments, io_options_from_args
+
+    parser = argparse.ArgumentParser(
+        description="Convert CIF/PDB frames to a multi-frame XYZ file, LAMMPS dump or DCD file."
+    )
+    parser.add_argument("inputs", nargs="+",
+                        help="multi-block CIF / multi-model PDB files or a numbered series (globs allowed)")
+    parser.add_argument("--xyz", help="multi-frame XYZ output")
+    parser.add_argument("--dump", help="LAMMPS dump output")
+    parser.add_argument("--dcd", help="binary DCD trajectory output")
+    parser.add_argument("--bonds", help="bonds of the first frame")
+    parser.add_argument("--data", help="LAMMPS data file (topology) of the first frame")
+    parser.add_argument("--stride", type=int, default=1, help="timestep increment between frames (default: 1)")
+    parser.add_argument("--box", nargs=6, type=float, metavar=("XLO", "XHI", "YLO", "YHI", "ZLO", "ZHI"),
+                        help="fixed box of the dump frames, also stored as the DCD unit cell")
+    add_io_arguments(parser, parse_workers=False)
+    args = parser.parse_args(argv)
+
+    io_options = io_options_from_args(args)
+
+    paths = []
+    for pattern in args.inputs:
+        paths.extend(sorted(glob.glob(pattern), key=natural_sort_key) or [pattern])
+
+    box = tuple(zip(args.box[0::2], args.box[1::2])) if args.box else None
+    n_frames = convert_trajectory(paths, args.xyz, args.dump, args.bonds, args.data, args.stride, box,
+                                  dcd_path=args.dcd, **io_options)
+    print(f"Converted {n_frames} frames from {len(paths)} file(s)")
+    return 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
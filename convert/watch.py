@@ -0,0 +1,361 @@
+# convert/watch.py
+
+"""
+Live conversion of a running ioNERDSS simulation.
+
+A TrajectoryWatcher polls a growing multi-block CIF / multi-model PDB file, or a
+directory (or glob) into which new snapshot files are written, and appends every
+new frame to a multi-frame XYZ file, a LAMMPS dump and/or a DCD trajectory:
+
+    python -m convert.watch output/ --xyz live.xyz --dump live.lammpstrj --state live.watch.json
+
+Each file is read from the byte offset where the previous poll stopped, and the
+atoms of a frame that is still being written are kept until the frame is complete,
+so no line is parsed twice. A frame is complete once the next `data_` block
+starts (CIF) or its ENDMDL/END record appears (PDB); the last CIF frame of a file
+is complete once a later file of the series appears, or at the final poll.
+Compressed and binary `.npz` inputs cannot be read from an offset and are
+converted as a whole once a later file appears.
+
+With a state file, the offsets and the frame counters are saved after every poll,
+so a restarted watcher appends to the existing outputs where the last one stopped.
+
+A file that shrinks below the read position was truncated or rewritten. It is
+read again from the start, skipping as many frames as were already converted from
+it, so frames already in the outputs are never appended a second time.
+"""
+
+import glob
+import json
+import os
+import time
+
+from convert.cif_reader import is_binary, parse_atom_line
+from convert.compression import compression_suffix, strip_compression
+from convert.pdb_reader import parse_pdb_atom_line
+from convert.profiling import profiled, stage, timed
+from convert.trajectory import (
+    DCDTrajectoryWriter,
+    iter_frames,
+    LammpsDumpWriter,
+    natural_sort_key,
+    write_topology,
+    XYZTrajectoryWriter,
+)
+
+# Inputs picked up when a directory is watched
+WATCH_SUFFIXES = (".cif", ".pdb", ".ent", ".npz")
+
+# Suffix of state files; batch conversions skip such files
+STATE_SUFFIX = ".watch.json"
+
+
+def _is_pdb(path):
+    return strip_compression(path).lower().endswith((".pdb", ".ent"))
+
+
+class FileTail:
+    """
+    Reads the frames that were appended to one CIF or PDB file since the last call.
+
+    `offset` is the start of the first frame not yet returned; it is what a state
+    file stores, with `frames`, the number of frames returned so far, and `skip`.
+    `position` is the end of the last complete line read, and the records between
+    the two are held in `pending`. A line without its newline is left for the next
+    call. After the file was truncated, the next `skip` complete frames were already
+    returned and are dropped.
+    """
+
+    def __init__(self, path, offset=0, done=False, frames=0, skip=0):
+        self.path = path
+        self.offset = offset
+        self.position = offset
+        self.pending = []
+        self.done = done
+        self.frames = frames
+        self.skip = skip
+        self.pdb = _is_pdb(path)
+        self.seekable = compression_suffix(path) is None and not is_binary(path)
+
+    def read_frames(self, final=False):
+        """
+        Yields the frames completed since the last call, as lists of AtomSite.
+
+        Parameters:
+            final (bool): The file is complete; also yield the last frame, and
+                ignore the file from now on.
+        """
+        if self.done:
+            return
+        if not self.seekable:
+            if final:
+                yield from iter_frames([self.path])
+                self.done = True
+            return
+
+        if os.path.getsize(self.path) < self.position:
+            # The file was truncated or rewritten: start over, without the frames
+            # already returned
+            self.offset = self.position = 0
+            self.pending = []
+            self.skip = self.frames
+
+        parse = parse_pdb_atom_line if self.pdb else parse_atom_line
+        records = (b"ATOM", b"HETATM") if self.pdb else (b"ATOM",)
+        boundary = (b"ENDMDL", b"END") if self.pdb else (b"data_",)
+        with open(self.path, "rb") as f:
+            f.seek(self.position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                self.position += len(line)
+                if line.startswith(records):
+                    site = parse(line.decode())
+                    if site is not None:
+                        self.pending.append(site)
+                elif line.startswith(boundary) and self.pending:
+                    yield from self._complete()
+
+        if final:
+            if self.pending:
+                yield from self._complete()
+            self.done = True
+
+    def _complete(self):
+        """
+        Ends the pending frame. Returns it as a 1-tuple, or () if it is skipped.
+        """
+        frame, self.pending = self.pending, []
+        self.offset = self.position
+        if self.skip:
+            self.skip -= 1
+            return ()
+        self.frames += 1
+        return (frame,)
+
+
+class TrajectoryWatcher:
+    """
+    Appends the new frames of growing inputs to a multi-frame XYZ file, a LAMMPS
+    dump and/or a DCD trajectory on every `poll`.
+
+    Parameters:
+        sources (list[str]): Files, directories or glob patterns to watch. Files
+            found in them are processed in natural sort order.
+        xyz_path (str, optional): Multi-frame XYZ output.
+        dump_path (str, optional): LAMMPS dump output.
+        bonds_path (str, optional): `.bonds` file for the first frame.
+        data_path (str, optional): LAMMPS data file (atoms + bonds) for the first frame.
+        timestep_stride (int): Timestep increment between frames in the dump.
+        box (tuple, optional): Fixed ((xlo, xhi), (ylo, yhi), (zlo, zhi)) for the dump
+            and the DCD unit cell.
+        state_path (str, optional): JSON file holding the offsets and the frame
+            counters. If it exists, watching resumes from it and the outputs are
+            appended to; otherwise the outputs are started afresh.
+        dcd_path (str, optional): DCD output.
+        compress_level (int, optional): Compression level (0-9) of .gz/.bz2/.xz
+            outputs (see convert/compression.py).
+        write_queue (int, optional): Write the outputs from a background thread,
+            queueing up to this many blocks (see convert/async_writer.py).
+    """
+
+    def __init__(self, sources, xyz_path=None, dump_path=None, bonds_path=None, data_path=None,
+                 timestep_stride=1, box=None, state_path=None, dcd_path=None, compress_level=None, write_queue=None):
+        if not (xyz_path or dump_path or bonds_path or data_path or dcd_path):
+            raise ValueError("TrajectoryWatcher needs at least one output path")
+        self.sources = list(sources)
+        self.xyz_path = xyz_path
+        self.dump_path = dump_path
+        self.bonds_path = bonds_path
+        self.data_path = data_path
+        self.dcd_path = dcd_path
+        self.timestep_stride = timestep_stride
+        self.box = box
+        self.state_path = state_path
+        self.compress_level = compress_level
+        self.write_queue = write_queue
+        self.frames = 0
+        self.tails = {}
+
+        if state_path and os.path.exists(state_path):
+            with open(state_path, "r") as f:
+                state = json.load(f)
+            self.frames = state["frames"]
+            for path, entry in state["files"].items():
+                self.tails[path] = FileTail(path, entry["offset"], entry["done"], entry.get("frames", 0),
+                                            entry.get("skip", 0))
+
+    def discover(self):
+        """
+        Returns the input files currently present, in processing order: the order
+        of `sources`, and natural sort order within a directory or glob pattern.
+        """
+        paths = []
+        for source in self.sources:
+            if os.path.isdir(source):
+                matches = [
+                    os.path.join(source, name) for name in os.listdir(source)
+                    if strip_compression(name).lower().endswith(WATCH_SUFFIXES)
+                ]
+            elif glob.has_magic(source):
+                matches = glob.glob(source)
+            else:
+                matches = [source] if os.path.exists(source) else []
+            paths.extend(sorted(matches, key=natural_sort_key))
+        return paths
+
+    @profiled()
+    def poll(self, final=False):
+        """
+        Converts the frames completed since the last poll and saves the state.
+
+        Parameters:
+            final (bool): The inputs are complete; also convert the last frame of
+                every file.
+
+        Returns:
+            int: Number of frames appended.
+        """
+        paths = self.discover()
+        xyz = dump = dcd = None
+        n_frames = 0
+        try:
+            for index, path in enumerate(paths):
+                tail = self.tails.get(path)
+                if tail is None:
+                    tail = self.tails[path] = FileTail(path)
+                # A file followed by a later one in the series is complete
+                for sites in timed("parse", tail.read_frames(final or index < len(paths) - 1)):
+                    if self.frames == 0 and (self.bonds_path or self.data_path):
+                        with stage("topology"):
+                            write_topology(sites, self.bonds_path, self.data_path, self.compress_level,
+                                           self.write_queue)
+                    if self.xyz_path:
+                        if xyz is None:
+                            xyz = XYZTrajectoryWriter(self.xyz_path, "a" if self.frames else "w",
+                                                      self.compress_level, self.write_queue)
+                            xyz.frames = self.frames
+                        with stage("xyz"):
+                            xyz.write_frame(sites)
+                    if self.dump_path:
+                        if dump is None:
+                            dump = LammpsDumpWriter(self.dump_path, "a" if self.frames else "w", self.box,
+                                                    self.compress_level, self.write_queue)
+                        with stage("dump"):
+                            dump.write_frame(sites, self.frames * self.timestep_stride)
+                    if self.dcd_path:
+                        if dcd is None:
+                            dcd = DCDTrajectoryWriter(self.dcd_path, "a" if self.frames else "w", self.box,
+                                                      self.timestep_stride)
+                        with stage("dcd"):
+                            dcd.write_frame(sites)
+                    self.frames += 1
+                    n_frames += 1
+        finally:
+            for writer in (xyz, dump, dcd):
+                if writer:
+                    writer.close()
+            self.save()
+        return n_frames
+
+    def save(self):
+        """
+        Writes the offsets and the frame counters to the state file, if there is one.
+        """
+        if not self.state_path:
+            return
+        state = {
+            "frames": self.frames,
+            "files": {
+                path: {"offset": tail.offset, "done": tail.done, "frames": tail.frames, "skip": tail.skip}
+                for path, tail in self.tails.items()
+            },
+        }
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def run(self, interval=1.0, idle_timeout=None, report=None):
+        """
+        Polls every `interval` seconds until interrupted, or until no new frame has
+        appeared for `idle_timeout` seconds; then makes a final poll that also
+        converts the last frame of every file.
+
+        Parameters:
+            interval (float): Seconds between polls.
+            idle_timeout (float, optional): Stop after this many seconds without new frames.
+            report (callable, optional): Called with a message after each poll that
+                appended frames.
+
+        Returns:
+            int: Number of frames appended.
+        """
+        total = 0
+        last_activity = time.monotonic()
+        try:
+            while idle_timeout is None or time.monotonic() - last_activity < idle_timeout:
+                n_frames = self.poll()
+                if n_frames:
+                    total += n_frames
+                    last_activity = time.monotonic()
+                    if report:
+                        report(f"Appended {n_frames} frames ({self.frames} in total)")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            # The last frame may still be incomplete: leave it for the next run
+            return total
+        total += self.poll(final=True)
+        return total
+
+
+def main(argv=None):
+    import argparse
+
+    from convert.cli import add_io_arguments, io_options_from_args
+
+    parser = argparse.ArgumentParser(
+        description="Watch growing CIF/PDB trajectories or snapshot directories and append new frames to "
+                    "a multi-frame XYZ file, LAMMPS dump or DCD file.",
+    )
+    parser.add_argument("sources", nargs="+", help="files, directories or glob patterns to watch")
+    parser.add_argument("--xyz", help="multi-frame XYZ output")
+    parser.add_argument("--dump", help="LAMMPS dump output")
+    parser.add_argument("--dcd", help="binary DCD trajectory output")
+    parser.add_argument("--bonds", help="bonds of the first frame")
+    parser.add_argument("--data", help="LAMMPS data file (topology) of the first frame")
+    parser.add_argument("--stride", type=int, default=1, help="timestep increment between frames (default: 1)")
+    parser.add_argument("--box", nargs=6, type=float, metavar=("XLO", "XHI", "YLO", "YHI", "ZLO", "ZHI"),
+                        help="fixed box of the dump frames, also stored as the DCD unit cell")
+    parser.add_argument("--state", help=f"state file for resuming, e.g. live{STATE_SUFFIX} (default: none)")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between polls (default: 2)")
+    parser.add_argument("--idle-timeout", type=float,
+                        help="stop after this many seconds without new frames (default: run until interrupted)")
+    parser.add_argument("--once", action="store_true",
+                        help="convert what is there, including the last frame of every file, and exit")
+    add_io_arguments(parser, parse_workers=False)
+    args = parser.parse_args(argv)
+
+    if not (args.xyz or args.dump or args.dcd or args.bonds or args.data):
+        parser.error("give at least one of --xyz, --dump, --dcd, --bonds, --data")
+
+    io_options = io_options_from_args(args)
+
+    box = tuple(zip(args.box[0::2], args.box[1::2])) if args.box else None
+    watcher = TrajectoryWatcher(args.sources, args.xyz, args.dump, args.bonds, args.data,
+                                args.stride, box, state_path=args.state, dcd_path=args.dcd, **io_options)
+    if args.once:
+        n_frames = watcher.poll(final=True)
+    else:
+        n_frames = watcher.run(args.interval, args.idle_timeout, report=print)
+    print(f"Appended {n_frames} frames ({watcher.frames} in total)")
+    return 0
+
+
+# -------------------------------
+# CLI usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import numpy
+    from convert.assemble import assemble_system, place_lattice, place_random, random_rotations
+    from convert.contacts import find_contacts_array
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestAssembleSystem(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = self._path("model.json")
+        model = {
+            "name": "toy",
+            "molecule_types": [
+                {"name": "A", "interfaces": [
+                    {"name": "A1", "coord": {"x": 1.0, "y": 0.0, "z": 0.0}},
+                    {"name": "A2", "coord": {"x": 0.0, "y": 2.0, "z": 0.0}},
+                ]},
+                {"name": "B", "interfaces": [
+                    {"name": "B1", "coord": {"x": 0.0, "y": 0.0, "z": 1.5}},
+                ]},
+            ],
+        }
+        with open(self.json_path, "w") as f:
+            json.dump(model, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _read(self, name):
+        with open(self._path(name)) as f:
+            return f.read().splitlines()
+
+    def test_writes_all_formats(self):
+        outputs = {fmt: self._path(f"system.{fmt}") for fmt in ("xyz", "pdb", "lammps", "bonds")}
+        n_sites = assemble_system(self.json_path, {"A": 3, "B": 2}, 50.0, outputs, seed=1, batch_copies=2)
+        self.assertEqual(n_sites, 3 * 3 + 2 * 2)
+
+        xyz = self._read("system.xyz")
+        self.assertEqual(xyz[0], "13")
+        self.assertEqual([line.split()[0] for line in xyz[2:8]], ["A", "A1", "A2", "A", "A1", "A2"])
+        self.assertEqual(xyz[-2].split()[0], "B")
+
+        bonds = [tuple(map(int, line.split())) for line in self._read("system.bonds")]
+        self.assertEqual(bonds, [(0, 1), (0, 2), (3, 4), (3, 5), (6, 7), (6, 8), (9, 10), (11, 12)])
+
+        lammps = self._read("system.lammps")
+        self.assertIn("13 atoms", lammps)
+        self.assertIn("8 bonds", lammps)
+        self.assertIn("0.000 50.000 xlo xhi", lammps)
+        start = lammps.index("Atoms # molecular") + 2
+        # atom-ID molecule-ID type: one molecule per copy, COM = 1 and interfaces = 2
+        self.assertEqual([line.split()[:3] for line in lammps[start + 9:start + 13]],
+                         [["10", "4", "1"], ["11", "4", "2"], ["12", "5", "1"], ["13", "5", "2"]])
+        self.assertEqual(lammps[lammps.index("Bonds") + 9], "8 1 12 13")
+
+        pdb = self._read("system.pdb")
+        self.assertEqual(sum(line.startswith("ATOM") for line in pdb), 13)
+        self.assertEqual(pdb[3][12:26], "COM    A B   1")
+        self.assertEqual(pdb[3][72:78], "A-2  C")
+        self.assertEqual(pdb[13], "CONECT    1    2    3")
+
+    def test_failure_keeps_previous_outputs(self):
+        outputs = {fmt: self._path(f"system.{fmt}") for fmt in ("pdb", "bonds")}
+        assemble_system(self.json_path, {"A": 3}, 50.0, outputs, seed=1)
+        previous = {fmt: self._read(f"system.{fmt}") for fmt in outputs}
+        with mock.patch("convert.assemble.write_rows", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                assemble_system(self.json_path, {"A": 3, "B": 2}, 50.0, outputs, seed=1)
+        self.assertEqual({fmt: self._read(f"system.{fmt}") for fmt in outputs}, previous)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["model.json", "system.bonds", "system.pdb"])
+
+    def test_copies_keep_template_geometry(self):
+        outputs = {"xyz": self._path("system.xyz")}
+        assemble_system(self.json_path, 20, (30.0, 40.0, 50.0), outputs, seed=2)
+        coords = numpy.array([list(map(float, line.split()[1:])) for line in self._read("system.xyz")[2:]])
+
+        a = coords[:60].reshape(20, 3, 3)
+        numpy.testing.assert_allclose(numpy.linalg.norm(a[:, 1] - a[:, 0], axis=1), 1.0, atol=2e-3)
+        numpy.testing.assert_allclose(numpy.linalg.norm(a[:, 2] - a[:, 0], axis=1), 2.0, atol=2e-3)
+        self.assertTrue(((a[:, 0] >= 0) & (a[:, 0] < (30.0, 40.0, 50.0))).all())
+
+        # Same seed, same system
+        assemble_system(self.json_path, 20, (30.0, 40.0, 50.0), {"xyz": self._path("again.xyz")}, seed=2)
+        self.assertEqual(self._read("system.xyz"), self._read("again.xyz"))
+
+    def test_rotations_are_proper(self):
+        r = random_rotations(numpy.random.default_rng(0), 100)
+        identity = numpy.broadcast_to(numpy.eye(3), (100, 3, 3))
+        numpy.testing.assert_allclose(r @ r.transpose(0, 2, 1), identity, atol=1e-12)
+        numpy.testing.assert_allclose(numpy.linalg.det(r), 1.0)
+
+    def test_placement(self):
+        rng = numpy.random.default_rng(3)
+        points = place_random(rng, 2000, numpy.array([40.0, 40.0, 40.0]), min_distance=2.0)
+        self.assertEqual(len(points), 2000)
+        self.assertEqual(len(find_contacts_array(points, 2.0)[0]), 0)
+
+        lattice = place_lattice(rng, 100, numpy.array([10.0, 10.0, 20.0]))
+        self.assertEqual(len(numpy.unique(lattice, axis=0)), 100)
+        self.assertTrue(((lattice > 0) & (lattice < (10.0, 10.0, 20.0))).all())
+
+        with self.assertRaises(ValueError):
+            place_lattice(rng, 1000, numpy.array([10.0, 10.0, 10.0]), min_distance=2.0)
+        with self.assertRaises(ValueError):
+            place_random(rng, 100, numpy.array([5.0, 5.0, 5.0]), min_distance=2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
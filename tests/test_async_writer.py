@@ -0,0 +1,109 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from convert.async_writer import AsyncWriter
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.compression import open_file
+
+CIF_PATH = "tests/fixtures/5l93_coarse_grained.cif"
+
+
+class _GatedFile(io.StringIO):
+    """
+    Accepts a write only when the test releases the gate.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Semaphore(0)
+        self.writes = 0
+
+    def write(self, text):
+        self.gate.acquire()
+        self.writes += 1
+        return super().write(text)
+
+    def close(self):
+        self.text = self.getvalue()
+        super().close()
+
+
+class _FailingFile(io.StringIO):
+    def write(self, text):
+        raise OSError("disk full")
+
+
+class TestAsyncWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_converters_write_identical_output(self):
+        for converter, name in [(cif_to_pdb, "out.pdb"), (cif_to_lammps, "out.lmp.gz")]:
+            converter(CIF_PATH, self._path(f"direct_{name}"))
+            converter(CIF_PATH, self._path(f"async_{name}"), write_queue=2)
+            with open_file(self._path(f"direct_{name}")) as direct, open_file(self._path(f"async_{name}")) as pipelined:
+                self.assertEqual(direct.read(), pipelined.read())
+
+        with open_file(self._path("a.txt"), "w", write_queue=2) as f:
+            self.assertIsInstance(f, AsyncWriter)
+        with open_file(self._path("a.txt"), "w") as f:
+            self.assertNotIsInstance(f, AsyncWriter)
+        with self.assertRaises(ValueError):
+            open_file(self._path("a.txt"), "w", write_queue=0)
+
+    def test_back_pressure(self):
+        file = _GatedFile()
+        writer = AsyncWriter(file, queue_size=2, block_chars=10)
+        blocked = threading.Event()
+
+        def produce():
+            for n in range(6):
+                writer.write(f"block {n:3d}\n")  # 10 characters: one block per write
+            blocked.set()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        # One block is held by the writer thread and two are queued; the producer waits
+        self.assertFalse(blocked.wait(0.2))
+        self.assertEqual(writer.queue.qsize(), 2)
+        for _ in range(6):
+            file.gate.release()
+        producer.join()
+        writer.close()
+        self.assertEqual(file.writes, 6)
+        self.assertEqual(file.text, "".join(f"block {n:3d}\n" for n in range(6)))
+
+    def test_errors_are_raised(self):
+        writer = AsyncWriter(_FailingFile(), queue_size=1, block_chars=4)
+        with self.assertRaises(OSError):
+            for _ in range(100):
+                writer.write("text")
+        with self.assertRaises(OSError):
+            writer.close()
+
+    def test_exception_keeps_previous_output(self):
+        path = self._path("out.txt.gz")
+        with open_file(path, "w") as f:
+            f.write("GOOD\n")
+        with self.assertRaises(RuntimeError):
+            with open_file(path, "w", write_queue=4) as f:
+                f.write("PARTIAL\n")
+                raise RuntimeError
+        with open_file(path) as f:
+            self.assertEqual(f.read(), "GOOD\n")
+        self.assertEqual(os.listdir(self.tmp.name), ["out.txt.gz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
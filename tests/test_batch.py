@@ -0,0 +1,91 @@
+import unittest
+import os
+import json
+import shutil
+from convert.batch import find_inputs, format_summary, run_batch
+
+class TestBatchConversion(unittest.TestCase):
+
+    def setUp(self):
+        self.root = "tests/fixtures/batch_input"
+        self.output_dir = "tests/fixtures/batch_output"
+        for run in ("run1", "run2"):
+            os.makedirs(os.path.join(self.root, run), exist_ok=True)
+            shutil.copy("tests/fixtures/5l93_coarse_grained.cif", os.path.join(self.root, run, "structure.cif"))
+
+        with open(os.path.join(self.root, "run1", "model.json"), "w") as f:
+            json.dump({"molecule_types": [{"name": "A", "interfaces": [
+                {"name": "A1", "coord": {"x": 1.0, "y": 2.0, "z": 3.0}}]}]}, f)
+
+        # A malformed coordinate makes this file fail without stopping the batch
+        with open(os.path.join(self.root, "run2", "broken.cif"), "w") as f:
+            f.write("ATOM      1  COM  MOL A   abc  0.000  0.000  1.00  0.00  C\n")
+
+    def test_batch_conversion(self):
+        inputs = find_inputs([self.root])
+        self.assertEqual(len(inputs), 4)
+
+        messages = []
+        summary = run_batch(inputs, ["xyz", "pdb"], workers=2, report=messages.append)
+
+        self.assertEqual(summary.converted, 3)
+        self.assertEqual(summary.failed, 1)
+        self.assertEqual(summary.atoms, 108 + 108 + 2)
+        self.assertEqual(len(messages), 1)
+        self.assertIn("broken.cif", messages[0])
+        self.assertTrue(os.path.exists(os.path.join(self.root, "run1", "structure.pdb")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "run1", "model.xyz")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "run1", "model.pdb")))
+        self.assertIn("files/s", format_summary(summary))
+
+        # Up-to-date outputs are skipped; only the failed file is retried
+        summary = run_batch(inputs, ["xyz", "pdb"], workers=1, report=messages.append)
+        self.assertEqual((summary.converted, summary.skipped, summary.failed), (0, 3, 1))
+
+        summary = run_batch(inputs, ["xyz", "pdb"], workers=1, force=True, report=messages.append)
+        self.assertEqual(summary.converted, 3)
+
+    def test_output_dir_mirrors_inputs(self):
+        inputs = find_inputs([os.path.join(self.root, "*", "structure.cif")])
+        summary = run_batch(inputs, ["lammps"], workers=1, output_dir=self.output_dir)
+
+        self.assertEqual(summary.converted, 2)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "run1", "structure.lmp")))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "run2", "structure.lmp")))
+
+    def test_cache_reuses_identical_inputs(self):
+        inputs = find_inputs([os.path.join(self.root, "*", "structure.cif")])
+        cache_dir = os.path.join(self.output_dir, "cache")
+        summary = run_batch(inputs, ["xyz", "pdb"], workers=1, cache_dir=cache_dir)
+
+        # run1 and run2 hold the same structure, so the second conversion is a hit
+        self.assertEqual((summary.cache_hits, summary.cache_misses), (1, 1))
+        self.assertEqual(summary.atoms, 216)
+        self.assertIn("cache: 1 hits", format_summary(summary))
+
+    def test_skips_indexes_and_rejects_colliding_outputs(self):
+        run1 = os.path.join(self.root, "run1")
+        for name in ("structure.cif.chains.json", "live.watch.json"):
+            with open(os.path.join(run1, name), "w") as f:
+                json.dump({}, f)
+        self.assertEqual(len(find_inputs([self.root])), 4)
+        self.assertEqual(find_inputs([os.path.join(run1, "*.json")]), [os.path.join(run1, "model.json")])
+
+        shutil.copy("tests/fixtures/5l93_coarse_grained.cif", os.path.join(run1, "model.cif"))
+        with self.assertRaises(ValueError):
+            run_batch(find_inputs([self.root]), ["xyz"], workers=1)
+        self.assertFalse(os.path.exists(os.path.join(run1, "model.xyz")))
+        # Without an xyz output the JSON file has nothing to write
+        summary = run_batch(find_inputs([run1]), ["pdb"], workers=1)
+        self.assertEqual((summary.converted, summary.skipped), (2, 1))
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            run_batch([], ["gro"])
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
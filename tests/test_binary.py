@@ -0,0 +1,82 @@
+import filecmp
+import os
+import tempfile
+import unittest
+
+from convert.cif_reader import count_atom_sites, iter_atom_sites
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+
+try:
+    import numpy
+    from convert.binary import load_binary, write_binary
+    from convert.columnar import chain_bonds, preceding_resname_bonds, read_cif_columns, residue_chain_bonds
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestBinaryFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cif_path = "tests/fixtures/5l93_coarse_grained.cif"
+        self.npz_path = self._path("model.npz")
+        write_binary(self.cif_path, self.npz_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_round_trip(self):
+        parsed = read_cif_columns(self.cif_path)
+        for mmap in (True, False):
+            loaded = load_binary(self.npz_path, mmap=mmap)
+            self.assertEqual(isinstance(loaded.coords, numpy.memmap), mmap)
+            for name in ("serial", "coords", "occupancy", "bfactor", "label_codes", "chain_codes"):
+                numpy.testing.assert_array_equal(getattr(loaded, name), getattr(parsed, name))
+            self.assertEqual(loaded.chains, parsed.chains)
+            self.assertEqual(loaded.elements, parsed.elements)
+
+            # The stored bond index is what the bond functions return
+            for rule in (chain_bonds, residue_chain_bonds, preceding_resname_bonds):
+                for stored, computed in zip(rule(loaded), rule(parsed)):
+                    numpy.testing.assert_array_equal(stored, computed)
+
+    def test_streaming_reader_accepts_binary(self):
+        self.assertEqual(count_atom_sites(self.npz_path), 108)
+        self.assertEqual(list(iter_atom_sites(self.npz_path)), list(iter_atom_sites(self.cif_path)))
+
+    def test_converters_accept_binary(self):
+        for fn, ext in ((cif_to_pdb, "pdb"), (cif_to_lammps, "lmp"), (cif_to_xyz, "xyz")):
+            expected, actual = self._path(f"expected.{ext}"), self._path(f"actual.{ext}")
+            fn(self.cif_path, expected)
+            fn(self.npz_path, actual)
+            self.assertTrue(filecmp.cmp(expected, actual, shallow=False), fn.__name__)
+
+    def test_compressed_archive_is_read_without_mmap(self):
+        with numpy.load(self.npz_path) as archive:
+            arrays = dict(archive)
+        compressed = self._path("compressed.npz")
+        numpy.savez_compressed(compressed, **arrays)
+        loaded = load_binary(compressed)
+        self.assertNotIsInstance(loaded.coords, numpy.memmap)
+        self.assertEqual(len(loaded), 108)
+
+    def test_rejects_other_versions_and_suffixes(self):
+        with numpy.load(self.npz_path) as archive:
+            arrays = dict(archive)
+        arrays["format_version"] = numpy.array(0)
+        old = self._path("old.npz")
+        numpy.savez(old, **arrays)
+        with self.assertRaises(ValueError):
+            load_binary(old)
+        with self.assertRaises(ValueError):
+            write_binary(self.cif_path, self._path("model.bin"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import os
+import filecmp
+import shutil
+from convert.cache import ConversionCache
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+
+class TestConversionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = "tests/fixtures/cache_work"
+        self.cache_dir = "tests/fixtures/cache_store"
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        # Two files with identical content at different paths
+        self.cif_a = os.path.join(self.work_dir, "a.cif")
+        self.cif_b = os.path.join(self.work_dir, "b.cif")
+        shutil.copy("tests/fixtures/5l93_coarse_grained.cif", self.cif_a)
+        shutil.copy("tests/fixtures/5l93_coarse_grained.cif", self.cif_b)
+
+    def _path(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def test_hit_on_identical_content(self):
+        cache = ConversionCache(self.cache_dir)
+
+        result = cache.convert(cif_to_xyz, self.cif_a, self._path("a.xyz"), self._path("a.bonds"))
+        self.assertEqual(result, 108)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        result = cache.convert(cif_to_xyz, self.cif_b, self._path("b.xyz"), self._path("b.bonds"))
+        self.assertEqual(result, 108)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertTrue(filecmp.cmp(self._path("a.xyz"), self._path("b.xyz"), shallow=False))
+        self.assertTrue(filecmp.cmp(self._path("a.bonds"), self._path("b.bonds"), shallow=False))
+
+        # A different converter, option or set of outputs is a separate entry
+        cache.convert(cif_to_pdb, self.cif_b, self._path("b.pdb"))
+        cache.convert(cif_to_xyz, self.cif_b, self._path("c.xyz"), None)
+        self.assertEqual(cache.misses, 3)
+
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(stats["hit_rate"], 0.25)
+
+    def test_changed_content_misses(self):
+        cache = ConversionCache(self.cache_dir)
+        cache.convert(cif_to_pdb, self.cif_a, self._path("a.pdb"))
+
+        with open(self.cif_b, "a") as f:
+            f.write("ATOM    109  INT  MOL C-6   1.000  2.000  3.000  1.00  0.00  O\n")
+        cache.convert(cif_to_pdb, self.cif_b, self._path("b.pdb"))
+        self.assertEqual(cache.misses, 2)
+
+    def test_lru_eviction(self):
+        cache = ConversionCache(self.cache_dir)
+        cifs = []
+        for i in range(3):
+            path = self._path(f"lru{i}.cif")
+            shutil.copy(self.cif_a, path)
+            with open(path, "a") as f:
+                f.write(f"# variant {i}\n")  # changes the hash, not the output
+            cifs.append(path)
+
+        def entry(cif):
+            return os.path.join(self.cache_dir, cache.key(cif_to_pdb, cif, (self._path("out.pdb"),), {}))
+
+        cache.convert(cif_to_pdb, cifs[0], self._path("out.pdb"))
+        cache.convert(cif_to_pdb, cifs[1], self._path("out.pdb"))
+        entry_size = cache.stats()["size_bytes"] // 2
+        os.utime(entry(cifs[0]), (1, 1))
+        os.utime(entry(cifs[1]), (2, 2))
+
+        # Using entry 0 makes entry 1 the least recently used one
+        cache.convert(cif_to_pdb, cifs[0], self._path("out.pdb"))
+        cache.max_bytes = 2 * entry_size + entry_size // 2
+        cache.convert(cif_to_pdb, cifs[2], self._path("out.pdb"))
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertTrue(os.path.isdir(entry(cifs[0])))
+        self.assertFalse(os.path.isdir(entry(cifs[1])))
+        self.assertTrue(os.path.isdir(entry(cifs[2])))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_hardlinked_hits(self):
+        cache = ConversionCache(self.cache_dir, link=True)
+        cache.convert(cif_to_pdb, self.cif_a, self._path("a.pdb"))
+        cache.convert(cif_to_pdb, self.cif_b, self._path("b.pdb"))
+
+        self.assertEqual(cache.hits, 1)
+        self.assertTrue(filecmp.cmp(self._path("a.pdb"), self._path("b.pdb"), shallow=False))
+
+    def test_rewriting_linked_outputs(self):
+        other_cif = self._path("c.cif")
+        with open(self.cif_a, "r") as f:
+            lines = f.readlines()
+        with open(other_cif, "w") as f:
+            f.writelines(line for line in lines if not line.startswith("ATOM      1 "))
+        expected = self._path("expected.xyz")
+        cif_to_xyz(self.cif_a, expected)
+
+        cache = ConversionCache(self.cache_dir, link=True)
+        for _ in range(2):
+            # A miss, then a hit restored as a hardlink: later conversions to the
+            # same path must not change the cache entry
+            out = self._path("out.xyz")
+            cache.convert(cif_to_xyz, self.cif_a, out)
+            self.assertTrue(filecmp.cmp(expected, out, shallow=False))
+            cif_to_xyz(other_cif, out)
+            self.assertFalse(filecmp.cmp(expected, out, shallow=False))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.convert(cif_to_xyz, self.cif_b, out)
+        self.assertTrue(filecmp.cmp(expected, out, shallow=False))
+
+    def test_compression_level_in_key(self):
+        cache = ConversionCache(self.cache_dir)
+        out = self._path("a.pdb.gz")
+        cache.convert(cif_to_pdb, self.cif_a, out)
+        cache.convert(cif_to_pdb, self.cif_a, out, compress_level=1)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        # Only the level that reaches the output counts, and the write queue not at all
+        cache.convert(cif_to_pdb, self.cif_a, out, compress_level=6, write_queue=2)
+        cache.convert(cif_to_pdb, self.cif_a, self._path("a.pdb"), compress_level=1)
+        cache.convert(cif_to_pdb, self.cif_a, self._path("a.pdb"), compress_level=9)
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
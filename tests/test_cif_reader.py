@@ -0,0 +1,55 @@
+import unittest
+import os
+from convert.cif_reader import AtomSite, count_atom_sites, iter_atom_chunks, iter_atom_sites
+
+class TestCIFReader(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs("tests/fixtures", exist_ok=True)
+        self.cif_path = "tests/fixtures/test_cif_reader_input.cif"
+
+        with open(self.cif_path, "w") as f:
+            f.write("""\
+data_coarse_grained
+loop_
+_atom_site.group_PDB
+ATOM      1  COM  MOL A   0.000  0.000  0.000  1.00  0.00  C
+ATOM      2  INT  MOL A   1.000  0.000  0.000  1.00  0.00  O
+ATOM      3  INT  MOL A
+ATOM      4  COM  MOL A-2   5.000  5.000  5.000  1.00  0.00  C
+ATOM      5  INT  MOL A-2   6.000  5.000  5.000  1.00  0.00  O
+""")
+
+    def test_parses_records(self):
+        sites = list(iter_atom_sites(self.cif_path))
+
+        # The truncated record is skipped
+        self.assertEqual(len(sites), 4)
+        self.assertEqual(sites[0], AtomSite(1, "COM", "MOL", "A", 0.0, 0.0, 0.0, 1.0, 0.0, "C"))
+        self.assertEqual(sites[3].chain, "A-2")
+        self.assertEqual(sites[3].x, 6.0)
+        self.assertEqual(count_atom_sites(self.cif_path), 4)
+
+    def test_chunks_are_bounded(self):
+        chunks = list(iter_atom_chunks(self.cif_path, chunk_size=3))
+
+        self.assertEqual([len(c) for c in chunks], [3, 1])
+        self.assertEqual([s.serial for c in chunks for s in c], [1, 2, 4, 5])
+
+    def test_rejects_empty_chunks(self):
+        with self.assertRaises(ValueError):
+            list(iter_atom_chunks(self.cif_path, chunk_size=0))
+
+    def test_real_coarse_grained_file(self):
+        sites = list(iter_atom_sites("tests/fixtures/5l93_coarse_grained.cif", chunk_size=10))
+
+        self.assertEqual(len(sites), 108)
+        self.assertEqual(sum(1 for s in sites if s.label == "COM"), 18)
+        self.assertEqual(sites[-1].chain, "C-6")
+
+    def tearDown(self):
+        if os.path.exists(self.cif_path):
+            os.remove(self.cif_path)
+
+if __name__ == "__main__":
+    unittest.main()
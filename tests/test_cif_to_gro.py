@@ -0,0 +1,48 @@
+# tests/test_cif_to_gro.py
+
+import unittest
+import os
+import filecmp
+from convert.cif_to_gro import cif_to_gro
+from convert.columnar import np
+
+class TestCIFtoGRO(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs("tests/fixtures", exist_ok=True)
+
+        self.test_cif = "tests/fixtures/test_gro_input.cif"
+        self.outputs = ["tests/fixtures/test_output.gro", "tests/fixtures/test_output_columnar.gro"]
+        with open(self.test_cif, "w") as f:
+            f.write("""\
+ATOM      1  COM  MOL A   103.679  128.270  141.416  1.00  0.00  C
+ATOM      2  INT  MOL A   113.590  120.603  125.681  1.00  0.00  O
+ATOM      3  COM  LONGNAME A-2   10.000  20.000  30.000  1.00  0.00  C
+""")
+
+    def test_conversion(self):
+        self.assertEqual(cif_to_gro(self.test_cif, self.outputs[0]), 3)
+        with open(self.outputs[0], "r") as f:
+            lines = f.read().splitlines()
+
+        self.assertEqual(lines[1], "3")
+        # One residue per chain, names cut to five columns, coordinates in nm
+        self.assertEqual(lines[2], "    1MOL    COM    1  10.368  12.827  14.142")
+        self.assertEqual(lines[4], "    2LONGN  COM    3   1.000   2.000   3.000")
+        # Bounding box plus 10 Å padding on every side
+        self.assertEqual(lines[5], "  12.35900  12.82700  13.14160")
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_columnar_matches_streaming(self):
+        source = "tests/fixtures/5l93_coarse_grained.cif"
+        cif_to_gro(source, self.outputs[0])
+        cif_to_gro(source, self.outputs[1], columnar=True)
+        self.assertTrue(filecmp.cmp(self.outputs[0], self.outputs[1], shallow=False))
+
+    def tearDown(self):
+        for path in [self.test_cif] + self.outputs:
+            if os.path.exists(path):
+                os.remove(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 import os
 from convert.cif_to_lammps import cif_to_lammps  # updated function name
+from convert.columnar import np
 
 class TestCIFToLAMMPS(unittest.TestCase):
     def setUp(self):
@@ -53,6 +54,61 @@ ATOM      6  INT  MOL B   5.000  6.000  5.000  1.00  0.00  O
         parsed_pairs = set(tuple(map(int, line.split()[2:4])) for line in bond_lines)
         self.assertEqual(expected_pairs, parsed_pairs)
 
+    def test_molecular_style_with_label_types(self):
+        cif_to_lammps(self.cif_path, self.lmp_path, atom_style="full", label_types=True)
+
+        with open(self.lmp_path, "r") as f:
+            lines = f.read().splitlines()
+
+        self.assertIn("2 atom types", lines)
+        start = lines.index("Atoms # full") + 2
+        # atom-ID molecule-ID type q x y z: one molecule per chain, COM = 1 and INT = 2
+        self.assertEqual(lines[start], "1 1 1 0.0 0.0000 0.0000 0.0000")
+        self.assertEqual(lines[start + 1], "2 1 2 0.0 1.0000 0.0000 0.0000")
+        self.assertEqual(lines[start + 5], "6 2 2 0.0 5.0000 6.0000 5.0000")
+
+    def test_molecule_templates(self):
+        with open(self.cif_path, "a") as f:
+            # A third molecule without its second INT: a second template
+            f.write("ATOM      7  COM  MOL C   9.000  9.000  9.000  1.00  0.00  C\n")
+            f.write("ATOM      8  INT  MOL C  10.000  9.000  9.000  1.00  0.00  O\n")
+        cif_to_lammps(self.cif_path, self.lmp_path, templates=True)
+        mol_paths = ["tests/fixtures/test_cif_to_lammps_output.MOL.mol",
+                     "tests/fixtures/test_cif_to_lammps_output.MOL-2.mol"]
+        for path in mol_paths:
+            self.addCleanup(os.remove, path)
+
+        with open(self.lmp_path, "r") as f:
+            lines = f.read().splitlines()
+        self.assertIn("2 atom types", lines)
+        self.assertIn("3 bond types", lines)
+        start = lines.index("Atoms # molecular") + 2
+        self.assertEqual(lines[start + 7], "8 3 2 10.0000 9.0000 9.0000")
+        start = lines.index("Bonds") + 2
+        # One bond type per interface of each template
+        self.assertEqual(lines[start:], ["1 1 1 2", "2 2 1 3", "3 1 4 5", "4 2 4 6", "5 3 7 8"])
+
+        with open(mol_paths[0], "r") as f:
+            content = f.read()
+        self.assertIn("2 molecules", content.splitlines()[0])
+        self.assertIn("3 atoms\n2 bonds\n", content)
+        self.assertIn("Coords\n\n1 0.0000 0.0000 0.0000\n2 1.0000 0.0000 0.0000\n3 0.0000 1.0000 0.0000\n", content)
+        self.assertIn("Types\n\n1 1\n2 2\n3 2\n", content)
+        self.assertIn("Bonds\n\n1 1 1 2\n2 2 1 3\n", content)
+        with open(mol_paths[1], "r") as f:
+            self.assertIn("Bonds\n\n1 3 1 2\n", f.read())
+
+        if np is not None:
+            with open(self.lmp_path, "r") as f:
+                expected = f.read()
+            cif_to_lammps(self.cif_path, self.lmp_path, columnar=True, templates=True)
+            with open(self.lmp_path, "r") as f:
+                self.assertEqual(f.read(), expected)
+
+    def test_unknown_atom_style(self):
+        with self.assertRaises(ValueError):
+            cif_to_lammps(self.cif_path, self.lmp_path, atom_style="charge")
+
     def tearDown(self):
         if os.path.exists(self.cif_path):
             os.remove(self.cif_path)
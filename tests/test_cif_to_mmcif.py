@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from convert.cif_to_mmcif import cif_to_mmcif
+
+
+class TestCIFtoMMCIF(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_cif = os.path.join(self.tmp.name, "model.cif")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_loops(self):
+        loops, current = {}, None
+        with open(self.output_cif) as f:
+            for line in f:
+                if line.startswith("_"):
+                    category = line[1:].split(".")[0]
+                    current = loops.setdefault(category, [])
+                elif line.startswith("#") or line.startswith("loop_") or line.startswith("data_"):
+                    continue
+                else:
+                    current.append(line.split())
+        return loops
+
+    def test_real_cif_to_mmcif(self):
+        n_atoms = cif_to_mmcif("tests/fixtures/5l93_coarse_grained.cif", self.output_cif)
+        self.assertEqual(n_atoms, 108)
+
+        with open(self.output_cif) as f:
+            self.assertEqual(f.readline(), "data_model\n")
+        loops = self.read_loops()
+        atoms, bonds = loops["atom_site"], loops["struct_conn"]
+        self.assertEqual(len(atoms), 108)
+        self.assertEqual(len(bonds), 90)
+
+        # Full chain IDs are kept and sites are numbered within their chain
+        self.assertEqual(atoms[6][:9], ["ATOM", "7", "C", "COM", ".", "MOL", "A-2", "1", "1"])
+        self.assertEqual(atoms[7][6], "A-2")
+        self.assertEqual(atoms[7][8], "2")
+        self.assertEqual(bonds[5], ["covale6", "covale", "A-2", "MOL", "1", "COM", "A-2", "MOL", "2", "INT"])
+
+    def test_large_serials_unchanged(self):
+        input_cif = os.path.join(self.tmp.name, "input.cif")
+        with open(input_cif, "w") as f:
+            f.write("ATOM 123456 COM MOL A-10 1.0 2.0 3.0 1.00 0.00 C\n")
+        cif_to_mmcif(input_cif, self.output_cif)
+        self.assertEqual(self.read_loops()["atom_site"][0][1], "123456")
+        self.assertNotIn("struct_conn", self.read_loops())
+
+
+if __name__ == "__main__":
+    unittest.main()
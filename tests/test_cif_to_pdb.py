@@ -1,6 +1,6 @@
 import unittest
 import os
-from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_pdb import ChainIdMap, cif_to_pdb, iter_conect_records
 
 class TestCIFtoPDB(unittest.TestCase):
 
@@ -42,23 +42,80 @@ ATOM      2  INT  MOL A   113.590  120.603  125.681  1.00  0.00  O
         with open(output_pdb, "r") as f:
             lines = f.readlines()
 
-        # Expect 108 atoms and 90 INT atoms → 108 ATOM + 90 CONECT lines
+        # Expect 108 atoms and 90 INT atoms → 108 ATOM lines and 90 COM-INT bonds,
+        # packed up to 4 partners per CONECT line (18 COMs × 2 lines)
         atom_lines = [line for line in lines if line.startswith("ATOM")]
         conect_lines = [line for line in lines if line.startswith("CONECT")]
 
         self.assertEqual(len(atom_lines), 108)
-        self.assertEqual(len(conect_lines), 90)
+        self.assertEqual(len(conect_lines), 36)
+        self.assertEqual(sum((len(line.rstrip("\n")) - 11) // 5 for line in conect_lines), 90)
 
         # Spot check
         self.assertTrue(atom_lines[0].startswith("ATOM  "))
         self.assertTrue("COM" in atom_lines[0])
         self.assertTrue("INT" in atom_lines[-1])
         self.assertTrue("O" in atom_lines[-1])
-        self.assertTrue(conect_lines[0].startswith("CONECT"))
+        self.assertEqual(conect_lines[0], "CONECT    1    2    3    4    5\n")
+
+        # Multi-character chains are remapped to single characters in column 22
+        self.assertEqual(atom_lines[6][21], "B")
+        self.assertEqual(atom_lines[6][72:76], "A-2 ")
 
         # Cleanup
         os.remove(output_pdb)
 
+    def test_hybrid36_serials_and_chain_map(self):
+        with open(self.input_cif, "w") as f:
+            f.write("""\
+ATOM  99999  COM  MOL A-2   1.000  2.000  3.000  1.00  0.00  C
+ATOM 100000  INT  MOL A-2   2.000  2.000  3.000  1.00  0.00  O
+ATOM 100001  INT  MOL A   3.000  2.000  3.000  1.00  0.00  O
+""")
+        chain_map = "tests/fixtures/test_chain_map.tsv"
+        cif_to_pdb(self.input_cif, self.output_pdb, chain_map_path=chain_map)
+
+        with open(self.output_pdb) as f:
+            lines = f.readlines()
+        with open(chain_map) as f:
+            table = f.read()
+        os.remove(chain_map)
+
+        # Every record keeps the fixed columns
+        self.assertEqual(lines[0][6:11], "99999")
+        self.assertEqual(lines[1][6:11], "A0000")
+        self.assertEqual(lines[2][6:11], "A0001")
+        self.assertEqual({len(line) for line in lines[:3]}, {79})
+        self.assertEqual([line[21] for line in lines[:3]], ["A", "A", "B"])
+        self.assertEqual(lines[3], "CONECT99999A0000\n")
+        self.assertEqual(table, "pdb_chain\toriginal_chain\nA\tA-2\nB\tA\n")
+
+    def test_chain_id_map(self):
+        chain_ids = ChainIdMap()
+        self.assertEqual([chain_ids[c] for c in ("B", "A-2", "A", "B", "A-3")], ["B", "A", "C", "B", "D"])
+        # Once all 62 IDs are taken they are reused
+        for n in range(100):
+            chain_ids[f"X-{n}"]
+        self.assertEqual(len(set(chain_ids.mapping.values())), 62)
+
+    def test_segments_are_unique(self):
+        chain_ids = ChainIdMap()
+        chains = ["B", "A-2", "A", "A-100", "A000", "A-101", "A-100"]
+        self.assertEqual([chain_ids.segment(c) for c in chains], ["", "A-2", "A", "A000", "A001", "A002", "A000"])
+        for n in range(200):
+            chain_ids.segment(f"X-{n:03d}")
+        # Remapped chains stay distinct after the 62 PDB chain IDs are reused
+        self.assertEqual(len({chain_ids.segment(c) for c in chain_ids.mapping if chain_ids[c] != c}),
+                         len(chain_ids.mapping) - 1)
+
+    def test_conect_packing(self):
+        pairs = [(1, 2), (1, 3), (1, 4), (1, 5), (1, 6), (7, 8)]
+        self.assertEqual(list(iter_conect_records(pairs)), [
+            "CONECT    1    2    3    4    5\n",
+            "CONECT    1    6\n",
+            "CONECT    7    8\n",
+        ])
+
     def tearDown(self):
         if os.path.exists(self.input_cif):
             os.remove(self.input_cif)
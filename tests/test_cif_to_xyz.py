@@ -27,6 +27,28 @@ ATOM      2  INT  MOL A   113.590  120.603  125.681  1.00  0.00  O
         self.assertIn("C 103.679 128.270 141.416", lines[2])
         self.assertIn("O 113.590 120.603 125.681", lines[3])
         
+    def test_precision_and_short_records(self):
+        # Extra decimals are kept; the short record is skipped and the bond
+        # indices count the written atoms
+        with open(self.test_cif, "w") as f:
+            f.write("""\
+ATOM      1  COM  MOL A   103.67925  128.270  -0.5  1.00  0.00  C
+ATOM      2  INT  MOL
+ATOM      3  INT  MOL A   113.590  120.6031  125.681  1.00  0.00  O
+""")
+        bonds_path = "tests/fixtures/test_output.bonds"
+        self.assertEqual(cif_to_xyz(self.test_cif, self.test_xyz, bonds_path), 2)
+        with open(self.test_xyz, "r") as f:
+            lines = f.readlines()
+        with open(bonds_path, "r") as f:
+            bonds = f.read()
+        os.remove(bonds_path)
+
+        self.assertEqual(lines[0].strip(), "2")
+        self.assertEqual(lines[2], "C 103.67925 128.270 -0.500\n")
+        self.assertEqual(lines[3], "O 113.590 120.6031 125.681\n")
+        self.assertEqual(bonds, "0 1\n")
+
     def test_real_coarse_grained_file(self):
         input_cif = "tests/fixtures/5l93_coarse_grained.cif"
         output_xyz = "tests/output_5l93_model.xyz"
@@ -0,0 +1,114 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+from convert.cli import (
+    add_io_arguments, detect_format, io_options_from_args, main, plan_conversions, read_manifest, SOURCE_FORMATS,
+    TARGET_FORMATS,
+)
+from convert.compression import open_file
+
+CIF_PATH = "tests/fixtures/5l93_coarse_grained.cif"
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _main(self, argv, stdin=""):
+        out = io.StringIO()
+        old_stdin, sys.stdin = sys.stdin, io.StringIO(stdin)
+        try:
+            with contextlib.redirect_stdout(out):
+                code = main(argv)
+        finally:
+            sys.stdin = old_stdin
+        return code, out.getvalue()
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("a/b.CIF", SOURCE_FORMATS), "cif")
+        self.assertEqual(detect_format("b.json.gz", SOURCE_FORMATS), "json")
+        self.assertEqual(detect_format("b.lmp.xz", TARGET_FORMATS), "lammps")
+        self.assertIsNone(detect_format("b.txt", TARGET_FORMATS))
+
+    def test_plan_conversions(self):
+        (conversion,) = plan_conversions([["in.cif.gz"]], to="pdb", output_dir="out", compress="gz")
+        self.assertEqual(conversion[:2], ("in.cif.gz", os.path.join("out", "in.pdb.gz")))
+        self.assertEqual(conversion[2][1], "cif_to_pdb")
+        self.assertEqual(plan_conversions([["m.json", "m.xyz"]])[0][2][1], "ionerdss_json_to_xyz")
+
+        with self.assertRaises(ValueError):
+            plan_conversions([["m.json", "m.pdb"]])  # no JSON -> PDB converter
+        with self.assertRaises(ValueError):
+            plan_conversions([["in.cif"]])  # no output and no --to
+        with self.assertRaises(ValueError):
+            plan_conversions([["in.cif", "in.cif"]])  # would overwrite the input
+
+    def test_read_manifest(self):
+        manifest = io.StringIO("# comment\n\na.cif a.pdb\nwith space.cif\twith space.xyz\nb.cif\n")
+        self.assertEqual(read_manifest(manifest),
+                         [["a.cif", "a.pdb"], ["with space.cif", "with space.xyz"], ["b.cif"]])
+        with self.assertRaises(ValueError):
+            read_manifest(io.StringIO("a b c\n"))
+
+    def test_convert_pairs(self):
+        xyz, lmp = self._path("out.xyz"), self._path("out.lmp.gz")
+        code, out = self._main([CIF_PATH, xyz, CIF_PATH, lmp])
+        self.assertEqual(code, 0)
+        self.assertIn("Converted 2 files (0 failed, 216 atoms)", out)
+        self.assertTrue(os.path.exists(xyz) and os.path.exists(lmp))
+
+    def test_convert_manifest_from_stdin(self):
+        code, _ = self._main(["convert", "--to", "mmcif", "--manifest", "-", "-o", self._path("out")],
+                             stdin=f"{CIF_PATH}\n")
+        self.assertEqual(code, 0)
+        self.assertTrue(os.path.exists(self._path(os.path.join("out", "5l93_coarse_grained.mmcif"))))
+
+    def test_keep_going(self):
+        missing = self._path("missing.cif")
+        code, out = self._main(["convert", "-k", missing, self._path("a.xyz"), CIF_PATH, self._path("b.xyz")])
+        self.assertEqual(code, 1)
+        self.assertIn(f"FAILED {missing}", out)
+        self.assertIn("Converted 1 files (1 failed", out)
+
+    def test_io_options(self):
+        parser = argparse.ArgumentParser()
+        add_io_arguments(parser)
+        self.assertEqual(io_options_from_args(parser.parse_args(["--compress-level", "1", "--async-write"])),
+                         {"compress_level": 1, "write_queue": 8, "parse_workers": None})
+        parser = argparse.ArgumentParser()
+        add_io_arguments(parser, parse_workers=False)
+        self.assertEqual(io_options_from_args(parser.parse_args([])), {"compress_level": None, "write_queue": None})
+
+        # Passed through to the converters
+        pdb, xyz = self._path("out.pdb.gz"), self._path("out.xyz")
+        code, _ = self._main([CIF_PATH, pdb, CIF_PATH, xyz, "--compress-level", "1", "--async-write", "2",
+                              "--parse-workers", "2"])
+        self.assertEqual(code, 0)
+        code, _ = self._main([CIF_PATH, self._path("ref.pdb")])
+        with open_file(pdb) as f, open_file(self._path("ref.pdb")) as ref:
+            self.assertEqual(f.read(), ref.read())
+
+    def test_subcommand_dispatch(self):
+        code, out = self._main(["cache", "stats", self._path("cache")])
+        self.assertEqual(code, 0)
+        self.assertIn("0 entries", out)
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(self._main(["frobnicate"])[0], 2)
+            with self.assertRaises(SystemExit):
+                self._main([CIF_PATH, self._path("out.lmp"), "--atom-style", "charge"])
+
+
+if __name__ == "__main__":
+    unittest.main()
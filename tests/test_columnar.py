@@ -0,0 +1,144 @@
+import unittest
+import io
+import os
+import filecmp
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb, iter_conect_records
+from convert.cif_to_xyz import cif_to_xyz
+from convert.hybrid36 import hy36encode
+
+try:
+    import numpy
+    from convert.columnar import (
+        chain_bonds, hy36encode_column, preceding_resname_bonds, read_cif_columns, residue_chain_bonds,
+        write_conect_columns,
+    )
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestColumnarBackend(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs("tests/fixtures", exist_ok=True)
+        self.cif_path = "tests/fixtures/test_columnar_input.cif"
+        self.outputs = []
+
+        # INT before its COM, a second residue name sharing chain B, and a short record
+        with open(self.cif_path, "w") as f:
+            f.write("""\
+loop_
+_atom_site.group_PDB
+ATOM      1  INT  MOL B   1.000  0.000  0.000  1.00  0.00  O
+ATOM      2  COM  MOL A   0.000  0.000  0.000  1.00  0.00  C
+ATOM      3  INT  MOL A   0.000  1.000  0.000  1.00  0.00  O
+ATOM      4  COM  MOL B   5.000  5.000  5.000  1.00  0.00  C
+ATOM      5  INT  MOL
+ATOM      6  COM  LIG B   6.500  5.250  5.125  0.50  9.99  C
+ATOM      7  INT  LIG B   6.000  5.000  5.000  1.00  0.00  O
+ATOM      8  INT  MOL B   5.000  6.000  5.000  1.00  0.00  O
+""")
+
+    def _output(self, name):
+        path = os.path.join("tests/fixtures", name)
+        self.outputs.append(path)
+        return path
+
+    def test_read_columns(self):
+        cols = read_cif_columns(self.cif_path, chunk_size=3)
+
+        self.assertEqual(len(cols), 7)
+        self.assertEqual(cols.serial.tolist(), [1, 2, 3, 4, 6, 7, 8])
+        self.assertEqual(cols.chains, ["B", "A"])
+        self.assertEqual(cols.resnames, ["MOL", "LIG"])
+        self.assertEqual(cols.coords[4].tolist(), [6.5, 5.25, 5.125])
+        self.assertEqual(cols.occupancy[4], 0.5)
+        self.assertEqual(cols.label_mask("COM").sum(), 3)
+        self.assertEqual(cols.label_mask("XYZ").sum(), 0)
+
+    def test_short_and_long_records_in_one_chunk(self):
+        # 10 + 12 fields add up to two full records: every line must still be checked
+        with open(self.cif_path, "w") as f:
+            f.write("""\
+ATOM      1  COM  MOL A   0.000  0.000  0.000  1.00  0.00  C
+ATOM      2  INT  MOL A   1.000  0.000  0.000  1.00  0.00
+ATOM      3  INT  MOL A   2.000  0.000  0.000  1.00  0.00  O  extra
+ATOM      4  INT  MOL A   3.000  0.000  0.000  1.00  0.00  O
+""")
+        cols = read_cif_columns(self.cif_path)
+        self.assertEqual(cols.serial.tolist(), [1, 3, 4])
+        self.assertEqual(cols.coords[:, 0].tolist(), [0.0, 2.0, 3.0])
+        self.assertEqual(cols.elements, ["C", "O"])
+
+    def test_bond_rules(self):
+        cols = read_cif_columns(self.cif_path)
+
+        # Indices are 0-based positions among the parsed records
+        self.assertEqual([c.tolist() for c in chain_bonds(cols)], [[4, 4, 4, 1], [0, 5, 6, 2]])
+        self.assertEqual([c.tolist() for c in residue_chain_bonds(cols)], [[3, 3, 1, 4], [0, 6, 2, 5]])
+        self.assertEqual([c.tolist() for c in preceding_resname_bonds(cols)], [[1, 4, 3], [2, 5, 6]])
+
+    def test_matches_per_line_path(self):
+        for source in (self.cif_path, "tests/fixtures/5l93_coarse_grained.cif"):
+            for fn, ext in ((cif_to_pdb, "pdb"), (cif_to_lammps, "lmp")):
+                expected, actual = self._output(f"expected.{ext}"), self._output(f"actual.{ext}")
+                fn(source, expected)
+                fn(source, actual, columnar=True)
+                self.assertTrue(filecmp.cmp(expected, actual, shallow=False), f"{fn.__name__} on {source}")
+
+            expected, actual = self._output("expected.lmp"), self._output("actual.lmp")
+            cif_to_lammps(source, expected, atom_style="molecular", label_types=True)
+            cif_to_lammps(source, actual, columnar=True, atom_style="molecular", label_types=True)
+            self.assertTrue(filecmp.cmp(expected, actual, shallow=False))
+
+            expected, actual = self._output("expected.xyz"), self._output("actual.xyz")
+            expected_bonds, actual_bonds = self._output("expected.bonds"), self._output("actual.bonds")
+            cif_to_xyz(source, expected, expected_bonds)
+            cif_to_xyz(source, actual, actual_bonds, columnar=True)
+            self.assertTrue(filecmp.cmp(expected, actual, shallow=False))
+            self.assertTrue(filecmp.cmp(expected_bonds, actual_bonds, shallow=False))
+
+    def test_matches_per_line_path_extra_decimals(self):
+        # Coordinates with more than 3 decimals are written in full by both backends
+        with open(self.cif_path, "a") as f:
+            f.write("ATOM      9  INT  MOL B   5.12345  6.0  -0.1000001  1.00  0.00  O\n")
+
+        expected, actual = self._output("expected.xyz"), self._output("actual.xyz")
+        cif_to_xyz(self.cif_path, expected)
+        cif_to_xyz(self.cif_path, actual, columnar=True)
+        self.assertTrue(filecmp.cmp(expected, actual, shallow=False))
+        with open(actual, "r") as f:
+            self.assertEqual(f.readlines()[-1], "O 5.12345 6.000 -0.1000001\n")
+
+    def test_matches_per_line_path_large_serials(self):
+        # Serials past 99,999 are hybrid-36 encoded by both backends
+        with open(self.cif_path, "w") as f:
+            for serial in range(99990, 100020):
+                label, element = ("COM", "C") if serial % 5 == 0 else ("INT", "O")
+                f.write(f"ATOM {serial} {label} MOL A-{serial // 5} {serial % 7}.0 1.0 2.0 1.00 0.00 {element}\n")
+
+        expected, actual = self._output("expected.pdb"), self._output("actual.pdb")
+        cif_to_pdb(self.cif_path, expected)
+        cif_to_pdb(self.cif_path, actual, columnar=True)
+        self.assertTrue(filecmp.cmp(expected, actual, shallow=False))
+
+    def test_vectorized_hybrid36_and_conect(self):
+        values = [-9999, 0, 99999, 100000, 43770015, 43770016, 87440031]
+        self.assertEqual(hy36encode_column(5, values).tolist(), [hy36encode(5, v) for v in values])
+        with self.assertRaises(ValueError):
+            hy36encode_column(5, [87440032])
+
+        atoms = [1, 1, 1, 1, 1, 1, 7, 99999, 1]
+        partners = [2, 3, 4, 5, 6, 100000, 8, 100001, 9]
+        out = io.StringIO()
+        write_conect_columns(out, numpy.array(atoms), numpy.array(partners))
+        self.assertEqual(out.getvalue(), "".join(iter_conect_records(zip(atoms, partners))))
+
+    def tearDown(self):
+        for path in [self.cif_path] + self.outputs:
+            if os.path.exists(path):
+                os.remove(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+
+from convert.batch import find_inputs, run_batch
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_mmcif import cif_to_mmcif
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+from convert.compression import compression_level, open_file, strip_compression
+from convert.ionerdss_json_to_xyz import ionerdss_json_to_xyz
+from convert.trajectory import convert_trajectory
+
+CIF_PATH = "tests/fixtures/5l93_coarse_grained.cif"
+MODULES = {".gz": gzip, ".bz2": bz2, ".xz": lzma}
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _compress(self, path, suffix):
+        compressed = self._path(os.path.basename(path) + suffix)
+        with open(path, "rb") as src, MODULES[suffix].open(compressed, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        return compressed
+
+    def _read(self, path):
+        with open_file(path) as f:
+            return f.read()
+
+    def test_open_file_round_trip(self):
+        for suffix, module in MODULES.items():
+            path = self._path("data.txt" + suffix)
+            with open_file(path, "w") as f:
+                f.write("line 1\n")
+            with open_file(path, "a") as f:
+                f.write("line 2\n")
+            with module.open(path, "rt") as f:
+                self.assertEqual(f.read(), "line 1\nline 2\n")
+            self.assertEqual(self._read(path), "line 1\nline 2\n")
+
+    def test_outputs_are_replaced(self):
+        for suffix in ("", ".gz"):
+            path = self._path("out.txt" + suffix)
+            with open_file(path, "w") as f:
+                f.write("old\n")
+            os.link(path, self._path("link" + suffix))
+
+            with self.assertRaises(RuntimeError):
+                with open_file(path, "w") as f:
+                    f.write("partial\n")
+                    raise RuntimeError
+            self.assertEqual(self._read(path), "old\n")
+
+            with open_file(path, "w") as f:
+                f.write("new\n")
+            self.assertEqual(self._read(path), "new\n")
+            self.assertEqual(self._read(self._path("link" + suffix)), "old\n")
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["link", "link.gz", "out.txt", "out.txt.gz"])
+        # The gzip header names the output, not the temporary file
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(18)[10:], b"out.txt\x00")
+
+    def test_strip_compression(self):
+        self.assertEqual(strip_compression("a/b.cif.gz"), "a/b.cif")
+        self.assertEqual(strip_compression("b.json.xz"), "b.json")
+        self.assertEqual(strip_compression("b.pdb"), "b.pdb")
+
+    def test_compression_level(self):
+        text = "".join(f"{i} {i * i}\n" for i in range(20000))
+        sizes = []
+        for level in (1, 9):
+            path = self._path(f"level{level}.txt.gz")
+            with open_file(path, "w", level) as f:
+                f.write(text)
+            sizes.append(os.path.getsize(path))
+            self.assertEqual(self._read(path), text)
+        self.assertGreater(sizes[0], sizes[1])
+        self.assertEqual(compression_level(".bz2", 0), 1)
+        self.assertEqual(compression_level(".xz"), 6)
+        self.assertIsNone(compression_level(None, 9))
+        with self.assertRaises(ValueError):
+            open_file(self._path("level10.txt.gz"), "w", 10)
+
+    def test_converters_match_uncompressed(self):
+        converters = {
+            ".xyz": cif_to_xyz,
+            ".pdb": cif_to_pdb,
+            ".lmp": cif_to_lammps,
+            ".cif": cif_to_mmcif,
+        }
+        os.mkdir(self._path("compressed"))
+        for ext, converter in converters.items():
+            # Same basename, since the mmCIF data block is named after the output
+            reference = self._path("out" + ext)
+            converter(CIF_PATH, reference)
+            for suffix in MODULES:
+                output = self._path(os.path.join("compressed", "out" + ext + suffix))
+                converter(self._compress(CIF_PATH, suffix), output)
+                self.assertEqual(self._read(output), self._read(reference))
+
+    def test_json_and_trajectory_inputs(self):
+        json_path = self._path("model.json")
+        with open(json_path, "w") as f:
+            json.dump({"molecule_types": [{"name": "A", "interfaces": [
+                {"name": "A1", "coord": {"x": 1.0, "y": 2.0, "z": 3.0}},
+            ]}]}, f)
+        reference = self._path("reference.xyz")
+        ionerdss_json_to_xyz(json_path, reference)
+        output = self._path("model.xyz.bz2")
+        ionerdss_json_to_xyz(self._compress(json_path, ".gz"), output)
+        self.assertEqual(self._read(output), self._read(reference))
+
+        frames = convert_trajectory([self._compress(CIF_PATH, ".xz")] * 2, xyz_path=self._path("traj.xyz.gz"))
+        self.assertEqual(frames, 2)
+        self.assertEqual(self._read(self._path("traj.xyz.gz")).count("Frame"), 2)
+
+    def test_batch_compressed_inputs_and_outputs(self):
+        self._compress(CIF_PATH, ".gz")
+        inputs = find_inputs([self.tmp.name])
+        self.assertEqual(inputs, [self._path("5l93_coarse_grained.cif.gz")])
+
+        summary = run_batch(inputs, ["xyz"], workers=1, compress="xz", compress_level=1)
+        self.assertEqual(summary.converted, 1)
+        reference = self._path("reference.xyz")
+        cif_to_xyz(CIF_PATH, reference)
+        self.assertEqual(self._read(self._path("5l93_coarse_grained.xyz.xz")), self._read(reference))
+        with self.assertRaises(ValueError):
+            run_batch(inputs, ["xyz"], compress="zip")
+
+
+if __name__ == "__main__":
+    unittest.main()
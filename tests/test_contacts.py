@@ -0,0 +1,117 @@
+import unittest
+import os
+import random
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+from convert.contacts import find_contacts, find_contacts_array
+from convert.fanout import convert_many
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def brute_force(points, cutoff, molecule_ids):
+    return [
+        (i, j)
+        for i in range(len(points)) for j in range(i + 1, len(points))
+        if sum((a - b) ** 2 for a, b in zip(points[i], points[j])) <= cutoff ** 2
+        and molecule_ids[i] != molecule_ids[j]
+    ]
+
+class TestContacts(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.points = [(rng.uniform(0, 25), rng.uniform(-12, 12), rng.uniform(0, 25)) for _ in range(500)]
+        self.molecules = [i // 5 for i in range(500)]
+        self.outputs = []
+
+    def test_matches_brute_force(self):
+        expected = brute_force(self.points, 2.5, self.molecules)
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(find_contacts(self.points, 2.5, self.molecules), expected)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_array_version_matches_brute_force(self):
+        expected = brute_force(self.points, 2.5, self.molecules)
+        i, j = find_contacts_array(numpy.array(self.points), 2.5, numpy.array(self.molecules), block_size=64)
+        self.assertEqual(list(zip(i.tolist(), j.tolist())), expected)
+
+    def test_same_molecule_and_boundary(self):
+        points = [(0.0, 0.0, 0.0), (3.0, 0.0, 0.0), (0.0, 3.0, 0.0), (0.0, 0.0, 3.1)]
+        self.assertEqual(find_contacts(points, 3.0), [(0, 1), (0, 2)])
+        self.assertEqual(find_contacts(points, 3.0, [0, 0, 1, 1]), [(0, 2)])
+        with self.assertRaises(ValueError):
+            find_contacts(points, 0.0)
+
+    def test_convert_many_writes_contacts(self):
+        bonds_path = "tests/fixtures/test_contacts_output.bonds"
+        lammps_path = "tests/fixtures/test_contacts_output.lmp"
+        self.outputs += [bonds_path, lammps_path]
+
+        convert_many("tests/fixtures/5l93_coarse_grained.cif", {"bonds": bonds_path, "lammps": lammps_path},
+                     contact_cutoff=12.0)
+
+        with open(bonds_path) as f:
+            pairs = [tuple(map(int, line.split())) for line in f]
+        self.assertEqual(len(pairs), 90 + 36)
+        # Every contact joins two INT sites (COMs are every 6th atom) of different chains
+        for i, j in pairs[90:]:
+            self.assertNotEqual(i % 6, 0)
+            self.assertNotEqual(i // 6, j // 6)
+
+        with open(lammps_path) as f:
+            content = f.read()
+        self.assertIn("126 bonds", content)
+        self.assertIn("2 bond types", content)
+
+    def _converter_outputs(self, name, columnar=False):
+        cif_path = "tests/fixtures/5l93_coarse_grained.cif"
+        paths = {ext: f"tests/fixtures/test_contacts_{name}.{ext}" for ext in ("xyz", "bonds", "pdb", "lmp")}
+        self.outputs += paths.values()
+        cif_to_xyz(cif_path, paths["xyz"], paths["bonds"], columnar=columnar, contact_cutoff=12.0)
+        cif_to_pdb(cif_path, paths["pdb"], columnar=columnar, contact_cutoff=12.0)
+        cif_to_lammps(cif_path, paths["lmp"], columnar=columnar, contact_cutoff=12.0)
+        contents = {}
+        for ext, path in paths.items():
+            with open(path) as f:
+                contents[ext] = f.read()
+        return contents
+
+    def test_converters_write_contacts(self):
+        contents = self._converter_outputs("streaming")
+        # Same contacts as the fan-out writer
+        bonds_path = "tests/fixtures/test_contacts_output.bonds"
+        self.outputs.append(bonds_path)
+        convert_many("tests/fixtures/5l93_coarse_grained.cif", {"bonds": bonds_path}, contact_cutoff=12.0)
+        with open(bonds_path) as f:
+            self.assertEqual(contents["bonds"], f.read())
+
+        pairs = [tuple(map(int, line.split())) for line in contents["bonds"].splitlines()]
+        self.assertEqual(len(pairs), 90 + 36)
+        # PDB serials and LAMMPS atom IDs are the 1-based atom indices of the fixture
+        conect = [tuple(map(int, line.split()[1:])) for line in contents["pdb"].splitlines()
+                  if line.startswith("CONECT")]
+        self.assertEqual(conect[-36:], [(i + 1, j + 1) for i, j in pairs[90:]])
+
+        self.assertIn("126 bonds", contents["lmp"])
+        self.assertIn("2 bond types", contents["lmp"])
+        bonds = contents["lmp"].split("Bonds\n\n")[1].split("\n")[:126]
+        self.assertEqual([line.split()[1] for line in bonds], ["1"] * 90 + ["2"] * 36)
+        self.assertEqual([tuple(map(int, line.split()[2:])) for line in bonds[90:]],
+                         [(i + 1, j + 1) for i, j in pairs[90:]])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_columnar_converters_match_streaming(self):
+        self.assertEqual(self._converter_outputs("columnar", columnar=True), self._converter_outputs("streaming"))
+
+    def tearDown(self):
+        for path in self.outputs:
+            if os.path.exists(path):
+                os.remove(path)
+
+if __name__ == "__main__":
+    unittest.main()
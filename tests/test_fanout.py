@@ -0,0 +1,88 @@
+import unittest
+import os
+import filecmp
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+from convert.fanout import convert_many
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestConvertMany(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs("tests/fixtures", exist_ok=True)
+        self.cif_path = "tests/fixtures/5l93_coarse_grained.cif"
+        self.outputs = []
+
+    def _output(self, name):
+        path = os.path.join("tests/fixtures", name)
+        self.outputs.append(path)
+        return path
+
+    def _convert_all(self, prefix, columnar=False):
+        outputs = {
+            "xyz": self._output(f"{prefix}.xyz"),
+            "pdb": self._output(f"{prefix}.pdb"),
+            "lammps": self._output(f"{prefix}.lmp"),
+            "bonds": self._output(f"{prefix}.bonds"),
+        }
+        n_atoms = convert_many(self.cif_path, outputs, columnar=columnar)
+        self.assertEqual(n_atoms, 108)
+        return outputs
+
+    def test_matches_individual_converters(self):
+        outputs = self._convert_all("fanout")
+
+        expected_xyz, expected_bonds = self._output("single.xyz"), self._output("single.bonds")
+        expected_pdb, expected_lmp = self._output("single.pdb"), self._output("single.lmp")
+        cif_to_xyz(self.cif_path, expected_xyz, expected_bonds)
+        cif_to_pdb(self.cif_path, expected_pdb)
+        cif_to_lammps(self.cif_path, expected_lmp)
+
+        self.assertTrue(filecmp.cmp(expected_xyz, outputs["xyz"], shallow=False))
+        self.assertTrue(filecmp.cmp(expected_bonds, outputs["bonds"], shallow=False))
+        self.assertTrue(filecmp.cmp(expected_pdb, outputs["pdb"], shallow=False))
+        self.assertTrue(filecmp.cmp(expected_lmp, outputs["lammps"], shallow=False))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_columnar_matches_streaming(self):
+        streamed = self._convert_all("streamed")
+        columnar = self._convert_all("columnar", columnar=True)
+
+        for fmt in streamed:
+            self.assertTrue(filecmp.cmp(streamed[fmt], columnar[fmt], shallow=False), fmt)
+
+    def test_subset_and_unknown_formats(self):
+        pdb_path = self._output("subset.pdb")
+        convert_many(self.cif_path, {"pdb": pdb_path, "xyz": None})
+
+        self.assertTrue(os.path.exists(pdb_path))
+        with self.assertRaises(ValueError):
+            convert_many(self.cif_path, {"gro": self._output("subset.gro")})
+
+    def test_empty_input_with_lammps_output(self):
+        empty_path = self._output("empty.cif")
+        with open(empty_path, "w") as f:
+            f.write("data_empty\n")
+        lammps_path, pdb_path = self._output("empty.lmp"), self._output("empty.pdb")
+        for columnar in ([False, True] if numpy else [False]):
+            with self.assertRaises(ValueError):
+                convert_many(empty_path, {"lammps": lammps_path, "pdb": pdb_path}, columnar=columnar)
+            self.assertFalse(os.path.exists(lammps_path))
+            self.assertFalse(os.path.exists(pdb_path))
+        # Like cif_to_lammps
+        with self.assertRaises(ValueError):
+            cif_to_lammps(empty_path, lammps_path)
+        self.assertEqual(convert_many(empty_path, {"pdb": pdb_path}), 0)
+
+    def tearDown(self):
+        for path in self.outputs:
+            if os.path.exists(path):
+                os.remove(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from convert.hybrid36 import hy36decode, hy36encode
+
+
+class TestHybrid36(unittest.TestCase):
+
+    def test_decimal_range(self):
+        self.assertEqual(hy36encode(5, 1), "    1")
+        self.assertEqual(hy36encode(5, 99999), "99999")
+        self.assertEqual(hy36decode(5, "    1"), 1)
+
+    def test_upper_and_lower_ranges(self):
+        self.assertEqual(hy36encode(5, 100000), "A0000")
+        self.assertEqual(hy36encode(5, 100001), "A0001")
+        self.assertEqual(hy36encode(5, 100000 + 26 * 36 ** 4), "a0000")
+        self.assertEqual(hy36encode(4, 10000), "A000")
+
+    def test_round_trip(self):
+        for value in (0, 9999, 10000, 99999, 100000, 1234567, 43770015, 87440031):
+            self.assertEqual(hy36decode(5, hy36encode(5, value)), value)
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            hy36encode(5, 87440032)
+        with self.assertRaises(ValueError):
+            hy36decode(5, "A-000")
+        with self.assertRaises(ValueError):
+            hy36decode(5, "A000")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+
+from convert.json_stream import iter_model_items
+
+
+class TestJsonStream(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmp.name, "model.json")
+        self.model = {
+            "name": "toy",
+            "system_state": {"molecules": [[1.5, -2e-3, 3], {"s": "]}\"{["}], "flags": [True, False, None]},
+            "molecule_types": [
+                {"name": "A", "diffusion": {"d": 1.0}, "interfaces": [
+                    {"name": "A1", "coord": {"x": 1.0, "y": 2.0, "z": 3.0}},
+                    {"name": "A\"2", "coord": {"x": -4.25, "y": 5e2, "z": 6}},
+                ]},
+                # Interfaces listed before the name
+                {"interfaces": [{"name": "B1", "coord": {"x": 0.5, "y": 0.0, "z": -0.5}}], "name": "B"},
+                {"name": "C"},
+            ],
+            "tail": 12345678901234567890,
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, data, indent=None):
+        with open(self.json_path, "w") as f:
+            json.dump(data, f, indent=indent)
+
+    def _expected(self):
+        items = []
+        for moltype in self.model["molecule_types"]:
+            items.append(("molecule_type", moltype["name"]))
+            items.extend(("interface", interface) for interface in moltype.get("interfaces", []))
+        return items
+
+    def test_items_match_json_load(self):
+        # Tiny buffers cut every token, number and string at some point
+        for indent in (None, 2):
+            self._write(self.model, indent)
+            for read_size in (1, 2, 5, 64, 1 << 16):
+                self.assertEqual(list(iter_model_items(self.json_path, read_size)), self._expected(),
+                                 f"indent={indent} read_size={read_size}")
+
+    def test_invalid_input(self):
+        for text in ("[1, 2]", '{"molecule_types": [{"name": "A"}', '{"molecule_types": [{"interfaces": []}]}',
+                     '{"molecule_types": [{"name": "A"} {"name": "B"}]}'):
+            with open(self.json_path, "w") as f:
+                f.write(text)
+            with self.assertRaises(ValueError, msg=text):
+                list(iter_model_items(self.json_path, read_size=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from convert.cif_to_lammps import cif_to_lammps
+from convert.columnar import np
+from convert.periodic import parse_box, read_cif_cell, unwrap_by_chain, wrap_coords
+
+# A 20 Å cubic cell; molecule A crosses the x = 0 face: its second INT was
+# wrapped to the far side of the box.
+CIF = """\
+data_periodic
+_cell.length_a 20.000
+_cell.length_b 20.000
+_cell.length_c 20.000(1)
+_cell.angle_alpha 90.0
+_cell.angle_beta 90.0
+_cell.angle_gamma 90.0
+loop_
+ATOM      1  INT  MOL A     1.000  5.000  5.000  1.00  0.00  O
+ATOM      2  COM  MOL A     0.500  5.000  5.000  1.00  0.00  C
+ATOM      3  INT  MOL A    19.500  5.000  5.000  1.00  0.00  O
+ATOM      4  COM  MOL B    10.000 10.000 10.000  1.00  0.00  C
+ATOM      5  INT  MOL B    11.000 10.000 10.000  1.00  0.00  O
+"""
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestPeriodic(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cif_path = os.path.join(self.tmp.name, "periodic.cif")
+        self.lmp_path = os.path.join(self.tmp.name, "periodic.lmp")
+        with open(self.cif_path, "w") as f:
+            f.write(CIF)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _atoms(self):
+        with open(self.lmp_path, "r") as f:
+            lines = f.read().splitlines()
+        start = lines.index("Atoms # molecular") + 2
+        return lines, lines[start:start + 5]
+
+    def test_box(self):
+        box = ((0.0, 20.0),) * 3
+        self.assertEqual(read_cif_cell(self.cif_path), box)
+        self.assertEqual(parse_box("20"), box)
+        self.assertEqual(parse_box("20,20,20"), box)
+        self.assertEqual(parse_box("-1,1,-2,2,0,5"), ((-1.0, 1.0), (-2.0, 2.0), (0.0, 5.0)))
+        with self.assertRaises(ValueError):
+            parse_box("1,2")
+
+    def test_unwrap_and_wrap(self):
+        coords = np.array([[1.0, 5, 5], [0.5, 5, 5], [19.5, 5, 5], [10, 10, 10], [31, 10, 10]])
+        chains = np.array([0, 0, 0, 1, 1])
+        is_com = np.array([False, True, False, True, False])
+        box = ((0.0, 20.0),) * 3
+        unwrapped = unwrap_by_chain(coords, chains, is_com, box)
+        np.testing.assert_allclose(unwrapped[:, 0], [1.0, 0.5, -0.5, 10.0, 11.0])
+
+        wrapped, images = wrap_coords(unwrapped, box)
+        np.testing.assert_allclose(wrapped[:, 0], [1.0, 0.5, 19.5, 10.0, 11.0])
+        np.testing.assert_array_equal(images[:, 0], [0, 0, -1, 0, 0])
+        np.testing.assert_allclose(wrapped + images * 20.0, unwrapped)
+
+    def test_lammps_image_flags(self):
+        cif_to_lammps(self.cif_path, self.lmp_path, atom_style="molecular", box="cell")
+        lines, atoms = self._atoms()
+        self.assertIn("0.000 20.000 xlo xhi", lines)
+        self.assertEqual(atoms[2], "3 1 1 19.5000 5.0000 5.0000 -1 0 0")
+        self.assertEqual(atoms[4], "5 2 1 11.0000 10.0000 10.0000 0 0 0")
+
+        cif_to_lammps(self.cif_path, self.lmp_path, atom_style="molecular", box="cell", periodic="unwrap")
+        lines, atoms = self._atoms()
+        self.assertEqual(atoms[2], "3 1 1 -0.5000 5.0000 5.0000")
+
+        os.remove(self.cif_path)
+        with open(self.cif_path, "w") as f:
+            f.write(CIF.replace("_cell.length_a", "_cell.volume"))
+        with self.assertRaises(ValueError):
+            cif_to_lammps(self.cif_path, self.lmp_path, box="cell")
+
+
+if __name__ == "__main__":
+    unittest.main()
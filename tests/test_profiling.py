@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+
+from convert import profiling
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+from convert.fanout import convert_many
+
+CIF_PATH = "tests/fixtures/5l93_coarse_grained.cif"
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reports = []
+
+    def tearDown(self):
+        profiling.disable()
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_off_by_default(self):
+        self.assertFalse(profiling.is_enabled())
+        self.assertIs(profiling.stage("parse"), profiling.stage("format"))
+        chunks = [[1], [2]]
+        self.assertIs(profiling.timed("parse", chunks), chunks)
+        cif_to_xyz(CIF_PATH, self._path("out.xyz"))
+
+    def test_report(self):
+        profiling.enable(callback=self.reports.append)
+        xyz_path, bonds_path = self._path("out.xyz"), self._path("out.bonds")
+        self.assertEqual(cif_to_xyz(CIF_PATH, xyz_path, bonds_path), 108)
+
+        (report,) = self.reports
+        self.assertEqual(report["converter"], "cif_to_xyz")
+        self.assertEqual(set(report["stages"]), {"count", "parse", "format", "bonds"})
+        self.assertEqual(report["stages"]["format"]["calls"], 1)
+        self.assertEqual(report["counts"], {"bonds": 90, "records": 108})
+        self.assertEqual(report["bytes_read"], os.path.getsize(CIF_PATH))
+        self.assertEqual(report["bytes_written"], os.path.getsize(xyz_path) + os.path.getsize(bonds_path))
+        self.assertGreater(report["peak_rss_mb"], 0)
+        stage_time = sum(stage["seconds"] for stage in report["stages"].values())
+        self.assertLessEqual(stage_time, report["seconds"])
+
+    def test_dict_outputs_and_log(self):
+        log_path = self._path("profile.jsonl")
+        profiling.enable(log=log_path)
+        self.assertEqual(os.environ[profiling.ENV_VAR], log_path)
+        outputs = {"xyz": self._path("out.xyz"), "lammps": self._path("out.lmp")}
+        convert_many(CIF_PATH, outputs)
+        cif_to_pdb(CIF_PATH, self._path("out.pdb"))
+
+        with open(log_path) as f:
+            reports = [json.loads(line) for line in f]
+        self.assertEqual([r["converter"] for r in reports], ["convert_many", "cif_to_pdb"])
+        self.assertEqual(reports[0]["outputs"], list(outputs.values()))
+        self.assertIn("lammps", reports[0]["stages"])
+
+        profiling.disable()
+        self.assertNotIn(profiling.ENV_VAR, os.environ)
+        cif_to_pdb(CIF_PATH, self._path("out.pdb"))
+        with open(log_path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_nested_calls_count_once(self):
+        profiling.enable(callback=self.reports.append)
+
+        @profiling.profiled(inputs=("path",))
+        def outer(path):
+            with profiling.stage("outer"):
+                return cif_to_xyz(path, self._path("nested.xyz"))
+
+        outer(CIF_PATH)
+        (report,) = self.reports
+        self.assertEqual(report["converter"], "TestProfiling.test_nested_calls_count_once.<locals>.outer")
+        self.assertIn("outer", report["stages"])
+        self.assertIn("parse", report["stages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import filecmp
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from convert.cif_reader import count_atom_sites, iter_atom_chunks
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+from convert.columnar import np
+from convert.selection import chain_index_path, load_chain_index, Selection
+
+
+def write_grouped_cif(cif_path, copies, seed=0):
+    """
+    Writes a CIF file with `copies` molecules of types A, B and C, grouped by type
+    the way ioNERDSS writes them: A, A-2, ..., B, B-2, ... Each molecule is one COM
+    followed by five INTs, scattered in a 1000 Å cube.
+    """
+    rng = random.Random(seed)
+    serial = 0
+    with open(cif_path, "w") as f:
+        for letter in "ABC":
+            for copy in range(1, copies + 1):
+                chain = letter if copy == 1 else f"{letter}-{copy}"
+                center = [rng.uniform(0, 1000) for _ in range(3)]
+                for label in ["COM"] + ["INT"] * 5:
+                    serial += 1
+                    x, y, z = (c + (rng.uniform(-8, 8) if label == "INT" else 0.0) for c in center)
+                    f.write(f"ATOM  {serial:5d}  {label}  MOL {chain} {x:9.3f} {y:8.3f} {z:8.3f}  1.00  0.00  C\n")
+
+
+class TestSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cif_path = self._path("synthetic.cif")
+        # 60 molecules of 6 sites: chains A, A-2, ..., A-20, B, ..., C-20
+        write_grouped_cif(self.cif_path, 20)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _sites(self, selection):
+        return [site for chunk in iter_atom_chunks(self.cif_path, 50, selection=selection) for site in chunk]
+
+    def test_criteria(self):
+        sites = self._sites(Selection(chains=["A", "A-1*"], labels=["COM"]))
+        self.assertEqual([s.chain for s in sites], ["A"] + [f"A-{n}" for n in range(10, 20)])
+
+        sites = self._sites(Selection(chains=["B*"], every=5))
+        self.assertEqual(sorted({s.chain for s in sites}), ["B", "B-11", "B-16", "B-6"])
+        self.assertEqual(len(sites), 4 * 6)
+
+        box = ((0.0, 0.0, 0.0), (500.0, 500.0, 500.0))
+        sites = self._sites(Selection(bbox=box))
+        self.assertTrue(sites)
+        self.assertTrue(all(0 <= s.x <= 500 and 0 <= s.y <= 500 and 0 <= s.z <= 500 for s in sites))
+        self.assertEqual(count_atom_sites(self.cif_path, Selection(bbox=box)), len(sites))
+
+        with self.assertRaises(ValueError):
+            Selection(every=0)
+
+    def test_chain_index(self):
+        selection = Selection(chains=["B-*", "C-3"], labels=["COM", "INT"], index=True)
+        expected = self._sites(Selection(chains=["B-*", "C-3"]))
+
+        self.assertIsNone(load_chain_index(self.cif_path))
+        self.assertEqual(self._sites(selection), expected)  # builds the index
+        index = load_chain_index(self.cif_path)
+        self.assertEqual(list(index)[:3], ["A", "A-2", "A-3"])
+        self.assertEqual(len(index), 60)
+        self.assertEqual(self._sites(selection), expected)  # seeks with the index
+
+        # The index is rebuilt once the input changes
+        with open(self.cif_path, "a") as f:
+            f.write("ATOM  999  COM  MOL B-99   1.000  2.000  3.000  1.00  0.00  C\n")
+        os.utime(self.cif_path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        self.assertIsNone(load_chain_index(self.cif_path))
+        self.assertEqual(self._sites(selection)[-1].chain, "B-99")
+        self.assertIn("B-99", load_chain_index(self.cif_path))
+
+    def test_converters(self):
+        selection = Selection(chains=["A*", "C-2"], every=2)
+        pdb_path = self._path("subset.pdb")
+        self.assertEqual(cif_to_pdb(self.cif_path, pdb_path, selection=selection), 11 * 6)
+        with open(pdb_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(sum(line.startswith("CONECT") for line in lines), 11 * 2)
+
+        xyz_path = self._path("subset.xyz")
+        self.assertEqual(cif_to_xyz(self.cif_path, xyz_path, selection=selection), 66)
+        with open(xyz_path) as f:
+            self.assertEqual(f.readline(), "66\n")
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_columnar_matches_streaming(self):
+        selection = Selection(chains=["A-*", "B"], labels=["COM", "INT"], every=3, index=True)
+        for name, converter, kwargs in [
+            ("xyz", cif_to_xyz, {}),
+            ("pdb", cif_to_pdb, {}),
+            ("lmp", cif_to_lammps, {"atom_style": "full", "label_types": True}),
+        ]:
+            streamed, columnar = self._path(f"streamed.{name}"), self._path(f"columnar.{name}")
+            converter(self.cif_path, streamed, selection=selection, **kwargs)
+            converter(self.cif_path, columnar, columnar=True, selection=selection, **kwargs)
+            self.assertTrue(filecmp.cmp(streamed, columnar, shallow=False), name)
+        self.assertTrue(os.path.exists(chain_index_path(self.cif_path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
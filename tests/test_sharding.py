@@ -0,0 +1,116 @@
+import filecmp
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from convert import sharding
+from convert.cif_reader import AtomSite, count_atom_sites, iter_atom_chunks, parse_workers_for
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.columnar import np, read_cif_columns
+from convert.sharding import shard_ranges
+
+
+def write_interleaved_cif(cif_path, n_sites, seed=0):
+    """
+    Writes a CIF file of molecules of types A, B and C in turn (A, B, C, A-2, ...),
+    each one COM followed by five INTs, scattered in a 1000 Å cube.
+    """
+    rng = random.Random(seed)
+    with open(cif_path, "w") as f:
+        for serial in range(1, n_sites + 1):
+            molecule, site = divmod(serial - 1, 6)
+            letter, copy = "ABC"[molecule % 3], molecule // 3 + 1
+            chain = letter if copy == 1 else f"{letter}-{copy}"
+            if site == 0:
+                label, center = "COM", [rng.uniform(0, 1000) for _ in range(3)]
+                x, y, z = center
+            else:
+                label = "INT"
+                x, y, z = (c + rng.uniform(-8, 8) for c in center)
+            f.write(f"ATOM  {serial:5d}  {label}  MOL {chain} {x:9.3f} {y:8.3f} {z:8.3f}  1.00  0.00  C\n")
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cif_path = self._path("synthetic.cif")
+        write_interleaved_cif(self.cif_path, 3000)
+        # 8 kB shards: many molecules are cut across shard boundaries
+        patcher = mock.patch.object(sharding, "SHARD_BYTES", 1 << 13)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_shard_ranges(self):
+        with open(self.cif_path, "rb") as f:
+            data = f.read()
+        ranges = shard_ranges(self.cif_path, 7)
+        self.assertEqual(len(ranges), 7)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b"\n")
+        # More shards than lines collapse to one range per line at most
+        self.assertLessEqual(len(shard_ranges(self.cif_path, len(data))), data.count(b"\n"))
+
+    def test_streaming_matches_serial(self):
+        with open(self.cif_path, "a") as f:
+            f.write("ATOM 9001 COM\n")  # too short: skipped
+            f.write("ATOM 9002 INT LIG Z 1.0 2.0 3.0 1.00 0.00 C extra\n")
+            # Not line breaks for a text-mode file
+            f.write("ATOM 9003 INT LIG Z 1.0\x0c2.0\x853.0 1.00 0.00 C\n")
+            f.write("ATOM 9004 COM LIG Z 1.0 2.0\u20283.0 1.00 0.00 C\r\n")
+        expected = list(iter_atom_chunks(self.cif_path, 700))
+        self.assertEqual(list(iter_atom_chunks(self.cif_path, 700, workers=3)), expected)
+        self.assertEqual(count_atom_sites(self.cif_path, workers=3), sum(map(len, expected)))
+
+    def test_parse_workers_for(self):
+        self.assertEqual(parse_workers_for(self.cif_path, 3), 3)
+        self.assertEqual(parse_workers_for(self.cif_path), 1)
+        self.assertEqual(parse_workers_for(self.cif_path + ".gz", 3), 1)
+        with self.assertRaises(ValueError):
+            parse_workers_for(self.cif_path, 0)
+
+    def test_short_and_long_records_in_one_shard(self):
+        # Together 22 fields: the short record must not shift the long one
+        with open(self.cif_path, "w") as f:
+            f.write("ATOM 1 INT LIG Z 1.0 2.0 3.0 1.00 0.00\n")
+            f.write("ATOM 2 INT LIG Z 4.0 5.0 6.0 1.00 0.00 O extra\n")
+        fields = sharding._parse_shard_sites(self.cif_path, 0, os.path.getsize(self.cif_path))
+        self.assertEqual(list(map(AtomSite, *fields)), [AtomSite(2, "INT", "LIG", "Z", 4.0, 5.0, 6.0, 1.0, 0.0, "O")])
+
+    def test_outputs_identical(self):
+        cif_to_lammps(self.cif_path, self._path("serial.lmp"), atom_style="molecular", label_types=True)
+        cif_to_pdb(self.cif_path, self._path("serial.pdb"))
+        cif_to_lammps(self.cif_path, self._path("sharded.lmp"), atom_style="molecular", label_types=True,
+                      parse_workers=3)
+        cif_to_pdb(self.cif_path, self._path("sharded.pdb"), parse_workers=3)
+        self.assertTrue(filecmp.cmp(self._path("serial.lmp"), self._path("sharded.lmp"), shallow=False))
+        self.assertTrue(filecmp.cmp(self._path("serial.pdb"), self._path("sharded.pdb"), shallow=False))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_columnar_merge(self):
+        expected = read_cif_columns(self.cif_path)
+        cols = read_cif_columns(self.cif_path, workers=3)
+        for name in ("labels", "resnames", "chains", "elements"):
+            self.assertEqual(getattr(cols, name), getattr(expected, name))
+        for name in ("serial", "coords", "label_codes", "resname_codes", "chain_codes", "element_codes"):
+            np.testing.assert_array_equal(getattr(cols, name), getattr(expected, name))
+
+        cif_to_lammps(self.cif_path, self._path("sharded.lmp"), columnar=True, parse_workers=3)
+        cif_to_lammps(self.cif_path, self._path("serial.lmp"), columnar=True)
+        self.assertTrue(filecmp.cmp(self._path("serial.lmp"), self._path("sharded.lmp"), shallow=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
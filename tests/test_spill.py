@@ -0,0 +1,99 @@
+import filecmp
+import os
+import random
+import tempfile
+import unittest
+from operator import itemgetter
+
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import cif_to_pdb
+from convert.cif_to_xyz import cif_to_xyz
+from convert.spill import ExternalSorter, MAX_RUNS, memory_size, RECORD_BYTES
+
+
+def write_shuffled_cif(cif_path, n_sites, seed=0):
+    """
+    Writes a CIF file whose chains are interleaved, with COMs before, between or
+    after their INTs, some chains with two COMs or none, and other labels.
+    """
+    rng = random.Random(seed)
+    labels = ["COM", "INT", "INT", "INT", "SUR"]
+    with open(cif_path, "w") as f:
+        for serial in range(1, n_sites + 1):
+            chain = f"{rng.choice('ABC')}-{rng.randrange(40)}"
+            resname = rng.choice(["MOL", "LIG"])
+            f.write(f"ATOM {serial} {rng.choice(labels)} {resname} {chain} "
+                    f"{rng.uniform(0, 100):.3f} {rng.uniform(0, 100):.3f} {rng.uniform(0, 100):.3f} 1.00 0.00 C\n")
+
+
+class TestSpill(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cif_path = self._path("shuffled.cif")
+        write_shuffled_cif(self.cif_path, 2000)
+        # About 50 records per run: dozens of spilled runs
+        self.max_memory = 50 * RECORD_BYTES
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _same(self, a, b):
+        return filecmp.cmp(self._path(a), self._path(b), shallow=False)
+
+    def test_external_sort_is_stable(self):
+        records = [(random.Random(i).randrange(10), i) for i in range(1000)]
+        sorter = ExternalSorter(itemgetter(0), 64)
+        for record in records:
+            sorter.add(record)
+        self.assertGreater(len(sorter.runs), 10)
+        self.assertEqual(list(sorter), sorted(records, key=itemgetter(0)))
+
+    def test_external_sort_merges_runs(self):
+        records = [(random.Random(i).randrange(10), i) for i in range(3000)]
+        for max_runs in (2, 7, MAX_RUNS):
+            sorter = ExternalSorter(itemgetter(0), 1, max_runs)
+            for record in records:
+                sorter.add(record)
+            # 3000 spilled runs, but at most max_runs - 1 of each level are kept: one
+            # per digit of 3000 in base max_runs
+            n, digits = len(records), 0
+            while n:
+                n, digit = divmod(n, max_runs)
+                digits += digit
+            self.assertEqual(len(sorter.runs), digits)
+            self.assertEqual(list(sorter), sorted(records, key=itemgetter(0)))
+        with self.assertRaises(ValueError):
+            ExternalSorter(itemgetter(0), 1, 1)
+
+    def test_memory_size(self):
+        self.assertEqual(memory_size("512M"), 512 << 20)
+        self.assertEqual(memory_size("1.5gb"), 3 << 29)
+        self.assertEqual(memory_size("4096"), 4096)
+        with self.assertRaises(ValueError):
+            memory_size("0")
+
+    def test_outputs_identical(self):
+        for atom_style in ("atomic", "full"):
+            cif_to_lammps(self.cif_path, self._path("memory.lmp"), atom_style=atom_style)
+            cif_to_lammps(self.cif_path, self._path("spilled.lmp"), atom_style=atom_style, max_memory=self.max_memory)
+            self.assertTrue(self._same("memory.lmp", "spilled.lmp"))
+
+        cif_to_pdb(self.cif_path, self._path("memory.pdb"))
+        cif_to_pdb(self.cif_path, self._path("spilled.pdb"), max_memory=self.max_memory)
+        self.assertTrue(self._same("memory.pdb", "spilled.pdb"))
+
+        cif_to_xyz(self.cif_path, self._path("memory.xyz"), self._path("memory.bonds"))
+        cif_to_xyz(self.cif_path, self._path("spilled.xyz"), self._path("spilled.bonds"), max_memory=self.max_memory)
+        self.assertTrue(self._same("memory.xyz", "spilled.xyz"))
+        self.assertTrue(self._same("memory.bonds", "spilled.bonds"))
+
+        with self.assertRaises(ValueError):
+            cif_to_lammps(self.cif_path, self._path("spilled.lmp"), templates=True, max_memory=self.max_memory)
+
+
+if __name__ == "__main__":
+    unittest.main()
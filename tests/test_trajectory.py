@@ -0,0 +1,156 @@
+import contextlib
+import io
+import unittest
+import os
+import filecmp
+import struct
+from convert.cif_reader import AtomSite
+from convert.cif_to_lammps import cif_to_lammps
+from convert.cif_to_pdb import ChainIdMap, cif_to_pdb, format_pdb_atom
+from convert.trajectory import convert_trajectory, DCDTrajectoryWriter, iter_frames, main, natural_sort_key
+from convert.watch import main as watch_main
+
+FRAME = """\
+data_frame_{n}
+loop_
+_atom_site.group_PDB
+ATOM      1  COM  MOL A   {x:.3f}  0.000  0.000  1.00  0.00  C
+ATOM      2  INT  MOL A   1.000  0.000  0.000  1.00  0.00  O
+ATOM      3  COM  MOL B   5.000  5.000  5.000  1.00  0.00  C
+ATOM      4  INT  MOL B   6.000  5.000  5.000  1.00  0.00  O
+"""
+
+
+class TestTrajectory(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs("tests/fixtures", exist_ok=True)
+        self.cif_path = "tests/fixtures/test_trajectory.cif"
+        self.pdb_paths = [f"tests/fixtures/test_trajectory_{n}.pdb" for n in (10, 2)]
+        self.outputs = []
+
+        with open(self.cif_path, "w") as f:
+            for n in range(3):
+                f.write(FRAME.format(n=n, x=float(n)))
+        for n, path in zip((10, 2), self.pdb_paths):
+            with open(path, "w") as f:
+                f.write(f"MODEL     {n:4d}\n")
+                chain_ids = ChainIdMap()
+                f.write(format_pdb_atom(AtomSite(1, "COM", "MOL", "A", float(n), 0.0, 0.0, 1.0, 0.0, "C"), chain_ids))
+                f.write(format_pdb_atom(AtomSite(2, "INT", "MOL", "A", 1.0, 0.0, 0.0, 1.0, 0.0, "O"), chain_ids))
+                f.write("ENDMDL\nEND\n")
+
+    def _output(self, name):
+        path = os.path.join("tests/fixtures", name)
+        self.outputs.append(path)
+        return path
+
+    def test_multi_block_cif(self):
+        xyz_path, dump_path = self._output("traj.xyz"), self._output("traj.lammpstrj")
+        bonds_path = self._output("traj.bonds")
+
+        n_frames = convert_trajectory([self.cif_path], xyz_path, dump_path, bonds_path, timestep_stride=100)
+        self.assertEqual(n_frames, 3)
+
+        with open(xyz_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3 * 6)
+        self.assertEqual(lines[6:8], ["4", "Frame 1"])
+        self.assertEqual(lines[14], "C 2.000 0.000 0.000")
+
+        with open(dump_path) as f:
+            dump = f.read().splitlines()
+        self.assertEqual(dump.count("ITEM: TIMESTEP"), 3)
+        self.assertEqual(dump[dump.index("ITEM: TIMESTEP", 1) + 1], "100")
+        self.assertIn("1 1 2.0000 0.0000 0.0000", dump)
+
+        # Topology is written once
+        with open(bonds_path) as f:
+            self.assertEqual(f.read().splitlines(), ["0 1", "2 3"])
+
+    def test_numbered_pdb_series(self):
+        paths = sorted(self.pdb_paths, key=natural_sort_key)
+        self.assertTrue(paths[0].endswith("_2.pdb"))
+
+        frames = list(iter_frames(paths))
+        self.assertEqual([len(f) for f in frames], [2, 2])
+        self.assertEqual(frames[0][0].x, 2.0)
+        self.assertEqual(frames[1][0].chain, "A")
+
+    def test_pdb_keeps_reused_chains_apart(self):
+        # 150 chains: the 62 PDB chain IDs are reused, and "A-100" and up do not fit a segID
+        cif_path, pdb_path = self._output("chains.cif"), self._output("chains.pdb")
+        chains = ["A"] + [f"A-{n}" for n in range(2, 151)]
+        with open(cif_path, "w") as f:
+            for n, chain in enumerate(chains):
+                f.write(f"ATOM {2 * n + 1} COM MOL {chain} {n}.0 0.0 0.0 1.00 0.00 C\n")
+                f.write(f"ATOM {2 * n + 2} INT MOL {chain} {n}.0 1.0 0.0 1.00 0.00 O\n")
+        cif_to_pdb(cif_path, pdb_path)
+
+        frame = next(iter_frames([pdb_path]))
+        read = [site.chain for site in frame[::2]]
+        self.assertEqual(read[:99], chains[:99])
+        self.assertEqual(len(set(read)), len(chains))
+
+        bonds_path = self._output("chains.bonds")
+        convert_trajectory([pdb_path], bonds_path=bonds_path)
+        with open(bonds_path) as f:
+            self.assertEqual(f.read().splitlines(), [f"{2 * n} {2 * n + 1}" for n in range(len(chains))])
+
+    def test_topology_matches_cif_to_lammps(self):
+        source = "tests/fixtures/5l93_coarse_grained.cif"
+        expected, actual = self._output("expected_5l93.lmp"), self._output("topology_5l93.lmp")
+        cif_to_lammps(source, expected)
+        convert_trajectory([source], data_path=actual)
+
+        self.assertTrue(filecmp.cmp(expected, actual, shallow=False))
+
+    def test_dcd(self):
+        dcd_path = self._output("traj.dcd")
+        box = ((0.0, 10.0), (0.0, 20.0), (0.0, 30.0))
+        self.assertEqual(convert_trajectory([self.cif_path], dcd_path=dcd_path, timestep_stride=100, box=box), 3)
+
+        # Append one frame, as the watch mode does
+        with DCDTrajectoryWriter(dcd_path, "a", box=box, timestep_stride=100) as dcd:
+            self.assertEqual(dcd.frames, 3)
+            dcd.write_frame(next(iter_frames([self.cif_path])))
+            with self.assertRaises(ValueError):
+                dcd.write_frame([])
+
+        with open(dcd_path, "rb") as f:
+            data = f.read()
+        header = struct.unpack_from("<i4s20i", data)
+        self.assertEqual(header[:5], (84, b"CORD", 4, 0, 100))
+        self.assertEqual(header[5], 300)  # last timestep
+        self.assertEqual(struct.unpack_from("<3i", data, 264), (4, 4, 4))
+
+        frame_size = 56 + 3 * (8 + 4 * 4)
+        self.assertEqual(len(data), 276 + 4 * frame_size)
+        second = 276 + frame_size
+        self.assertEqual(struct.unpack_from("<6d", data, second + 4), (10.0, 90.0, 20.0, 90.0, 90.0, 30.0))
+        self.assertEqual(struct.unpack_from("<i4fi", data, second + 56), (16, 1.0, 1.0, 5.0, 6.0, 16))
+
+    def test_box_option(self):
+        box = ((0.0, 10.0), (-5.0, 5.0), (0.0, 30.0))
+        expected = self._output("expected.lammpstrj")
+        convert_trajectory([self.cif_path], dump_path=expected, box=box)
+        argv = ["--box", "0", "10", "-5", "5", "0", "30"]
+        for name, run in (("cli.lammpstrj", main), ("watch.lammpstrj", watch_main)):
+            dump_path = self._output(name)
+            with contextlib.redirect_stdout(io.StringIO()):
+                run([self.cif_path, "--dump", dump_path] + argv + (["--once"] if run is watch_main else []))
+            self.assertTrue(filecmp.cmp(dump_path, expected, shallow=False))
+        with open(expected) as f:
+            self.assertIn("ITEM: BOX BOUNDS pp pp pp\n0.000 10.000\n-5.000 5.000\n0.000 30.000\n", f.read())
+
+    def test_requires_an_output(self):
+        with self.assertRaises(ValueError):
+            convert_trajectory([self.cif_path])
+
+    def tearDown(self):
+        for path in [self.cif_path] + self.pdb_paths + self.outputs:
+            if os.path.exists(path):
+                os.remove(path)
+
+if __name__ == "__main__":
+    unittest.main()
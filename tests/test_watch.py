@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+
+from convert.cif_reader import AtomSite
+from convert.cif_to_pdb import ChainIdMap, format_pdb_atom
+from convert.trajectory import convert_trajectory
+from convert.watch import FileTail, TrajectoryWatcher
+
+FRAME = """\
+data_frame_{n}
+loop_
+_atom_site.group_PDB
+ATOM      1  COM  MOL A   {x:.3f}  0.000  0.000  1.00  0.00  C
+ATOM      2  INT  MOL A   1.000  0.000  0.000  1.00  0.00  O
+"""
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _append(self, path, text):
+        with open(path, "a") as f:
+            f.write(text)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_tail_reads_each_line_once(self):
+        cif_path = self._path("run.cif")
+        self._append(cif_path, FRAME.format(n=0, x=0.0) + FRAME.format(n=1, x=1.0)[:-10])
+        tail = FileTail(cif_path)
+        self.assertEqual(len(list(tail.read_frames())), 1)
+        # The second frame is pending and its unterminated last line is left unread
+        self.assertEqual(len(tail.pending), 1)
+        self.assertLess(tail.position, os.path.getsize(cif_path))
+
+        self._append(cif_path, FRAME.format(n=1, x=1.0)[-10:])
+        self.assertEqual(list(tail.read_frames()), [])
+        self.assertEqual(len(tail.pending), 2)
+        (frame,) = tail.read_frames(final=True)
+        self.assertEqual(frame[0].x, 1.0)
+        self.assertEqual(tail.offset, os.path.getsize(cif_path))
+
+    def test_growing_cif_matches_one_shot(self):
+        cif_path = self._path("run.cif")
+        xyz_path, dump_path = self._path("live.xyz"), self._path("live.lammpstrj")
+        watcher = TrajectoryWatcher([cif_path], xyz_path, dump_path, timestep_stride=10)
+        self.assertEqual(watcher.poll(), 0)  # nothing written yet
+
+        appended = []
+        for n in range(4):
+            self._append(cif_path, FRAME.format(n=n, x=float(n)))
+            appended.append(watcher.poll())
+        appended.append(watcher.poll(final=True))
+        self.assertEqual(appended, [0, 1, 1, 1, 1])
+
+        convert_trajectory([cif_path], self._path("ref.xyz"), self._path("ref.lammpstrj"), timestep_stride=10)
+        self.assertEqual(self._read(xyz_path), self._read(self._path("ref.xyz")))
+        self.assertEqual(self._read(dump_path), self._read(self._path("ref.lammpstrj")))
+
+    def test_truncated_file_is_not_appended_twice(self):
+        cif_path, xyz_path, state_path = self._path("run.cif"), self._path("live.xyz"), self._path("state.json")
+        self._append(cif_path, "".join(FRAME.format(n=n, x=float(n)) for n in range(3)))
+        self.assertEqual(TrajectoryWatcher([cif_path], xyz_path, state_path=state_path).poll(), 2)
+
+        # Rewritten from the start (e.g. a restarted run), shorter than what was read
+        with open(cif_path, "w") as f:
+            f.write(FRAME.format(n=0, x=0.0))
+        watcher = TrajectoryWatcher([cif_path], xyz_path, state_path=state_path)
+        self.assertEqual(watcher.poll(), 0)
+        self._append(cif_path, "".join(FRAME.format(n=n, x=float(n)) for n in range(1, 4)))
+        self.assertEqual(watcher.poll(final=True), 2)
+
+        convert_trajectory([cif_path], self._path("ref.xyz"))
+        self.assertEqual(self._read(xyz_path), self._read(self._path("ref.xyz")))
+
+    def test_snapshot_directory_with_resume(self):
+        snapshots = self._path("snapshots")
+        os.makedirs(snapshots)
+        xyz_path, bonds_path, state_path = self._path("live.xyz"), self._path("live.bonds"), self._path("state.json")
+
+        def write_snapshot(n):
+            chain_ids = ChainIdMap()
+            with open(os.path.join(snapshots, f"frame_{n}.pdb"), "w") as f:
+                f.write(format_pdb_atom(AtomSite(1, "COM", "MOL", "A", float(n), 0.0, 0.0, 1.0, 0.0, "C"), chain_ids))
+                f.write(format_pdb_atom(AtomSite(2, "INT", "MOL", "A", 1.0, 0.0, 0.0, 1.0, 0.0, "O"), chain_ids))
+                f.write("END\n")
+
+        for n in (1, 2):
+            write_snapshot(n)
+        self.assertEqual(TrajectoryWatcher([snapshots], xyz_path, bonds_path=bonds_path,
+                                           state_path=state_path).poll(), 2)
+
+        # A new watcher resumes from the state file and only converts the new snapshot
+        write_snapshot(10)
+        watcher = TrajectoryWatcher([snapshots], xyz_path, bonds_path=bonds_path, state_path=state_path)
+        self.assertEqual(watcher.frames, 2)
+        self.assertEqual(watcher.poll(), 1)
+
+        lines = self._read(xyz_path).splitlines()
+        self.assertEqual(lines[0::4], ["2", "2", "2"])
+        self.assertEqual(lines[1::4], ["Frame 0", "Frame 1", "Frame 2"])
+        self.assertEqual(lines[10], "C 10.000 0.000 0.000")
+        self.assertEqual(self._read(bonds_path), "0 1\n")
+
+
+if __name__ == "__main__":
+    unittest.main()